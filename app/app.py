@@ -1,5 +1,12 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask import Flask, request, redirect, url_for, flash, session, jsonify, make_response
+from flask import render_template as flask_render_template
+import asyncio
 import datetime
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.security import generate_password_hash, check_password_hash
 import sys
 import os
@@ -11,10 +18,15 @@ sys.path.append(parent_dir)
 
 # Import the interaction functions
 from scripts.interact import (
-    get_all_posts, get_post, create_post, vote_post, 
-    get_user_reputation, has_user_voted, update_user_sentiment
+    get_author_sentiment, submit_post, submit_vote, schedule_user_sentiment,
+    get_transaction_status, get_live_watcher, get_post_metadata, default_reputation
 )
-from sentiment import analyze_sentiment, determine_user_sentiment
+from scripts import async_interact
+from scripts.forum_client import get_client
+from scripts.metrics import (
+    get_metrics, track, begin_request, end_request, server_timing_header, SERVER_TIMING
+)
+from sentiment import analyze_sentiment_cached
 
 app = Flask(__name__)
 app.secret_key = os.getenv("SECRET_KEY", "default_secret_key")
@@ -22,27 +34,126 @@ app.secret_key = os.getenv("SECRET_KEY", "default_secret_key")
 # Mock user database for demo (in a real app, use a proper database)
 users = {}
 
+# One blockchain client shared by every request
+forum_client = get_client()
+
+@app.before_request
+def start_request_metrics():
+    begin_request(request.endpoint)
+
+@app.after_request
+def record_request_metrics(response):
+    timings = end_request(request.method, response.status_code)
+    if SERVER_TIMING and timings:
+        response.headers['Server-Timing'] = server_timing_header(timings)
+    return response
+
+@app.before_request
+def reload_contract_if_redeployed():
+    # Pick up a new forum_contract_address.txt without restarting the server
+    forum_client.reload_if_changed()
+
+def render_template(template_name, **context):
+    # Timed per template so /metrics separates rendering from data fetching
+    with track("render_template", template_name):
+        return flask_render_template(template_name, **context)
+
+# Rendered pages kept per (route, args, viewer, last relevant block)
+PAGE_CACHE_SIZE = int(os.getenv("PAGE_CACHE_SIZE", "256"))
+page_cache = OrderedDict()
+page_cache_lock = threading.Lock()
+
+def cached_page(relevant_block):
+    """
+    Serve a GET view from the page cache with ETag / Last-Modified validation.
+    
+    relevant_block(watcher, **view_args) returns the last block whose events
+    can change the page, so a new block only produces a new cache key for
+    the pages it affects. Pages are only cached while the chain watcher is
+    current, and never when they carry flashed messages. Async views are
+    run through app.ensure_sync like Flask does for undecorated ones.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(**view_args):
+            run_view = app.ensure_sync(view)
+            watcher = get_live_watcher()
+            if watcher is None or '_flashes' in session:
+                return run_view(**view_args)
+            
+            key = (
+                request.endpoint,
+                tuple(sorted(view_args.items())),
+                tuple(sorted(request.args.items(multi=True))),
+                session.get('user_address'),
+                watcher.start_block,
+                relevant_block(watcher, **view_args)
+            )
+            with page_cache_lock:
+                entry = page_cache.get(key)
+                if entry:
+                    page_cache.move_to_end(key)
+            
+            if entry is None:
+                response = make_response(run_view(**view_args))
+                # Redirects, errors and pages that flashed a message are not reusable
+                if response.status_code != 200 or '_flashes' in session:
+                    return response
+                body = response.get_data()
+                entry = (body, hashlib.sha1(body).hexdigest(), datetime.datetime.utcnow().replace(microsecond=0))
+                with page_cache_lock:
+                    page_cache[key] = entry
+                    while len(page_cache) > PAGE_CACHE_SIZE:
+                        page_cache.popitem(last=False)
+            
+            body, etag, last_modified = entry
+            response = make_response(body)
+            response.set_etag(etag)
+            response.last_modified = last_modified
+            response.vary.add('Cookie')
+            response.cache_control.no_cache = True
+            if session.get('user_address'):
+                response.cache_control.private = True
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+def post_page_block(watcher, post_id):
+    # The post page also shows the author's reputation. Only the author is
+    # looked up (cache or post index), not the post content
+    author = watcher.author_of(post_id)
+    author_block = watcher.user_block(author) if author else watcher.last_event_block
+    return max(watcher.post_block(post_id), author_block)
+
+def profile_page_block(watcher, user_address):
+    if not forum_client.w3.is_address(user_address):
+        return watcher.start_block
+    return watcher.user_block(forum_client.w3.to_checksum_address(user_address))
+
 # Routes
 @app.route('/')
-def index():
-    posts = get_all_posts()
-    # Sort posts by timestamp (newest first)
-    posts.sort(key=lambda x: x['timestamp'], reverse=True)
+@cached_page(lambda watcher: watcher.last_event_block)
+async def index():
+    # One page of posts, newest first; ?before=<id>&limit=<n> walks back in time.
+    # Only chain data is read here: the page fetches excerpts and sentiment
+    # from /api/post/<id>/content once it has rendered
+    page = await async_interact.get_posts_page(
+        request.args.get('before', type=int),
+        request.args.get('limit', type=int),
+        metadata_only=True
+    )
+    posts = page['posts']
     
     # Format timestamps
     for post in posts:
         post['formatted_time'] = datetime.datetime.fromtimestamp(post['timestamp']).strftime('%Y-%m-%d %H:%M')
-        
-        # Ensure sentiment is set for news posts
-        if post.get('isNews') and not post.get('sentiment'):
-            try:
-                sentiment, polarity = analyze_sentiment(post['content'])
-                post['sentiment'] = sentiment
-                post['sentiment_score'] = polarity
-            except Exception as e:
-                print(f"Error analyzing sentiment: {str(e)}")
     
-    return render_template('index.html', posts=posts, current_user=session.get('user_address'))
+    return render_template(
+        'index.html',
+        posts=posts,
+        page=page,
+        current_user=session.get('user_address')
+    )
 
 @app.route('/register', methods=['GET', 'POST'])
 def register():
@@ -101,19 +212,20 @@ def create():
         is_news = 'is_news' in request.form
         
         if is_news:
-            # Analyze sentiment for news posts
-            sentiment, polarity = analyze_sentiment(content)
+            # Analyze sentiment for news posts; the result is cached, so the
+            # IPFS envelope written by submit_post reuses it
+            sentiment, polarity = analyze_sentiment_cached(content)
             flash(f"Post sentiment analysis: {sentiment.capitalize()} (Score: {polarity:.2f})")
         
         # Get the logged-in user's address
         user_address = session.get('user_address')
         
-        # Create post on blockchain
-        post_id, result = create_post(title, content, is_news, user_address=user_address)
+        # Send the post transaction; it is confirmed in the background
+        tx_hash, result = submit_post(title, content, is_news, user_address=user_address)
         
-        if post_id:
-            flash("Post created successfully")
-            return redirect(url_for('post_detail', post_id=post_id))
+        if tx_hash:
+            flash("Post submitted, waiting for confirmation")
+            return redirect(url_for('tx_pending', tx_hash=tx_hash))
         else:
             # Display error message
             if isinstance(result, str):
@@ -125,8 +237,12 @@ def create():
     return render_template('create_post.html')
 
 @app.route('/post/<int:post_id>')
-def post_detail(post_id):
-    post = get_post(post_id)
+@cached_page(post_page_block)
+async def post_detail(post_id):
+    # Post, author reputation and the viewer's vote are read concurrently
+    post, author_reputation, (has_voted, is_upvote) = await async_interact.get_post_detail(
+        post_id, session.get('user_address')
+    )
     if not post:
         flash("Post not found")
         return redirect(url_for('index'))
@@ -136,22 +252,12 @@ def post_detail(post_id):
     # Ensure sentiment is set for news posts
     if post.get('isNews') and not post.get('sentiment'):
         try:
-            sentiment, polarity = analyze_sentiment(post['content'])
+            sentiment, polarity = analyze_sentiment_cached(post['content'])
             post['sentiment'] = sentiment
             post['sentiment_score'] = polarity
         except Exception as e:
             print(f"Error analyzing sentiment: {str(e)}")
     
-    # Get author reputation
-    author_reputation = get_user_reputation(post['author'])
-    
-    # Check if current user has voted
-    has_voted = False
-    is_upvote = False
-    
-    if 'user_address' in session:
-        has_voted, is_upvote = has_user_voted(post_id, session['user_address'])
-    
     return render_template(
         'post_detail.html', 
         post=post, 
@@ -161,6 +267,35 @@ def post_detail(post_id):
         current_user=session.get('user_address')
     )
 
+@app.route('/api/post/<int:post_id>/content')
+async def post_content(post_id):
+    # Body, excerpt and sentiment for one post, filled into list pages by script
+    content = await async_interact.get_post_content(post_id)
+    if content is None:
+        return jsonify({'id': post_id, 'error': 'Post not found'}), 404
+    return jsonify(content)
+
+# Author sentiment is recomputed here, one refresh at a time, rather than in
+# the transaction queue's receipt poller
+sentiment_refresh_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sentiment-refresh")
+
+def refresh_author_sentiment(post_id, from_address):
+    try:
+        # Update post author's sentiment if this is a news post; only the
+        # chain fields are needed to decide
+        post = get_post_metadata(post_id)
+        if post and post['isNews']:
+            # Read from the running per-author tally instead of re-analyzing every post
+            sentiment_tag = get_author_sentiment(post['author'])
+            # Written in the background, coalesced per author and skipped if unchanged
+            schedule_user_sentiment(post['author'], sentiment_tag, from_address=from_address)
+    except Exception as e:
+        print(f"Error refreshing author sentiment for post {post_id}: {str(e)}")
+
+def queue_author_sentiment_refresh(post_id, from_address):
+    # Called in the tx-queue thread; returns None so the vote's result stays empty
+    sentiment_refresh_pool.submit(refresh_author_sentiment, post_id, from_address)
+
 @app.route('/vote/<int:post_id>/<vote_type>')
 def vote(post_id, vote_type):
     if 'username' not in session:
@@ -170,50 +305,56 @@ def vote(post_id, vote_type):
     is_upvote = vote_type == 'up'
     user_address = session.get('user_address')
     
-    # Submit vote to blockchain
-    success, message = vote_post(post_id, is_upvote, user_address=user_address)
+    # Submit vote to blockchain; the author's sentiment is refreshed once it is mined
+    tx_hash, message = submit_vote(
+        post_id, is_upvote, user_address=user_address,
+        on_confirmed=lambda receipt: queue_author_sentiment_refresh(post_id, user_address)
+    )
     
-    if success:
-        flash("Vote recorded successfully")
-        
-        # Update post author's sentiment if this is a news post
-        post = get_post(post_id)
-        if post and post['isNews']:
-            user_posts = [p for p in get_all_posts() if p['author'] == post['author']]
-            sentiment_tag = determine_user_sentiment(user_posts)
-            result = update_user_sentiment(post['author'], sentiment_tag, from_address=user_address)
-            if isinstance(result, str):
-                flash(f"Note: {result}")
+    if tx_hash:
+        flash("Vote submitted")
     else:
         flash(f"Vote failed: {message}")
     
     return redirect(url_for('post_detail', post_id=post_id))
 
-@app.route('/user/<user_address>')
-def user_profile(user_address):
-    # Get user reputation
-    try:
-        reputation = get_user_reputation(user_address)
-    except Exception as e:
-        flash(f"Error getting user reputation: {str(e)}")
-        reputation = {
-            'totalPosts': 0,
-            'totalUpvotesReceived': 0,
-            'totalDownvotesReceived': 0,
-            'reputationScore': 5.0,
-            'sentimentTag': 'neutral'
-        }
+@app.route('/tx/<tx_hash>')
+def tx_status(tx_hash):
+    status = get_transaction_status(tx_hash)
+    if status is None:
+        return jsonify({'hash': tx_hash, 'status': 'unknown'}), 404
     
-    # Get user posts
-    all_posts = get_all_posts()
-    user_posts = [p for p in all_posts if p['author'].lower() == user_address.lower()]
+    # Created posts can be opened as soon as their ID is known
+    if status['kind'] == 'post' and status['status'] == 'confirmed' and status['result']:
+        status['redirect'] = url_for('post_detail', post_id=status['result'])
+    return jsonify(status)
+
+@app.route('/tx/<tx_hash>/wait')
+def tx_pending(tx_hash):
+    return render_template('tx_pending.html', tx_hash=tx_hash, current_user=session.get('user_address'))
+
+@app.route('/user/<user_address>')
+@cached_page(profile_page_block)
+async def user_profile(user_address):
+    # Reputation and posts are fetched concurrently
+    reputation, user_posts = await asyncio.gather(
+        async_interact.get_user_reputation(user_address),
+        async_interact.get_posts_by_author(user_address),
+        return_exceptions=True
+    )
+    if isinstance(reputation, Exception):
+        flash(f"Error getting user reputation: {str(reputation)}")
+        reputation = default_reputation()
+    if isinstance(user_posts, Exception):
+        print(f"Error getting posts for {user_address}: {str(user_posts)}")
+        user_posts = []
     
     # Format timestamps and ensure sentiment is set for news posts
     for post in user_posts:
         post['formatted_time'] = datetime.datetime.fromtimestamp(post['timestamp']).strftime('%Y-%m-%d %H:%M')
         if post.get('isNews') and not post.get('sentiment'):
             try:
-                sentiment, polarity = analyze_sentiment(post['content'])
+                sentiment, polarity = analyze_sentiment_cached(post['content'])
                 post['sentiment'] = sentiment
                 post['sentiment_score'] = polarity
             except Exception as e:
@@ -226,5 +367,12 @@ def user_profile(user_address):
         posts=user_posts
     )
 
+@app.route('/metrics')
+def metrics():
+    # Prometheus scrape endpoint
+    response = make_response(get_metrics().render())
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    return response
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
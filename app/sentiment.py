@@ -1,13 +1,30 @@
 from textblob import TextBlob
+from textblob.en import sentiment as pattern_sentiment
+from textblob._text import EMOTICONS
+import hashlib
+import numpy as np
+import os
 import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from scripts.metrics import timed
+
+# Sentiment cache settings (set SENTIMENT_CACHE_PATH to an empty string for memory only)
+SENTIMENT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", "4096"))
+SENTIMENT_CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", "sentiment_cache.db")
+
+URL_PATTERN = re.compile(r'http\S+')
+SYMBOL_PATTERN = re.compile(r'[^\w\s]')
 
 def clean_text(text):
     # Remove URLs, special characters, etc.
-    text = re.sub(r'http\S+', '', text)
-    text = re.sub(r'[^\w\s]', '', text)
+    text = URL_PATTERN.sub('', text)
+    text = SYMBOL_PATTERN.sub('', text)
     text = text.lower()
     return text
 
+@timed("sentiment")
 def analyze_sentiment(text):
     # Clean the text
     cleaned_text = clean_text(text)
@@ -19,12 +36,217 @@ def analyze_sentiment(text):
     polarity = blob.sentiment.polarity
     
     # Determine sentiment category
+    return sentiment_label(polarity), polarity
+
+def sentiment_label(polarity):
     if polarity > 0.1:
-        return "positive", polarity
+        return "positive"
     elif polarity < -0.1:
-        return "negative", polarity
+        return "negative"
     else:
-        return "neutral", polarity
+        return "neutral"
+
+class SentimentLexicon:
+    """
+    TextBlob's pattern polarity lexicon as NumPy arrays, for scoring many texts at once.
+
+    Cleaned text has no punctuation, so a TextBlob score is the mean polarity
+    of the lexicon words in it unless a negation, an emoticon or an adverb
+    directly in front of another lexicon word changes how words combine.
+    Those texts (and only those) are rescored with TextBlob's own sequential
+    scorer, so results are identical to analyze_sentiment.
+    """
+
+    def __init__(self, lexicon=None):
+        self.lexicon = lexicon or pattern_sentiment
+        words = list(self.lexicon.keys())
+        self.ids = {word: i for i, word in enumerate(words)}
+        self.polarity = np.array([self.lexicon[w][None][0] for w in words], dtype=np.float64)
+        self.is_modifier = np.array(
+            [any(pos in self.lexicon[w] for pos in self.lexicon.modifiers) for w in words], dtype=bool
+        )
+        # Tokens that can survive clean_text and still change how words combine
+        emoticons = {e.lower() for group in EMOTICONS.values() for e in group}
+        self.context_words = set(self.lexicon.negations) | {
+            e for e in emoticons if re.fullmatch(r'\w+', e) and not e.isalpha()
+        }
+
+    def score(self, token_lists):
+        """
+        Polarity of each list of cleaned, lowercased tokens.
+
+        Args:
+            token_lists (list): One list of tokens per text
+
+        Returns:
+            numpy.ndarray: Polarity per text, matching TextBlob
+        """
+        n = len(token_lists)
+        lengths = np.fromiter(map(len, token_lists), dtype=np.intp, count=n)
+        tokens = [token for token_list in token_lists for token in token_list]
+        ids = np.fromiter((self.ids.get(t, -1) for t in tokens), dtype=np.intp, count=len(tokens))
+        doc = np.repeat(np.arange(n), lengths)
+        known = ids >= 0
+
+        # Texts whose words all score independently reduce to a mean per text
+        sums = np.bincount(doc[known], weights=self.polarity[ids[known]], minlength=n)
+        counts = np.bincount(doc[known], minlength=n)
+        polarity = sums / np.maximum(counts, 1)
+
+        needs_context = np.zeros(n, dtype=bool)
+        special = np.fromiter((t in self.context_words for t in tokens), dtype=bool, count=len(tokens))
+        needs_context[doc[special]] = True
+
+        # An adverb modifies the next lexicon word unless a longer unknown word comes first
+        modifiers = np.flatnonzero(known & self.is_modifier[np.where(known, ids, 0)])
+        long_words = np.fromiter(map(len, tokens), dtype=np.intp, count=len(tokens)) > 2
+        stops = np.flatnonzero(known | long_words)
+        following = np.searchsorted(stops, modifiers, side='right')
+        in_range = following < len(stops)
+        modifiers = modifiers[in_range]
+        following = stops[following[in_range]]
+        modified = known[following] & (doc[following] == doc[modifiers])
+        needs_context[doc[modifiers[modified]]] = True
+
+        for i in np.flatnonzero(needs_context):
+            polarity[i] = self.lexicon(token_lists[i])[0]
+        return polarity
+
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+def get_sentiment_lexicon():
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                _lexicon = SentimentLexicon()
+    return _lexicon
+
+@timed("sentiment")
+def analyze_sentiment_batch(texts):
+    """
+    Analyze many texts at once; same results as calling analyze_sentiment on each.
+
+    Args:
+        texts (list): Texts to analyze
+
+    Returns:
+        list: (label, polarity) per text, in input order
+    """
+    if not texts:
+        return []
+    token_lists = [clean_text(text).split() for text in texts]
+    polarities = get_sentiment_lexicon().score(token_lists)
+    return [(sentiment_label(p), p) for p in polarities.tolist()]
+
+def sentiment_key(text, content_hash=None):
+    # IPFS content never changes under its CID; direct content is keyed by digest
+    if content_hash:
+        return content_hash
+    return "sha256:" + hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class SentimentCache:
+    """Bounded in-memory LRU of sentiment results, optionally backed by SQLite."""
+
+    def __init__(self, max_entries=None, path=None):
+        self.max_entries = max_entries or SENTIMENT_CACHE_SIZE
+        self.path = SENTIMENT_CACHE_PATH if path is None else path
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._conn = None
+        if self.path:
+            try:
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS sentiment "
+                    "(key TEXT PRIMARY KEY, label TEXT NOT NULL, polarity REAL NOT NULL)"
+                )
+            except sqlite3.Error as e:
+                print(f"Sentiment cache disk tier disabled: {str(e)}")
+                self._conn = None
+
+    def _remember(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            if self._conn:
+                row = self._conn.execute(
+                    "SELECT label, polarity FROM sentiment WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    result = (row[0], row[1])
+                    self._remember(key, result)
+                    return result
+        return None
+
+    def put(self, key, result):
+        with self._lock:
+            self._remember(key, result)
+            if self._conn:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO sentiment (key, label, polarity) VALUES (?, ?, ?)",
+                        (key, result[0], result[1])
+                    )
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_sentiment_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SentimentCache()
+    return _cache
+
+def analyze_sentiment_cached(text, content_hash=None):
+    """
+    Same as analyze_sentiment, but each piece of content is analyzed only once.
+
+    Pass content_hash only when text is the content resolved from that CID.
+    """
+    cache = get_sentiment_cache()
+    key = sentiment_key(text, content_hash)
+    result = cache.get(key)
+    if result is None:
+        result = analyze_sentiment(text)
+        cache.put(key, result)
+    return result
+
+def analyze_sentiment_batch_cached(texts, content_hashes=None):
+    """
+    Batch version of analyze_sentiment_cached; only uncached texts are analyzed.
+
+    Args:
+        texts (list): Texts to analyze
+        content_hashes (list): CID per text, or None where the text was not read from IPFS
+
+    Returns:
+        list: (label, polarity) per text, in input order
+    """
+    cache = get_sentiment_cache()
+    content_hashes = content_hashes or [None] * len(texts)
+    keys = [sentiment_key(text, cid) for text, cid in zip(texts, content_hashes)]
+    results = [cache.get(key) for key in keys]
+
+    # Analyze each distinct missing key once
+    missing = {}
+    for key, text, result in zip(keys, texts, results):
+        if result is None and key not in missing:
+            missing[key] = text
+    for key, result in zip(missing, analyze_sentiment_batch(list(missing.values()))):
+        cache.put(key, result)
+        missing[key] = result
+    return [result if result is not None else missing[key] for key, result in zip(keys, results)]
 
 def determine_user_sentiment(posts):
     if not posts:
@@ -39,10 +261,25 @@ def determine_user_sentiment(posts):
     # Count sentiment types
     sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
     
+    # Reuse the sentiment attached when the post was loaded, analyze the rest together
+    unanalyzed = [p['content'] for p in news_posts if not p.get('sentiment')]
+    analyzed = iter(analyze_sentiment_batch_cached(unanalyzed))
     for post in news_posts:
-        sentiment, _ = analyze_sentiment(post['content'])
+        sentiment = post.get('sentiment') or next(analyzed)[0]
         sentiment_counts[sentiment] += 1
     
+    return dominant_sentiment(sentiment_counts)
+
+def dominant_sentiment(sentiment_counts):
+    """
+    Pick a user's sentiment tag from per-label post counts.
+
+    Args:
+        sentiment_counts (dict): {'positive': n, 'negative': n, 'neutral': n}
+
+    Returns:
+        str: The most common label, or 'neutral' on a tie
+    """
     # Find the dominant sentiment
     max_sentiment = max(sentiment_counts.items(), key=lambda x: x[1])
     
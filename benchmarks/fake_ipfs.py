@@ -0,0 +1,124 @@
+import hashlib
+import json
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from scripts.cid import b58encode, SHA256_MULTIHASH_PREFIX
+
+
+def fake_cid(data):
+    """CIDv0-shaped hash of raw bytes (not the UnixFS CID a real node would return)."""
+    return b58encode(SHA256_MULTIHASH_PREFIX + hashlib.sha256(data).digest())
+
+
+def multipart_files(content_type, body):
+    """
+    (name, data) for each part of a multipart/form-data body.
+
+    Parsed with the email package, since cgi is gone in Python 3.13.
+    """
+    message = BytesParser(policy=HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode('latin-1') + b"\r\n\r\n" + body
+    )
+    if not message.is_multipart():
+        return []
+    return [
+        (part.get_filename() or part.get_param('name', header='content-disposition'),
+         part.get_payload(decode=True) or b'')
+        for part in message.iter_parts()
+    ]
+
+
+class FakeIPFS:
+    """
+    Stand-in for the IPFS HTTP API: /api/v0/add and /api/v0/cat only.
+
+    Content is kept in memory and addressed by a CIDv0-shaped sha256 hash.
+    Requests are counted per endpoint so benchmarks can report IPFS traffic.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.blocks = {}
+        self.requests = {'add': 0, 'cat': 0}
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/api/v0"
+
+    def put(self, data):
+        """Store content directly (for seeding) and return its CID."""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        cid = fake_cid(data)
+        with self._lock:
+            self.blocks[cid] = data
+        return cid
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.requests)
+
+    def start(self, port=0):
+        ipfs = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without this keep-alive
+            # requests stall ~40ms on delayed ACKs
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, data, content_type='application/json'):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                if ipfs.latency:
+                    threading.Event().wait(ipfs.latency)
+                url = urlparse(self.path)
+                length = int(self.headers.get('Content-Length', 0))
+                if url.path.endswith('/add'):
+                    with ipfs._lock:
+                        ipfs.requests['add'] += 1
+                    files = multipart_files(self.headers.get('Content-Type', ''), self.rfile.read(length))
+                    replies = []
+                    for name, data in files:
+                        replies.append(json.dumps({
+                            'Name': name,
+                            'Hash': ipfs.put(data),
+                            'Size': str(len(data))
+                        }))
+                    # The real API streams one JSON object per line for multi-file adds
+                    self._reply(200, "\n".join(replies).encode('utf-8'))
+                elif url.path.endswith('/cat'):
+                    self.rfile.read(length)
+                    with ipfs._lock:
+                        ipfs.requests['cat'] += 1
+                    cid = parse_qs(url.query).get('arg', [''])[0]
+                    data = ipfs.blocks.get(cid)
+                    if data is None:
+                        self._reply(500, json.dumps({'Message': 'block not found'}).encode('utf-8'))
+                    else:
+                        self._reply(200, data, 'text/plain')
+                else:
+                    self.rfile.read(length)
+                    self._reply(404, b'{"Message": "not supported by fake IPFS"}')
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="fake-ipfs", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
@@ -0,0 +1,106 @@
+import json
+import threading
+from collections import Counter
+from collections.abc import Mapping
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from web3 import Web3, EthereumTesterProvider
+
+
+class LocalChain:
+    """
+    In-process py-evm chain (EthereumTesterProvider) served over JSON-RPC/HTTP.
+
+    The app talks to it exactly as it would to Ganache, so connection
+    pooling and JSON-RPC batching are exercised too. Every HTTP request and
+    every JSON-RPC call (by method) is counted; seeding through self.w3
+    bypasses HTTP and is not counted.
+    """
+
+    def __init__(self):
+        self.provider = EthereumTesterProvider()
+        self.w3 = Web3(self.provider)
+        self._request = self.provider.request_func(self.w3, self.w3.middleware_onion)
+        self.lock = threading.Lock()
+        self.http_requests = 0
+        self.calls = Counter()
+        self._server = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def snapshot(self):
+        """Current counters, for diffing around a measured operation."""
+        with self.lock:
+            return self.http_requests, Counter(self.calls)
+
+    def _call(self, request):
+        with self.lock:
+            self.calls[request.get('method')] += 1
+            try:
+                reply = to_rpc(dict(self._request(request['method'], request.get('params', []))))
+            except Exception as e:
+                reply = {'error': {'code': -32000, 'message': str(e)}}
+        reply['id'] = request.get('id')
+        reply['jsonrpc'] = '2.0'
+        return reply
+
+    def start(self, port=0):
+        chain = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without this keep-alive
+            # requests stall ~40ms on delayed ACKs
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with chain.lock:
+                    chain.http_requests += 1
+                if isinstance(body, list):
+                    replies = [chain._call(request) for request in body]
+                else:
+                    replies = chain._call(body)
+                data = json.dumps(replies, default=to_json).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="local-chain", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+
+
+def to_rpc(value):
+    """Encode integers as hex quantities, as a real node's JSON-RPC replies do."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return hex(value)
+    if isinstance(value, Mapping):
+        return {key: value[key] if key in ('id', 'jsonrpc') else to_rpc(value[key]) for key in value}
+    if isinstance(value, (list, tuple)):
+        return [to_rpc(item) for item in value]
+    return value
+
+
+def to_json(value):
+    """JSON encoder for the web3 result types eth-tester hands back."""
+    if isinstance(value, (bytes, bytearray)):
+        return '0x' + bytes(value).hex()
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return str(value)
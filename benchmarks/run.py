@@ -0,0 +1,347 @@
+"""
+Offline benchmark for the forum's read and vote paths.
+
+Deploys DiscussionForum to an in-process py-evm chain (served over
+JSON-RPC/HTTP so the app's pooled provider and batching are exercised),
+serves IPFS /add and /cat from an in-memory stand-in, seeds 100, 1k and
+10k posts and reports latency plus RPC and IPFS request counts for
+get_all_posts, get_post, vote_post and the Flask pages. Results go to a
+JSON file that later runs can be compared against:
+
+    pip install "eth-tester[py-evm]"
+    python -m benchmarks.run
+    python -m benchmarks.run --compare benchmarks/baseline.json --output /tmp/bench.json
+
+Compiling needs solc 0.8.0 (installed by py-solc-x on first run); pass
+--compiled with a saved compiled_code.json to skip it.
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(ROOT_DIR, "benchmarks", "baseline.json")
+
+SOLC_VERSION = "0.8.0"
+SIZES = (100, 1000, 10000)
+
+# Ratio of the new p50 to the baseline p50 above which a result is flagged
+REGRESSION_THRESHOLD = 1.2
+
+WORDS = (
+    "market rally growth strong gains record profit good great excellent "
+    "crash loss weak decline fear bad terrible poor risk warning "
+    "report update council city budget vote plan team season release "
+    "network protocol chain block token wallet node storage upgrade"
+).split()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark BlockTalks against a local chain and IPFS stand-in")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SIZES),
+                        help="Comma-separated post counts to seed (cumulative)")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed runs per operation")
+    parser.add_argument("--contract", default="DiscussionForum",
+                        choices=("DiscussionForum", "DiscussionForumV2"), help="Contract to deploy")
+    parser.add_argument("--compiled", help="Saved solc standard-JSON output to use instead of compiling")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Where to write the results")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--watch-interval", type=float, default=0,
+                        help="CHAIN_WATCH_INTERVAL for the app (0 leaves the read caches off)")
+    parser.add_argument("--ipfs-latency", type=float, default=0, help="Seconds the IPFS stand-in waits per request")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for generated posts")
+    return parser.parse_args()
+
+
+def configure_environment(args, workdir, chain_url, ipfs_url):
+    """Point the app at the local servers; must run before any repo module is imported."""
+    os.environ.update({
+        "WEB3_PROVIDER_URI": chain_url,
+        "IPFS_API_URL": ipfs_url,
+        "FORUM_INDEX_PATH": os.path.join(workdir, "forum_index.db"),
+        "SENTIMENT_CACHE_PATH": "",
+        "IPFS_CACHE_DIR": "",
+        "IPFS_GATEWAYS": "",
+        "CHAIN_WATCH_INTERVAL": str(args.watch_interval),
+        "SENTIMENT_FLUSH_INTERVAL": "0.2",
+    })
+    for path in (ROOT_DIR, os.path.join(ROOT_DIR, "app")):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+
+def load_contract_output(args):
+    """Return (abi, bytecode) for the contract being benchmarked."""
+    source_name = f"{args.contract}.sol"
+    if args.compiled:
+        with open(args.compiled, "r") as file:
+            compiled = json.load(file)
+    else:
+        from solcx import compile_standard, install_solc
+        install_solc(SOLC_VERSION)
+        with open(os.path.join(ROOT_DIR, "contracts", source_name), "r") as file:
+            source = file.read()
+        compiled = compile_standard(
+            {
+                "language": "Solidity",
+                "sources": {source_name: {"content": source}},
+                "settings": {"outputSelection": {"*": {"*": ["abi", "evm.bytecode"]}}},
+            },
+            solc_version=SOLC_VERSION,
+        )
+    output = compiled["contracts"][source_name][args.contract]
+    return output["abi"], output["evm"]["bytecode"]["object"]
+
+
+def deploy(chain, abi, bytecode, workdir):
+    """Deploy the contract and write the artifacts ForumClient reads."""
+    w3 = chain.w3
+    with chain.lock:
+        tx_hash = w3.eth.contract(abi=abi, bytecode=bytecode).constructor().transact({'from': w3.eth.accounts[0]})
+        address = w3.eth.wait_for_transaction_receipt(tx_hash).contractAddress
+    with open(os.path.join(workdir, "forum_contract_address.txt"), "w") as file:
+        file.write(address)
+    with open(os.path.join(workdir, "forum_abi.json"), "w") as file:
+        json.dump(abi, file)
+    return w3.eth.contract(address=address, abi=abi)
+
+
+def generate_post(rng, author, number):
+    """Title, IPFS JSON body and news flag for one generated post."""
+    title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8))).capitalize()
+    sentences = [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))).capitalize() + "."
+        for _ in range(rng.randint(2, 10))
+    ]
+    body = json.dumps({
+        "title": title,
+        "content": " ".join(sentences),
+        "author": author,
+        "timestamp": int(time.time()) - number
+    })
+    return title, body, rng.random() < 0.5
+
+
+def seed_posts(chain, ipfs, contract, target, rng):
+    """
+    Create posts until the contract holds target of them.
+
+    Goes straight to the chain and the IPFS store, so seeding is not counted.
+    """
+    from scripts.interact import content_hash_argument
+
+    w3 = chain.w3
+    accounts = w3.eth.accounts
+    with chain.lock:
+        count = contract.functions.postCount().call()
+    started = time.perf_counter()
+    while count < target:
+        author = accounts[count % len(accounts)]
+        title, body, is_news = generate_post(rng, author, count)
+        content_hash = content_hash_argument(contract, ipfs.put(body))
+        with chain.lock:
+            contract.functions.createPost(title, content_hash, is_news).transact({'from': author, 'gas': 1000000})
+        count += 1
+        if count % 1000 == 0:
+            print(f"  seeded {count}/{target} posts ({time.perf_counter() - started:.0f}s)")
+    return count
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3)
+    }
+
+
+def measure(chain, ipfs, operation, iterations):
+    """
+    Time one operation: a first (cold) call, then iterations more.
+
+    Args:
+        operation (callable): Called with the iteration number (0 is the cold call)
+
+    Returns:
+        dict: Latency summary plus RPC and IPFS request counts per call
+    """
+    http_before, calls_before = chain.snapshot()
+    ipfs_before = ipfs.snapshot()
+    samples = []
+    for i in range(iterations + 1):
+        started = time.perf_counter()
+        operation(i)
+        samples.append(time.perf_counter() - started)
+    http_after, calls_after = chain.snapshot()
+    ipfs_after = ipfs.snapshot()
+
+    calls = calls_after - calls_before
+    runs = iterations + 1
+    result = {"cold_ms": round(samples[0] * 1000, 3), "iterations": iterations}
+    result.update(summarize(samples[1:] or samples))
+    result.update({
+        "rpc_http_requests_per_call": round((http_after - http_before) / runs, 2),
+        "rpc_calls_per_call": round(sum(calls.values()) / runs, 2),
+        "rpc_methods": {method: round(count / runs, 2) for method, count in sorted(calls.items())},
+        "ipfs_requests_per_call": {
+            endpoint: round((ipfs_after[endpoint] - ipfs_before[endpoint]) / runs, 2)
+            for endpoint in ipfs_after
+        }
+    })
+    return result
+
+
+def run_size(chain, ipfs, flask_app, post_count, args, rng, voters):
+    """Run every benchmark against the current chain state."""
+    from scripts import interact
+
+    accounts = chain.w3.eth.accounts
+    post_ids = [rng.randint(1, post_count) for _ in range(args.iterations + 1)]
+    authors = [accounts[rng.randrange(len(accounts))] for _ in range(args.iterations + 1)]
+    client = flask_app.app.test_client()
+
+    def vote(i):
+        # Every vote is a fresh (post, voter) pair, so none are rejected as duplicates
+        post_id, account_index = next(voters)
+        ok, result = interact.vote_post(post_id, i % 2 == 0, account_index=account_index)
+        if not ok:
+            raise RuntimeError(f"vote_post({post_id}) failed: {result}")
+
+    def page(path):
+        def get(i):
+            response = client.get(path(i))
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {path(i)} returned {response.status_code}")
+        return get
+
+    operations = (
+        ("get_all_posts", lambda i: interact.get_all_posts()),
+        ("get_post", lambda i: interact.get_post(post_ids[i])),
+        ("vote_post", vote),
+        ("GET /", page(lambda i: "/")),
+        ("GET /post/<id>", page(lambda i: f"/post/{post_ids[i]}")),
+        ("GET /api/post/<id>/content", page(lambda i: f"/api/post/{post_ids[i]}/content")),
+        ("GET /user/<address>", page(lambda i: f"/user/{authors[i]}")),
+    )
+    results = {}
+    for name, operation in operations:
+        results[name] = measure(chain, ipfs, operation, args.iterations)
+        print(
+            f"  {name:26} cold {results[name]['cold_ms']:>9.1f} ms  "
+            f"p50 {results[name]['p50_ms']:>8.1f} ms  p95 {results[name]['p95_ms']:>8.1f} ms  "
+            f"rpc {results[name]['rpc_http_requests_per_call']:>6} req / {results[name]['rpc_calls_per_call']:>6} calls"
+        )
+    return results
+
+
+def vote_pairs(post_count_of, account_count):
+    """Yield (post_id, account_index) pairs that have not voted yet, newest posts first."""
+    used = set()
+    while True:
+        post_count = post_count_of()
+        pair = next((
+            (post_id, account_index)
+            for account_index in range(1, account_count)
+            for post_id in range(post_count, 0, -1)
+            if (post_id, account_index) not in used
+        ), None)
+        if pair is None:
+            raise RuntimeError("Every account has voted on every post")
+        used.add(pair)
+        yield pair
+
+
+def compare(results, baseline_path):
+    """Print p50 changes against an earlier results file; returns the number of regressions."""
+    if not os.path.exists(baseline_path):
+        raise SystemExit(f"No baseline at {baseline_path}; run python -m benchmarks.run without --compare to record one")
+    with open(baseline_path, "r") as file:
+        baseline = json.load(file)["results"]
+    regressions = 0
+    print(f"\nCompared with {baseline_path}:")
+    for size, operations in results.items():
+        for name, result in operations.items():
+            before = baseline.get(size, {}).get(name)
+            if not before or not before["p50_ms"]:
+                continue
+            ratio = result["p50_ms"] / before["p50_ms"]
+            flag = ""
+            if ratio > REGRESSION_THRESHOLD:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(
+                f"  {size:>6} {name:20} p50 {before['p50_ms']:>8.1f} -> {result['p50_ms']:>8.1f} ms "
+                f"({ratio:.2f}x)  rpc calls {before['rpc_calls_per_call']} -> {result['rpc_calls_per_call']}{flag}"
+            )
+    return regressions
+
+
+def main():
+    args = parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    rng = random.Random(args.seed)
+
+    # The stand-ins only need the web3 and scripts.cid imports, which read no settings
+    sys.path.insert(0, ROOT_DIR)
+    from benchmarks.local_chain import LocalChain
+    from benchmarks.fake_ipfs import FakeIPFS
+
+    chain = LocalChain().start()
+    ipfs = FakeIPFS(latency=args.ipfs_latency).start()
+    workdir = tempfile.mkdtemp(prefix="blocktalks-bench-")
+    configure_environment(args, workdir, chain.url, ipfs.url)
+    # ForumClient looks for the deployment artifacts in the working directory first
+    os.chdir(workdir)
+
+    abi, bytecode = load_contract_output(args)
+    contract = deploy(chain, abi, bytecode, workdir)
+    print(f"Deployed {args.contract} at {contract.address}, chain {chain.url}, IPFS {ipfs.url}")
+
+    flask_app = importlib.import_module("app")
+    flask_app.app.config["TESTING"] = True
+
+    def post_count():
+        with chain.lock:
+            return contract.functions.postCount().call()
+
+    voters = vote_pairs(post_count, len(chain.w3.eth.accounts))
+    results = {}
+    for size in sizes:
+        print(f"\nSeeding {size} posts...")
+        seed_posts(chain, ipfs, contract, size, rng)
+        print(f"Benchmarking with {size} posts:")
+        results[str(size)] = run_size(chain, ipfs, flask_app, size, args, rng, voters)
+
+    report = {
+        "meta": {
+            "created": int(time.time()),
+            "contract": args.contract,
+            "iterations": args.iterations,
+            "watch_interval": args.watch_interval,
+            "ipfs_latency": args.ipfs_latency,
+            "python": platform.python_version(),
+            "platform": platform.platform()
+        },
+        "results": results
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+    print(f"\nResults written to {args.output}")
+
+    regressions = compare(results, args.compare) if args.compare else 0
+    chain.stop()
+    ipfs.stop()
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -156,6 +156,52 @@ contract DiscussionForum {
         );
     }
     
+    // Get up to _count consecutive posts starting at ID _start (IDs past postCount are left out)
+    function getPostsRange(uint256 _start, uint256 _count) public view returns (Post[] memory) {
+        if (_start == 0) {
+            _start = 1;
+        }
+        if (_start > postCount || _count == 0) {
+            return new Post[](0);
+        }
+        
+        // Clamp the range to the last post
+        uint256 available = postCount - _start + 1;
+        if (_count > available) {
+            _count = available;
+        }
+        
+        Post[] memory result = new Post[](_count);
+        for (uint256 i = 0; i < _count; i++) {
+            result[i] = posts[_start + i];
+        }
+        return result;
+    }
+    
+    // Get reputation data for several users at once (same fields as getUserReputation)
+    function getReputations(address[] memory _users) public view returns (
+        uint256[] memory totalPosts,
+        uint256[] memory totalUpvotesReceived,
+        uint256[] memory totalDownvotesReceived,
+        uint256[] memory reputationScores,
+        string[] memory sentimentTags
+    ) {
+        totalPosts = new uint256[](_users.length);
+        totalUpvotesReceived = new uint256[](_users.length);
+        totalDownvotesReceived = new uint256[](_users.length);
+        reputationScores = new uint256[](_users.length);
+        sentimentTags = new string[](_users.length);
+        
+        for (uint256 i = 0; i < _users.length; i++) {
+            UserReputation storage rep = userReputations[_users[i]];
+            totalPosts[i] = rep.totalPosts;
+            totalUpvotesReceived[i] = rep.totalUpvotesReceived;
+            totalDownvotesReceived[i] = rep.totalDownvotesReceived;
+            reputationScores[i] = rep.reputationScore;
+            sentimentTags[i] = rep.sentimentTag;
+        }
+    }
+    
     // Check if user has voted on a post
     function hasUserVoted(uint256 _postId, address _user) public view returns (bool voted, bool isUpvote) {
         if (hasVoted[_postId][_user]) {
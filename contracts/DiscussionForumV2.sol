@@ -0,0 +1,240 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+// Same forum as DiscussionForum with a storage layout packed for gas:
+// the CID is kept as its 32-byte sha256 digest, counters use narrow
+// integers that share a slot, and each vote is a single mapping entry.
+contract DiscussionForumV2 {
+    // Post structure (the post ID is the mapping key, not stored)
+    struct Post {
+        address author;       // slot 0
+        uint64 timestamp;     // slot 0
+        bool isNews;          // slot 0
+        uint32 upvotes;       // slot 1
+        uint32 downvotes;     // slot 1
+        bytes32 contentDigest; // slot 2: sha256 digest of a CIDv0 ("Qm...") IPFS hash, 0 if none
+        string title;
+    }
+    
+    // Post as returned by the views, shaped like DiscussionForum's posts(i)
+    struct PostView {
+        uint256 id;
+        address author;
+        string title;
+        bytes32 contentHash;
+        uint256 timestamp;
+        uint256 upvotes;
+        uint256 downvotes;
+        bool isNews;
+    }
+    
+    // User reputation structure (all counters share one slot)
+    struct UserReputation {
+        uint32 totalPosts;
+        uint32 totalUpvotesReceived;
+        uint32 totalDownvotesReceived;
+        uint32 totalUpvotesGiven;
+        uint32 totalDownvotesGiven;
+        uint16 reputationScore;
+        string sentimentTag;
+    }
+    
+    // Vote states
+    uint8 constant NOT_VOTED = 0;
+    uint8 constant UPVOTED = 1;
+    uint8 constant DOWNVOTED = 2;
+    
+    // Events
+    event PostCreated(uint256 indexed postId, address indexed author, string title, bool isNews, bytes32 contentHash);
+    event PostVoted(uint256 indexed postId, address indexed voter, bool isUpvote);
+    event UserSentimentUpdated(address indexed user, string sentimentTag);
+    
+    // Contract state variables
+    uint256 public postCount;
+    mapping(uint256 => Post) private _posts;
+    mapping(address => UserReputation) public userReputations;
+    mapping(uint256 => mapping(address => uint8)) public voteState;
+    
+    // Create a new post
+    function createPost(string memory _title, bytes32 _contentDigest, bool _isNews) public {
+        // Increment post count
+        postCount++;
+        
+        // Create post (vote counters start at zero and are not written)
+        Post storage post = _posts[postCount];
+        post.author = msg.sender;
+        post.timestamp = uint64(block.timestamp);
+        post.isNews = _isNews;
+        post.contentDigest = _contentDigest;
+        post.title = _title;
+        
+        // Update user's post count
+        UserReputation storage rep = userReputations[msg.sender];
+        rep.totalPosts++;
+        
+        // Calculate reputation score (simple version)
+        calculateReputationScore(rep);
+        
+        // Emit event
+        emit PostCreated(postCount, msg.sender, _title, _isNews, _contentDigest);
+    }
+    
+    // Vote on a post
+    function votePost(uint256 _postId, bool _isUpvote) public {
+        // Require valid post
+        require(_postId > 0 && _postId <= postCount, "Invalid post ID");
+        
+        // Require user has not voted on this post
+        require(voteState[_postId][msg.sender] == NOT_VOTED, "User has already voted on this post");
+        
+        // Get post and both reputations
+        Post storage post = _posts[_postId];
+        UserReputation storage authorRep = userReputations[post.author];
+        UserReputation storage voterRep = userReputations[msg.sender];
+        
+        // Update post votes and record the vote in one entry
+        if (_isUpvote) {
+            post.upvotes++;
+            voteState[_postId][msg.sender] = UPVOTED;
+            voterRep.totalUpvotesGiven++;
+            authorRep.totalUpvotesReceived++;
+        } else {
+            post.downvotes++;
+            voteState[_postId][msg.sender] = DOWNVOTED;
+            voterRep.totalDownvotesGiven++;
+            authorRep.totalDownvotesReceived++;
+        }
+        
+        // Calculate reputation scores
+        calculateReputationScore(authorRep);
+        calculateReputationScore(voterRep);
+        
+        // Emit event
+        emit PostVoted(_postId, msg.sender, _isUpvote);
+    }
+    
+    // Calculate reputation score
+    function calculateReputationScore(UserReputation storage rep) internal {
+        // Calculate reputation score (out of 1000, to avoid floating point)
+        // Base score: 500 (5.0 out of 10)
+        uint256 score = 500;
+        
+        // Adjust based on votes received (more weight)
+        uint256 upvotes = rep.totalUpvotesReceived;
+        uint256 totalVotes = upvotes + rep.totalDownvotesReceived;
+        if (totalVotes > 0) {
+            uint256 voteRatio = (upvotes * 1000) / totalVotes;
+            // Weighted adjustment (60% of total score), in either direction
+            if (voteRatio >= 500) {
+                score = score + ((voteRatio - 500) * 6 / 10);
+            } else {
+                score = score - ((500 - voteRatio) * 6 / 10);
+            }
+        }
+        
+        // Adjust based on post count (less weight)
+        if (rep.totalPosts > 0) {
+            // Max bonus for posts: 100 (1.0 out of 10)
+            uint256 postBonus = uint256(rep.totalPosts) * 10;
+            if (postBonus > 100) postBonus = 100;
+            score += postBonus;
+        }
+        
+        // Cap score at 1000
+        if (score > 1000) score = 1000;
+        
+        // Update reputation score
+        rep.reputationScore = uint16(score);
+    }
+    
+    // Update user sentiment tag
+    function updateUserSentiment(address _user, string memory _sentimentTag) public {
+        userReputations[_user].sentimentTag = _sentimentTag;
+        emit UserSentimentUpdated(_user, _sentimentTag);
+    }
+    
+    // Get a post, shaped like DiscussionForum's posts(i) with the CID digest as bytes32
+    function posts(uint256 _postId) public view returns (PostView memory) {
+        Post storage post = _posts[_postId];
+        return PostView(
+            post.author == address(0) ? 0 : _postId,
+            post.author,
+            post.title,
+            post.contentDigest,
+            post.timestamp,
+            post.upvotes,
+            post.downvotes,
+            post.isNews
+        );
+    }
+    
+    // Get up to _count consecutive posts starting at ID _start (IDs past postCount are left out)
+    function getPostsRange(uint256 _start, uint256 _count) public view returns (PostView[] memory) {
+        if (_start == 0) {
+            _start = 1;
+        }
+        if (_start > postCount || _count == 0) {
+            return new PostView[](0);
+        }
+        
+        // Clamp the range to the last post
+        uint256 available = postCount - _start + 1;
+        if (_count > available) {
+            _count = available;
+        }
+        
+        PostView[] memory result = new PostView[](_count);
+        for (uint256 i = 0; i < _count; i++) {
+            result[i] = posts(_start + i);
+        }
+        return result;
+    }
+    
+    // Get user reputation data
+    function getUserReputation(address _user) public view returns (
+        uint256 totalPosts,
+        uint256 totalUpvotesReceived,
+        uint256 totalDownvotesReceived,
+        uint256 reputationScore,
+        string memory sentimentTag
+    ) {
+        UserReputation storage rep = userReputations[_user];
+        return (
+            rep.totalPosts,
+            rep.totalUpvotesReceived,
+            rep.totalDownvotesReceived,
+            rep.reputationScore,
+            rep.sentimentTag
+        );
+    }
+    
+    // Get reputation data for several users at once (same fields as getUserReputation)
+    function getReputations(address[] memory _users) public view returns (
+        uint256[] memory totalPosts,
+        uint256[] memory totalUpvotesReceived,
+        uint256[] memory totalDownvotesReceived,
+        uint256[] memory reputationScores,
+        string[] memory sentimentTags
+    ) {
+        totalPosts = new uint256[](_users.length);
+        totalUpvotesReceived = new uint256[](_users.length);
+        totalDownvotesReceived = new uint256[](_users.length);
+        reputationScores = new uint256[](_users.length);
+        sentimentTags = new string[](_users.length);
+        
+        for (uint256 i = 0; i < _users.length; i++) {
+            UserReputation storage rep = userReputations[_users[i]];
+            totalPosts[i] = rep.totalPosts;
+            totalUpvotesReceived[i] = rep.totalUpvotesReceived;
+            totalDownvotesReceived[i] = rep.totalDownvotesReceived;
+            reputationScores[i] = rep.reputationScore;
+            sentimentTags[i] = rep.sentimentTag;
+        }
+    }
+    
+    // Check if user has voted on a post
+    function hasUserVoted(uint256 _postId, address _user) public view returns (bool voted, bool isUpvote) {
+        uint8 state = voteState[_postId][_user];
+        return (state != NOT_VOTED, state == UPVOTED);
+    }
+}
@@ -1,6 +1,7 @@
 from web3 import Web3
 import json
 import os
+from scripts.batch_rpc import batch_call, BatchCallError
 
 print("=== Post Author Verification Script ===")
 
@@ -25,8 +26,11 @@ print(f"Total posts on forum: {post_count}")
 # Check each post's author
 print("\nPosts and authors:")
 print("-" * 50)
-for i in range(1, post_count + 1):
-    post = contract.functions.posts(i).call()
+posts = batch_call(w3, [contract.functions.posts(i) for i in range(1, post_count + 1)])
+for post in posts:
+    if isinstance(post, BatchCallError):
+        print(f"Error reading post: {post}")
+        continue
     post_id = post[0]
     author = post[1]
     title = post[2]
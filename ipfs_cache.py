@@ -0,0 +1,213 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Cache configuration (set IPFS_CACHE_DIR to an empty string for memory only)
+IPFS_CACHE_DIR = os.getenv("IPFS_CACHE_DIR", ".ipfs_cache")
+IPFS_CACHE_MEMORY_BYTES = int(os.getenv("IPFS_CACHE_MEMORY_BYTES", str(16 * 1024 * 1024)))
+IPFS_CACHE_DISK_BYTES = int(os.getenv("IPFS_CACHE_DISK_BYTES", str(256 * 1024 * 1024)))
+IPFS_CACHE_NEGATIVE_TTL = float(os.getenv("IPFS_CACHE_NEGATIVE_TTL", "30"))
+
+# CIDs are base58/base32 strings; anything else is never used as a file name
+CID_PATTERN = re.compile(r"^[A-Za-z0-9]+$")
+
+
+class ContentCache:
+    """
+    Content-addressed cache for IPFS reads.
+
+    CIDs never change what they point to, so entries never expire. Lookups
+    go to a byte-bounded in-memory LRU first, then to an on-disk store that
+    survives restarts (also bounded, oldest-used files evicted first). CIDs
+    that failed to resolve are remembered for negative_ttl seconds so a
+    missing post does not hit the daemon on every page view.
+    """
+
+    def __init__(self, memory_bytes=None, disk_dir=None, disk_bytes=None, negative_ttl=None):
+        self.memory_bytes = IPFS_CACHE_MEMORY_BYTES if memory_bytes is None else memory_bytes
+        self.disk_dir = IPFS_CACHE_DIR if disk_dir is None else disk_dir
+        self.disk_bytes = IPFS_CACHE_DISK_BYTES if disk_bytes is None else disk_bytes
+        self.negative_ttl = IPFS_CACHE_NEGATIVE_TTL if negative_ttl is None else negative_ttl
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # cid -> content, least recently used first
+        self._memory_size = 0
+        self._disk = OrderedDict()  # cid -> size in bytes, least recently used first
+        self._disk_size = 0
+        self._missing = {}  # cid -> time the negative entry expires
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'negative_hits': 0,
+            'evictions': 0
+        }
+
+        if self.disk_dir:
+            self._load_disk_index()
+
+    def _load_disk_index(self):
+        os.makedirs(self.disk_dir, exist_ok=True)
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            path = os.path.join(self.disk_dir, name)
+            if CID_PATTERN.match(name) and os.path.isfile(path):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._disk[name] = size
+            self._disk_size += size
+
+    def _disk_path(self, cid):
+        return os.path.join(self.disk_dir, cid)
+
+    def _remember(self, cid, content):
+        size = len(content.encode('utf-8'))
+        if size > self.memory_bytes:
+            return
+        if cid in self._memory:
+            self._memory_size -= len(self._memory.pop(cid).encode('utf-8'))
+        self._memory[cid] = content
+        self._memory_size += size
+        while self._memory_size > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted.encode('utf-8'))
+            self.stats['evictions'] += 1
+
+    def _write_disk(self, cid, content):
+        data = content.encode('utf-8')
+        if not self.disk_dir or len(data) > self.disk_bytes or cid in self._disk:
+            return
+        try:
+            # Write to a temporary file first so readers never see half a file
+            tmp_path = f"{self._disk_path(cid)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(data)
+            os.replace(tmp_path, self._disk_path(cid))
+        except OSError as e:
+            print(f"Error writing IPFS cache entry {cid}: {str(e)}")
+            return
+        self._disk[cid] = len(data)
+        self._disk_size += len(data)
+        while self._disk_size > self.disk_bytes:
+            evicted, size = self._disk.popitem(last=False)
+            self._disk_size -= size
+            self.stats['evictions'] += 1
+            try:
+                os.remove(self._disk_path(evicted))
+            except OSError:
+                pass
+
+    def _read_disk(self, cid):
+        if not self.disk_dir or cid not in self._disk:
+            return None
+        try:
+            with open(self._disk_path(cid), "rb") as file:
+                content = file.read().decode('utf-8')
+            os.utime(self._disk_path(cid))
+        except OSError:
+            self._disk_size -= self._disk.pop(cid)
+            return None
+        self._disk.move_to_end(cid)
+        return content
+
+    def get(self, cid):
+        """
+        Look a CID up in memory, then on disk.
+
+        Returns:
+            str: Cached content, or None on a miss
+        """
+        if not cid or not CID_PATTERN.match(cid):
+            return None
+        with self._lock:
+            if cid in self._memory:
+                self._memory.move_to_end(cid)
+                self.stats['memory_hits'] += 1
+                return self._memory[cid]
+            content = self._read_disk(cid)
+            if content is not None:
+                self.stats['disk_hits'] += 1
+                self._remember(cid, content)
+                return content
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, cid, content):
+        """Store resolved content for a CID in both tiers."""
+        if not cid or not CID_PATTERN.match(cid) or content is None:
+            return
+        with self._lock:
+            self._missing.pop(cid, None)
+            self._remember(cid, content)
+            self._write_disk(cid, content)
+
+    def mark_missing(self, cid):
+        """Remember that a CID failed to resolve, for negative_ttl seconds."""
+        with self._lock:
+            self._missing[cid] = time.time() + self.negative_ttl
+
+    def is_missing(self, cid):
+        """True while a recent failure to resolve the CID is still cached."""
+        with self._lock:
+            expires = self._missing.get(cid)
+            if expires is None:
+                return False
+            if expires < time.time():
+                del self._missing[cid]
+                return False
+            self.stats['negative_hits'] += 1
+            return True
+
+    def fetch(self, cid, loader):
+        """
+        Return the content for a CID, calling loader(cid) only on a miss.
+
+        Args:
+            cid (str): IPFS content hash
+            loader (callable): Fetches the content, returning None on failure
+
+        Returns:
+            str: Content, or None if it could not be resolved
+        """
+        content = self.get(cid)
+        if content is not None:
+            return content
+        if self.is_missing(cid):
+            return None
+        content = loader(cid)
+        if content is None:
+            self.mark_missing(cid)
+        else:
+            self.put(cid, content)
+        return content
+
+    def get_stats(self):
+        """Hit/miss counters plus current tier sizes."""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory_size
+            stats['disk_entries'] = len(self._disk)
+            stats['disk_bytes'] = self._disk_size
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_content_cache():
+    """Return the process-wide ContentCache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ContentCache()
+    return _cache
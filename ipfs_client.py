@@ -0,0 +1,788 @@
+import asyncio
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, FIRST_COMPLETED, wait
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from ipfs_cache import get_content_cache
+from scripts.metrics import timed, track, propagate
+from scripts.background_loop import get_background_loop
+from scripts.cid import verify_cid
+
+# Load environment variables
+load_dotenv()
+
+# IPFS Configuration
+# IPFS_API_URL is the HTTP API root; IPFS_API (a multiaddr, as ipfshttpclient used) is still honoured
+IPFS_API = os.getenv("IPFS_API", "/ip4/127.0.0.1/tcp/5001")
+IPFS_GATEWAY = os.getenv("IPFS_GATEWAY", "https://ipfs.io/ipfs/")
+# Gateways that hedged reads fall back to, comma separated (empty for local-only reads)
+IPFS_GATEWAYS = [
+    gateway.strip().rstrip("/") + "/"
+    for gateway in os.getenv("IPFS_GATEWAYS", IPFS_GATEWAY).split(",")
+    if gateway.strip()
+]
+
+# Connection pool and timeouts (seconds); IPFS_TIMEOUT is the read timeout and the list-page deadline
+IPFS_POOL_SIZE = int(os.getenv("IPFS_POOL_SIZE", "20"))
+IPFS_CONNECT_TIMEOUT = float(os.getenv("IPFS_CONNECT_TIMEOUT", "3"))
+IPFS_TIMEOUT = float(os.getenv("IPFS_TIMEOUT", "5"))
+IPFS_FETCH_WORKERS = int(os.getenv("IPFS_FETCH_WORKERS", "8"))
+
+# Hedged reads: the next backend is asked once the ones already asked have
+# had their usual time (this percentile of recent reads) to answer.
+# IPFS_HEDGE_DELAY is used until a backend has IPFS_HEDGE_MIN_SAMPLES reads.
+IPFS_HEDGE_DELAY = float(os.getenv("IPFS_HEDGE_DELAY", "0.3"))
+IPFS_HEDGE_MIN_DELAY = float(os.getenv("IPFS_HEDGE_MIN_DELAY", "0.05"))
+IPFS_HEDGE_MAX_DELAY = float(os.getenv("IPFS_HEDGE_MAX_DELAY", "2"))
+IPFS_HEDGE_PERCENTILE = float(os.getenv("IPFS_HEDGE_PERCENTILE", "0.95"))
+IPFS_HEDGE_MIN_SAMPLES = 10
+IPFS_LATENCY_WINDOW = 200
+# A backend that failed this many reads in a row is asked last and not waited for
+IPFS_BACKEND_MAX_FAILURES = 3
+
+# Backend name of the local node in latency stats and metrics
+LOCAL_BACKEND = "local"
+
+# Version of the post document build_post_json writes. Version 1 (no
+# "version" key) holds only title, content, author and timestamp.
+POST_ENVELOPE_VERSION = 2
+
+# Pinata API (optional)
+PINATA_API_KEY = os.getenv("PINATA_API_KEY", "")
+PINATA_SECRET_API_KEY = os.getenv("PINATA_SECRET_API_KEY", "")
+PINATA_PIN_URL = "https://api.pinata.cloud/pinning/pinByHash"
+
+
+def multiaddr_to_url(multiaddr):
+    """
+    Turn an API multiaddr such as /ip4/127.0.0.1/tcp/5001 into its HTTP API URL.
+
+    Args:
+        multiaddr (str): /ip4, /ip6 or /dns multiaddr with a /tcp port, optionally ending in /https
+
+    Returns:
+        str: Base URL of the HTTP API, e.g. http://127.0.0.1:5001/api/v0
+    """
+    parts = multiaddr.strip("/").split("/")
+    host = parts[1] if len(parts) > 1 else "127.0.0.1"
+    if parts[0] == "ip6":
+        host = f"[{host}]"
+    port = parts[parts.index("tcp") + 1] if "tcp" in parts else "5001"
+    scheme = "https" if "https" in parts else "http"
+    return f"{scheme}://{host}:{port}/api/v0"
+
+
+IPFS_API_URL = os.getenv("IPFS_API_URL") or multiaddr_to_url(IPFS_API)
+
+
+class BackendStats:
+    """
+    Recent read latencies of the local node and each gateway.
+
+    Hedged reads use them to decide how long to wait for a backend before
+    also asking the next one, and in which order to ask the gateways. Only
+    reads that finished are measured; cancelled losers are not.
+    """
+
+    def __init__(self, window=None):
+        self._lock = threading.Lock()
+        self.window = window or IPFS_LATENCY_WINDOW
+        self._latencies = {}  # backend -> recent successful read times
+        self._failures = {}   # backend -> consecutive failed reads
+
+    def record(self, backend, seconds, ok):
+        with self._lock:
+            if ok:
+                self._latencies.setdefault(backend, deque(maxlen=self.window)).append(seconds)
+                self._failures[backend] = 0
+            else:
+                self._failures[backend] = self._failures.get(backend, 0) + 1
+
+    def _percentile(self, backend, percentile):
+        samples = sorted(self._latencies.get(backend, ()))
+        if len(samples) < IPFS_HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percentile))]
+
+    def hedge_delay(self, backend):
+        """Seconds to wait for backend before asking the next one."""
+        with self._lock:
+            if self._failures.get(backend, 0) >= IPFS_BACKEND_MAX_FAILURES:
+                return 0
+            delay = self._percentile(backend, IPFS_HEDGE_PERCENTILE)
+        if delay is None:
+            return IPFS_HEDGE_DELAY
+        return min(max(delay, IPFS_HEDGE_MIN_DELAY), IPFS_HEDGE_MAX_DELAY)
+
+    def rank(self, gateways):
+        """Gateways in the order to ask them: failing ones last, then by median latency."""
+        with self._lock:
+            keys = {
+                gateway: (
+                    self._failures.get(gateway, 0) >= IPFS_BACKEND_MAX_FAILURES,
+                    self._percentile(gateway, 0.5) or IPFS_HEDGE_DELAY
+                )
+                for gateway in gateways
+            }
+        # Stable, so unmeasured gateways keep their configured order
+        return sorted(gateways, key=keys.get)
+
+    def get_stats(self):
+        """Per-backend sample count, median, hedge delay and failure streak."""
+        with self._lock:
+            backends = set(self._latencies) | set(self._failures)
+            stats = {
+                backend: {
+                    'samples': len(self._latencies.get(backend, ())),
+                    'p50': self._percentile(backend, 0.5),
+                    'failures': self._failures.get(backend, 0)
+                }
+                for backend in backends
+            }
+        for backend in stats:
+            stats[backend]['hedge_delay'] = self.hedge_delay(backend)
+        return stats
+
+
+def accept_content(backend, content_hash, data):
+    """
+    Check fetched bytes against their CID before they can win a hedged read.
+
+    Content that cannot be checked (a file spanning several blocks) is only
+    trusted from the local node, which verifies blocks itself.
+    """
+    verified = verify_cid(content_hash, data)
+    if verified is False:
+        print(f"Discarding content for {content_hash} from {backend}: does not match the CID")
+        return False
+    if verified is None and backend != LOCAL_BACKEND:
+        print(f"Discarding content for {content_hash} from {backend}: cannot be verified")
+        return False
+    return True
+
+
+def pinata_headers():
+    return {
+        'Content-Type': 'application/json',
+        'pinata_api_key': PINATA_API_KEY,
+        'pinata_secret_api_key': PINATA_SECRET_API_KEY
+    }
+
+
+class IPFSClient:
+    """
+    Blocking IPFS HTTP API client over one keep-alive connection pool.
+
+    Every call shares a requests.Session, so list pages that fetch dozens
+    of posts reuse connections instead of opening one per CID. Reads are
+    hedged: the local node is asked first and the gateways one by one after
+    it, each when the ones before it have not answered in their usual time.
+    The first response that matches the CID wins.
+    """
+
+    def __init__(self, api_url=None, gateways=None, pool_size=None, connect_timeout=None, read_timeout=None):
+        self.api_url = api_url or IPFS_API_URL
+        self.gateways = IPFS_GATEWAYS if gateways is None else gateways
+        self.timeout = (
+            IPFS_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout,
+            IPFS_TIMEOUT if read_timeout is None else read_timeout
+        )
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size or IPFS_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # Runs the backend requests of hedged reads
+        self._hedge_pool = ThreadPoolExecutor(
+            max_workers=pool_size or IPFS_POOL_SIZE, thread_name_prefix="ipfs-hedge"
+        )
+        # Requests of reads still in progress, cancelled on close()
+        self._hedge_futures = set()
+        self._hedge_lock = threading.Lock()
+
+    def add(self, content, pin=True):
+        """
+        Add content to the node.
+
+        Returns:
+            str: The CID, or None on failure
+        """
+        try:
+            response = self.session.post(
+                f"{self.api_url}/add",
+                files={'file': content},
+                params={'pin': 'true' if pin else 'false'},
+                timeout=self.timeout
+            )
+            if response.status_code == 200:
+                return response.json().get('Hash')
+            print(f"Failed to add to IPFS: {response.status_code} {response.text}")
+        except Exception as e:
+            print(f"Error adding to IPFS: {str(e)}")
+        return None
+
+    def add_many(self, contents, pin=True):
+        """
+        Add several documents with one multi-file /add request.
+
+        Returns:
+            list: CIDs in the same order as contents, None for any that failed
+        """
+        files = [('file', (str(i), content)) for i, content in enumerate(contents)]
+        try:
+            response = self.session.post(
+                f"{self.api_url}/add",
+                files=files,
+                params={'pin': 'true' if pin else 'false'},
+                timeout=self.timeout
+            )
+            if response.status_code != 200:
+                print(f"Failed to add to IPFS: {response.status_code} {response.text}")
+                return [None] * len(contents)
+            # One JSON object per line, named after the multipart file names
+            hashes = {}
+            for line in response.text.splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    hashes[entry.get('Name')] = entry.get('Hash')
+            return [hashes.get(str(i)) for i in range(len(contents))]
+        except Exception as e:
+            print(f"Error adding to IPFS: {str(e)}")
+            return [None] * len(contents)
+
+    def _fetch(self, backend, content_hash, cancelled):
+        """One backend's attempt at a hedged read; returns the content or None."""
+        started = time.perf_counter()
+        ok = False
+        try:
+            with track("ipfs_backend", backend):
+                if backend == LOCAL_BACKEND:
+                    response = self.session.post(
+                        f"{self.api_url}/cat", params={'arg': content_hash}, timeout=self.timeout, stream=True
+                    )
+                else:
+                    response = self.session.get(f"{backend}{content_hash}", timeout=self.timeout, stream=True)
+                with response:
+                    if response.status_code != 200:
+                        print(f"Failed to get {content_hash} from {backend}: {response.status_code}")
+                        return None
+                    chunks = []
+                    # A losing request stops at the next chunk instead of reading the whole body
+                    for chunk in response.iter_content(65536):
+                        if cancelled.is_set():
+                            return None
+                        chunks.append(chunk)
+                data = b"".join(chunks)
+            if not accept_content(backend, content_hash, data):
+                return None
+            content = data.decode('utf-8')
+            ok = True
+            return content
+        except Exception as e:
+            if not cancelled.is_set():
+                print(f"Error getting {content_hash} from {backend}: {str(e)}")
+            return None
+        finally:
+            if ok or not cancelled.is_set():
+                get_backend_stats().record(backend, time.perf_counter() - started, ok)
+
+    def cat(self, content_hash):
+        """
+        Read content with a hedged request across the local node and the gateways.
+
+        Returns:
+            str: The first verified content, or None if every backend failed
+        """
+        stats = get_backend_stats()
+        backends = [LOCAL_BACKEND] + stats.rank(self.gateways)
+        cancelled = threading.Event()
+        pending = set()
+        submitted = []
+        next_start = time.monotonic()
+        try:
+            while True:
+                if backends and (time.monotonic() >= next_start or not pending):
+                    backend = backends.pop(0)
+                    future = self._hedge_pool.submit(propagate(self._fetch), backend, content_hash, cancelled)
+                    pending.add(future)
+                    submitted.append(future)
+                    with self._hedge_lock:
+                        self._hedge_futures.add(future)
+                    next_start = time.monotonic() + stats.hedge_delay(backend)
+                if not pending:
+                    return None
+
+                timeout = max(0, next_start - time.monotonic()) if backends else None
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    content = future.result()
+                    if content is not None:
+                        return content
+                    # A backend that gave up is not worth waiting for
+                    next_start = time.monotonic()
+        finally:
+            cancelled.set()
+            for future in pending:
+                future.cancel()
+            with self._hedge_lock:
+                self._hedge_futures.difference_update(submitted)
+
+    def pin_to_pinata(self, content_hash):
+        """Pin a CID on Pinata so it stays available when the local node is offline."""
+        try:
+            response = self.session.post(
+                PINATA_PIN_URL,
+                json={"hashToPin": content_hash},
+                headers=pinata_headers(),
+                timeout=self.timeout
+            )
+            if response.status_code == 200:
+                print(f"Successfully pinned {content_hash} to Pinata")
+            else:
+                print(f"Failed to pin to Pinata: {response.text}")
+        except Exception as e:
+            print(f"Error pinning to Pinata: {str(e)}")
+
+    def close(self):
+        # Same as shutdown(cancel_futures=True), which needs Python 3.9
+        with self._hedge_lock:
+            for future in self._hedge_futures:
+                future.cancel()
+        self._hedge_pool.shutdown(wait=False)
+        self.session.close()
+
+
+class AsyncIPFSClient:
+    """
+    Non-blocking counterpart of IPFSClient built on aiohttp.
+
+    The aiohttp session lives on the shared background loop, so one
+    connection pool is kept for the life of the process whichever event
+    loop awaits it (Flask runs each async view in a fresh loop).
+    """
+
+    def __init__(self, api_url=None, gateways=None, pool_size=None, connect_timeout=None, read_timeout=None):
+        self.api_url = api_url or IPFS_API_URL
+        self.gateways = IPFS_GATEWAYS if gateways is None else gateways
+        self.pool_size = pool_size or IPFS_POOL_SIZE
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=IPFS_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout,
+            sock_read=IPFS_TIMEOUT if read_timeout is None else read_timeout
+        )
+        self._session = None
+
+    def _get_session(self):
+        # Only ever called on the background loop, so no lock is needed
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=self.timeout
+            )
+        return self._session
+
+    async def _add(self, content, pin):
+        form = aiohttp.FormData()
+        form.add_field('file', content, filename='file')
+        try:
+            async with self._get_session().post(
+                f"{self.api_url}/add", data=form, params={'pin': 'true' if pin else 'false'}
+            ) as response:
+                text = await response.text()
+                if response.status == 200:
+                    return json.loads(text).get('Hash')
+                print(f"Failed to add to IPFS: {response.status} {text}")
+        except Exception as e:
+            print(f"Error adding to IPFS: {str(e)}")
+        return None
+
+    async def _fetch(self, backend, content_hash):
+        started = time.perf_counter()
+        ok = False
+        try:
+            with track("ipfs_backend", backend):
+                if backend == LOCAL_BACKEND:
+                    request = self._get_session().post(f"{self.api_url}/cat", params={'arg': content_hash})
+                else:
+                    request = self._get_session().get(f"{backend}{content_hash}")
+                async with request as response:
+                    data = await response.read()
+                    if response.status != 200:
+                        print(f"Failed to get {content_hash} from {backend}: {response.status}")
+                        return None
+            if not accept_content(backend, content_hash, data):
+                return None
+            content = data.decode('utf-8')
+            ok = True
+            return content
+        except asyncio.CancelledError:
+            # Lost the race; not a failure of the backend
+            started = None
+            raise
+        except Exception as e:
+            print(f"Error getting {content_hash} from {backend}: {str(e) or type(e).__name__}")
+            return None
+        finally:
+            if started is not None:
+                get_backend_stats().record(backend, time.perf_counter() - started, ok)
+
+    async def _cat(self, content_hash):
+        stats = get_backend_stats()
+        backends = [LOCAL_BACKEND] + stats.rank(self.gateways)
+        pending = set()
+        loop = asyncio.get_running_loop()
+        next_start = loop.time()
+        try:
+            while True:
+                if backends and (loop.time() >= next_start or not pending):
+                    backend = backends.pop(0)
+                    pending.add(asyncio.ensure_future(self._fetch(backend, content_hash)))
+                    next_start = loop.time() + stats.hedge_delay(backend)
+                if not pending:
+                    return None
+
+                timeout = max(0, next_start - loop.time()) if backends else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    content = task.result()
+                    if content is not None:
+                        return content
+                    next_start = loop.time()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def add(self, content, pin=True):
+        """Add content to the node; returns the CID or None."""
+        return await get_background_loop().run(self._add(content, pin))
+
+    async def cat(self, content_hash):
+        """Hedged read across the local node and the gateways; returns None on failure."""
+        return await get_background_loop().run(self._cat(content_hash))
+
+    def close(self):
+        if self._session is not None:
+            session, self._session = self._session, None
+            get_background_loop().run_sync(session.close(), timeout=5)
+
+
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+_backend_stats = None
+_backend_stats_lock = threading.Lock()
+
+_fetch_pool = None
+_fetch_pool_lock = threading.Lock()
+
+
+def get_ipfs_client():
+    """Return the process-wide IPFSClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = IPFSClient()
+    return _client
+
+
+def get_fetch_pool():
+    """Return the process-wide pool for concurrent post reads (IPFS_FETCH_WORKERS threads)."""
+    global _fetch_pool
+    if _fetch_pool is None:
+        with _fetch_pool_lock:
+            if _fetch_pool is None:
+                _fetch_pool = ThreadPoolExecutor(
+                    max_workers=IPFS_FETCH_WORKERS, thread_name_prefix="ipfs-fetch"
+                )
+    return _fetch_pool
+
+
+def get_backend_stats():
+    """Return the process-wide BackendStats, shared by the sync and async clients."""
+    global _backend_stats
+    if _backend_stats is None:
+        with _backend_stats_lock:
+            if _backend_stats is None:
+                _backend_stats = BackendStats()
+    return _backend_stats
+
+
+def get_async_ipfs_client():
+    """Return the process-wide AsyncIPFSClient, creating it on first use."""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncIPFSClient()
+                # Close the aiohttp session while its loop thread is still alive
+                atexit.register(_async_client.close)
+    return _async_client
+
+
+def build_post_json(title, content, author, summary=None):
+    """
+    The JSON document a post is stored on IPFS as.
+
+    Args:
+        title (str): Post title
+        content (str): Post content
+        author (str): Author's Ethereum address
+        summary (dict): Fields computed at write time so readers need not
+            recompute them: 'excerpt', 'content_length', 'sentiment', 'polarity'
+
+    Returns:
+        str: The versioned envelope as JSON
+    """
+    document = {
+        "version": POST_ENVELOPE_VERSION,
+        "title": title,
+        "content": content,
+        "author": author,
+        "timestamp": int(time.time())
+    }
+    if summary:
+        document.update(summary)
+    return json.dumps(document)
+
+
+def parse_post_json(json_data):
+    if not json_data:
+        return None
+    try:
+        return json.loads(json_data)
+    except json.JSONDecodeError:
+        print("Error decoding JSON from IPFS")
+        return None
+
+
+def remember_added(content_hash, content):
+    """Cache freshly added content so the first read of a new post skips the node."""
+    if content_hash and isinstance(content, str):
+        get_content_cache().put(content_hash, content)
+
+
+# Blocking API
+
+@timed("ipfs_add")
+def add_to_ipfs(content, pin=True):
+    """
+    Add content to IPFS and return the content hash (CID).
+
+    Args:
+        content (str): The content to add to IPFS
+        pin (bool): Whether to pin the content
+
+    Returns:
+        str: IPFS content hash (CID)
+    """
+    client = get_ipfs_client()
+    content_hash = client.add(content, pin)
+    remember_added(content_hash, content)
+    if content_hash and pin and PINATA_API_KEY and PINATA_SECRET_API_KEY:
+        client.pin_to_pinata(content_hash)
+    return content_hash
+
+
+@timed("ipfs_add")
+def add_many_to_ipfs(contents, pin=True):
+    """
+    Add several documents to IPFS in one request.
+
+    Args:
+        contents (list): Strings to add
+        pin (bool): Whether to pin the content
+
+    Returns:
+        list: CIDs in the same order, None for any that failed
+    """
+    client = get_ipfs_client()
+    content_hashes = client.add_many(contents, pin) if contents else []
+    for content_hash, content in zip(content_hashes, contents):
+        remember_added(content_hash, content)
+        if content_hash and pin and PINATA_API_KEY and PINATA_SECRET_API_KEY:
+            client.pin_to_pinata(content_hash)
+    return content_hashes
+
+
+def pin_to_pinata(content_hash):
+    """
+    Pin content to Pinata cloud service.
+
+    Args:
+        content_hash (str): IPFS content hash to pin
+    """
+    get_ipfs_client().pin_to_pinata(content_hash)
+
+
+@timed("ipfs_get")
+def get_from_ipfs(content_hash):
+    """
+    Retrieve content from IPFS using the content hash.
+
+    Reads go through the shared content cache, so each CID is only fetched
+    from the node or gateway once.
+
+    Args:
+        content_hash (str): IPFS content hash (CID)
+
+    Returns:
+        str: Content retrieved from IPFS
+    """
+    return get_content_cache().fetch(content_hash, cat_from_ipfs)
+
+
+def cat_from_ipfs(content_hash):
+    """Fetch content with a hedged read across the node and gateways, bypassing the cache."""
+    return get_ipfs_client().cat(content_hash)
+
+
+def store_post_content(title, content, author, summary=None):
+    """
+    Store post content on IPFS.
+
+    Args:
+        title (str): Post title
+        content (str): Post content
+        author (str): Author's Ethereum address
+        summary (dict): Precomputed excerpt, length and sentiment (see build_post_json)
+
+    Returns:
+        str: IPFS content hash
+    """
+    return add_to_ipfs(build_post_json(title, content, author, summary))
+
+
+def store_post_contents(posts, pin=True):
+    """
+    Store many posts on IPFS with a single multi-file add.
+
+    Args:
+        posts (list): (title, content, author) or (title, content, author, summary) tuples
+        pin (bool): Whether to pin the content
+
+    Returns:
+        list: IPFS content hashes in the same order, None for any that failed
+    """
+    return add_many_to_ipfs([build_post_json(*post) for post in posts], pin)
+
+
+def retrieve_post_content(content_hash):
+    """
+    Retrieve post content from IPFS.
+
+    Args:
+        content_hash (str): IPFS content hash
+
+    Returns:
+        dict: Post data as dictionary
+    """
+    return parse_post_json(get_from_ipfs(content_hash))
+
+
+def retrieve_post_contents(content_hashes, timeout=None):
+    """
+    Retrieve several posts from IPFS in parallel, on the shared fetch pool.
+
+    Args:
+        content_hashes (list): IPFS content hashes, duplicates allowed
+        timeout (float): Seconds to wait for the whole set (defaults to IPFS_TIMEOUT)
+
+    Returns:
+        list: Post data dicts in the same order as content_hashes, with None
+            for any hash that failed or did not arrive in time
+    """
+    if not content_hashes:
+        return []
+    pool = get_fetch_pool()
+
+    timeout = IPFS_TIMEOUT if timeout is None else timeout
+    deadline = time.time() + timeout
+    futures = {}
+    for content_hash in content_hashes:
+        if content_hash not in futures:
+            # propagate() keeps pool-thread IPFS reads attributed to the calling request
+            futures[content_hash] = pool.submit(propagate(retrieve_post_content), content_hash)
+
+    results = {}
+    for content_hash, future in futures.items():
+        try:
+            results[content_hash] = future.result(timeout=max(0, deadline - time.time()))
+        except TimeoutError:
+            # Slow fetches keep running and land in the cache for next time
+            print(f"Timed out retrieving {content_hash} from IPFS")
+            results[content_hash] = None
+        except Exception as e:
+            print(f"Error retrieving {content_hash} from IPFS: {str(e)}")
+            results[content_hash] = None
+
+    return [results[content_hash] for content_hash in content_hashes]
+
+
+# Async API
+
+async def async_add_to_ipfs(content, pin=True):
+    """Async add_to_ipfs()."""
+    with track("ipfs_add", "async_add_to_ipfs"):
+        content_hash = await get_async_ipfs_client().add(content, pin)
+    remember_added(content_hash, content)
+    if content_hash and pin and PINATA_API_KEY and PINATA_SECRET_API_KEY:
+        # Pinata is best effort; keep the blocking call off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, pin_to_pinata, content_hash)
+    return content_hash
+
+
+async def async_get_from_ipfs(content_hash):
+    """Async get_from_ipfs(), sharing the same content cache."""
+    with track("ipfs_get", "async_get_from_ipfs"):
+        cache = get_content_cache()
+        content = cache.get(content_hash)
+        if content is not None or cache.is_missing(content_hash):
+            return content
+        content = await get_async_ipfs_client().cat(content_hash)
+        if content is None:
+            cache.mark_missing(content_hash)
+        else:
+            cache.put(content_hash, content)
+        return content
+
+
+async def async_retrieve_post_content(content_hash):
+    """Async retrieve_post_content()."""
+    return parse_post_json(await async_get_from_ipfs(content_hash))
+
+
+async def async_retrieve_post_contents(content_hashes, timeout=None):
+    """
+    Async retrieve_post_contents(): fetch every distinct hash concurrently.
+
+    Returns:
+        list: Post data dicts in the same order as content_hashes, with None
+            for any hash that failed or did not arrive within timeout seconds
+    """
+    if not content_hashes:
+        return []
+    unique = list(dict.fromkeys(content_hashes))
+    tasks = {content_hash: asyncio.ensure_future(async_retrieve_post_content(content_hash)) for content_hash in unique}
+    done, pending = await asyncio.wait(tasks.values(), timeout=IPFS_TIMEOUT if timeout is None else timeout)
+    # Unlike the thread pool version, stragglers are cancelled: the caller's loop may close right after
+    for task in pending:
+        task.cancel()
+
+    results = {}
+    for content_hash, task in tasks.items():
+        if task in pending:
+            print(f"Timed out retrieving {content_hash} from IPFS")
+            results[content_hash] = None
+        elif task.exception() is not None:
+            print(f"Error retrieving {content_hash} from IPFS: {str(task.exception())}")
+            results[content_hash] = None
+        else:
+            results[content_hash] = task.result()
+    return [results[content_hash] for content_hash in content_hashes]
@@ -0,0 +1,376 @@
+import asyncio
+import threading
+import aiohttp
+from web3 import AsyncWeb3, AsyncHTTPProvider
+from dotenv import load_dotenv
+from ipfs_client import async_retrieve_post_content, async_retrieve_post_contents
+from scripts import interact
+from scripts.interact import (
+    is_valid_eth_address, format_post as format_post_sync,
+    format_posts as format_posts_sync, format_posts_metadata, post_content_dict,
+    format_reputation, default_reputation, get_live_watcher, ipfs_hashes,
+    new_page, page_post_ids, indexed_page_rows, set_page_cursors
+)
+from scripts.forum_client import get_client, WEB3_PROVIDER_URI, WEB3_POOL_SIZE, WEB3_REQUEST_TIMEOUT
+from scripts.background_loop import get_background_loop
+from scripts.batch_rpc import BatchCallError
+from scripts.bulk_reads import get_bulk_reader
+from scripts.cid import normalize_post
+from scripts.metrics import track
+
+# Load environment variables
+load_dotenv()
+
+class AsyncForumClient:
+    """
+    AsyncWeb3 handle on the same deployment as the shared ForumClient.
+    
+    The contract address and ABI are taken from the sync client, so a
+    redeploy picked up there is picked up here too. Calls run on the shared
+    background loop, which keeps AsyncHTTPProvider's aiohttp pool alive
+    across requests even though each async view runs in its own loop.
+    """
+    
+    def __init__(self, provider_uri=None, pool_size=None, timeout=None):
+        self.w3 = AsyncWeb3(AsyncHTTPProvider(
+            provider_uri or WEB3_PROVIDER_URI,
+            request_kwargs={'timeout': aiohttp.ClientTimeout(total=timeout or WEB3_REQUEST_TIMEOUT)}
+        ))
+        self.pool_size = pool_size or WEB3_POOL_SIZE
+        self._contract = None
+    
+    @property
+    def contract(self):
+        """Async contract instance for the currently deployed forum."""
+        client = get_client()
+        contract = client.contract
+        if self._contract is None or self._contract.address != contract.address:
+            self._contract = self.w3.eth.contract(address=contract.address, abi=client.abi)
+        return self._contract
+
+_async_client = None
+_async_client_lock = threading.Lock()
+
+def get_async_client():
+    """Return the process-wide AsyncForumClient, creating it on first use."""
+    global _async_client
+    if _async_client is None:
+        with _async_client_lock:
+            if _async_client is None:
+                _async_client = AsyncForumClient()
+    return _async_client
+
+async def call(contract_function):
+    """Await one contract call; recorded in the metrics like the sync provider's calls."""
+    with track("rpc", contract_function.fn_name):
+        return await get_background_loop().run(contract_function.call())
+
+async def call_all(contract_functions, limit=None):
+    """
+    Run many contract calls concurrently.
+    
+    Args:
+        contract_functions (list): Bound async contract functions
+        limit (int): Maximum calls in flight (defaults to the client's pool size)
+    
+    Returns:
+        list: Results in order, BatchCallError for calls that failed
+    """
+    if not contract_functions:
+        return []
+    semaphore = asyncio.Semaphore(limit or get_async_client().pool_size)
+    
+    async def run_one(contract_function):
+        async with semaphore:
+            try:
+                return await contract_function.call()
+            except Exception as e:
+                return BatchCallError(str(e))
+    
+    async def run_all():
+        return await asyncio.gather(*(run_one(contract_function) for contract_function in contract_functions))
+    
+    names = {contract_function.fn_name for contract_function in contract_functions}
+    with track("rpc_gather", names.pop() if len(names) == 1 else "mixed"):
+        return await get_background_loop().run(run_all())
+
+async def run_blocking(func, *args):
+    """Run a blocking call in the loop's default executor (asyncio.to_thread needs Python 3.9)."""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+async def get_synced_index(min_block=None):
+    """interact.get_synced_index in a worker thread: a catch-up sync makes blocking RPC calls."""
+    return await run_blocking(interact.get_synced_index, min_block)
+
+async def get_current_index():
+    """interact.get_current_index in a worker thread (see get_synced_index)."""
+    return await run_blocking(interact.get_current_index)
+
+async def read_posts(post_ids):
+    """Async BulkReader.read_posts: the same pages, with the calls in flight together."""
+    reader = get_bulk_reader(get_client())
+    contract = get_async_client().contract
+    rows = {}
+    missing = sorted(set(post_ids))
+    if not missing:
+        return rows
+    
+    if reader.supports('getPostsRange'):
+        pages = reader.post_pages(missing)
+        reader.add_post_pages(rows, await call_all(
+            [contract.functions.getPostsRange(start, count) for start, count in pages]
+        ))
+        missing = [post_id for post_id in missing if post_id not in rows]
+    
+    if missing:
+        reader.add_posts(rows, missing, await call_all(
+            [contract.functions.posts(post_id) for post_id in missing]
+        ))
+    return rows
+
+async def format_post(post):
+    """Async format_post: the post's IPFS content is fetched without blocking."""
+    prefetched = {}
+    for content_hash in ipfs_hashes([post]):
+        prefetched[content_hash] = await async_retrieve_post_content(content_hash)
+    return format_post_sync(post, prefetched)
+
+async def format_posts(posts):
+    """Async format_posts: every CID on the page is fetched concurrently."""
+    hashes = ipfs_hashes(posts)
+    prefetched = dict(zip(hashes, await async_retrieve_post_contents(hashes)))
+    return format_posts_sync(posts, prefetched)
+
+async def format_rows(posts, metadata_only):
+    """format_posts_metadata or format_posts, whichever the caller asked for."""
+    if metadata_only:
+        return format_posts_metadata(posts)
+    return await format_posts(posts)
+
+async def get_all_posts(metadata_only=False):
+    """Get all posts from the forum."""
+    contract = get_async_client().contract
+    
+    try:
+        index = await get_synced_index()
+        if index:
+            return await format_rows(index.get_posts(), metadata_only)
+        
+        post_count = await call(contract.functions.postCount())
+        rows = await read_posts(range(1, post_count + 1))
+        return await format_rows([rows[post_id] for post_id in sorted(rows)], metadata_only)
+    
+    except Exception as e:
+        print(f"Error getting posts: {str(e)}")
+        return []
+
+async def get_posts_page(cursor=None, limit=None, metadata_only=False):
+    """
+    Get one page of posts, newest first.
+    
+    Args:
+        cursor (int): Only return posts with an ID below this (None for the newest page)
+        limit (int): Posts per page (defaults to POSTS_PER_PAGE)
+        metadata_only (bool): Skip IPFS content and sentiment
+    
+    Returns:
+        dict: Same shape as interact.get_posts_page
+    """
+    contract = get_async_client().contract
+    page = new_page(limit)
+    
+    try:
+        index = await get_current_index()
+        if index:
+            page['post_count'] = index.max_post_id()
+        else:
+            page['post_count'] = await call(contract.functions.postCount())
+        
+        post_ids = page_post_ids(page, cursor)
+        if not post_ids:
+            return page
+        
+        rows = indexed_page_rows(index, post_ids)
+        missing = [post_id for post_id in post_ids if post_id not in rows]
+        if missing:
+            rows.update(await read_posts(missing))
+        
+        page['posts'] = await format_rows([rows[post_id] for post_id in post_ids if post_id in rows], metadata_only)
+        set_page_cursors(page, post_ids)
+        return page
+    
+    except Exception as e:
+        print(f"Error getting posts page: {str(e)}")
+        return page
+
+async def get_author_post_ids(author_address):
+    """Get the IDs of every post written by one address (see interact.get_author_post_ids)."""
+    index = await get_synced_index()
+    if index:
+        return index.get_post_ids_by_author(author_address)
+    # Falling back to a log scan is rare; it runs in a worker thread
+    return await run_blocking(interact.get_author_post_ids, author_address)
+
+async def get_posts_by_author(author_address):
+    """Get all posts written by one address."""
+    w3 = get_client().w3
+    
+    try:
+        if not is_valid_eth_address(author_address, w3):
+            print(f"Invalid address format: {author_address}")
+            return []
+        checksum_address = w3.to_checksum_address(author_address)
+        
+        index = await get_current_index()
+        if index:
+            return await format_posts(index.get_posts_by_author(checksum_address))
+        
+        post_ids = await get_author_post_ids(checksum_address)
+        rows = await read_posts(post_ids)
+        return await format_posts([rows[post_id] for post_id in post_ids if post_id in rows])
+    
+    except Exception as e:
+        print(f"Error getting posts for {author_address}: {str(e)}")
+        return []
+
+async def get_author_sentiment(author_address):
+    """Get the sentiment tag an author's news posts add up to (see interact.get_author_sentiment)."""
+    return await run_blocking(interact.get_author_sentiment, author_address)
+
+async def get_user_reputation(user_address):
+    """Get reputation data for a user."""
+    w3 = get_client().w3
+    contract = get_async_client().contract
+    
+    try:
+        if not is_valid_eth_address(user_address, w3):
+            print(f"Invalid address format: {user_address}")
+            raise ValueError("Invalid Ethereum address format")
+        checksum_address = w3.to_checksum_address(user_address)
+        
+        # Shares the chain watcher's cache with the sync reads
+        watcher = get_live_watcher()
+        if watcher:
+            cached = watcher.reputations.get(checksum_address)
+            if cached:
+                return dict(cached)
+            token = watcher.reputations.token(checksum_address)
+        
+        rep_data = await call(contract.functions.getUserReputation(checksum_address))
+        reputation = format_reputation(rep_data)
+        
+        if watcher:
+            watcher.reputations.put(checksum_address, dict(reputation), token)
+        return reputation
+    
+    except Exception as e:
+        print(f"Error getting user reputation: {str(e)}")
+        return default_reputation()
+
+async def get_post(post_id):
+    """Get a specific post by ID."""
+    contract = get_async_client().contract
+    
+    try:
+        watcher = get_live_watcher()
+        if watcher:
+            cached = watcher.posts.get(post_id)
+            if cached:
+                return dict(cached)
+            token = watcher.posts.token(post_id)
+        
+        post = None
+        index = await get_current_index()
+        if index:
+            post = index.get_post(post_id)
+        if post is None:
+            post = normalize_post(await call(contract.functions.posts(post_id)))
+        
+        post_data = await format_post(post)
+        # posts(i) returns an empty post for unknown IDs; those are not cached
+        if watcher and post_data['id'] == post_id:
+            watcher.posts.put(post_id, dict(post_data), token)
+        return post_data
+    
+    except Exception as e:
+        print(f"Error getting post {post_id}: {str(e)}")
+        return None
+
+async def get_post_content(post_id):
+    """Get the body of one post, with its excerpt and (for news) sentiment; None if it does not exist."""
+    post_data = await get_post(post_id)
+    if not post_data or post_data['id'] != post_id:
+        return None
+    return post_content_dict(post_data)
+
+async def get_post_detail(post_id, viewer_address=None):
+    """
+    Get everything the post page needs.
+    
+    The post, the author's reputation and the viewer's vote are read in one
+    JSON-RPC batch (interact.read_post_detail) from a worker thread; only
+    the content fetch is left to wait for afterwards.
+    
+    Args:
+        post_id (int): ID of the post
+        viewer_address (str): Logged-in user whose vote should be looked up
+    
+    Returns:
+        tuple: (post dict or None, author reputation dict, (has_voted, is_upvote))
+    """
+    try:
+        post, rep_data, vote_state = await run_blocking(interact.read_post_detail, post_id, viewer_address)
+        return await format_post(post), format_reputation(rep_data), vote_state
+    
+    except Exception as e:
+        print(f"Error getting post {post_id}: {str(e)}")
+        return None, default_reputation(), (False, False)
+
+async def has_user_voted(post_id, user_address):
+    """Check if a user has voted on a post."""
+    w3 = get_client().w3
+    
+    try:
+        if not user_address or not is_valid_eth_address(user_address, w3):
+            print(f"Invalid address format for voting check: {user_address}")
+            return False, False
+        checksum_address = w3.to_checksum_address(user_address)
+        return tuple(await call(get_async_client().contract.functions.hasUserVoted(post_id, checksum_address)))
+    except Exception as e:
+        print(f"Error checking if user voted: {str(e)}")
+        return False, False
+
+# Writes go through the shared nonce manager and transaction queue, which
+# are thread-based; the async versions hand them to a worker thread.
+
+async def create_post(title, content, is_news=False, user_address=None, account_index=None):
+    """Async interact.create_post."""
+    return await run_blocking(interact.create_post, title, content, is_news, user_address, account_index)
+
+async def submit_post(title, content, is_news=False, user_address=None, account_index=None):
+    """Async interact.submit_post."""
+    return await run_blocking(interact.submit_post, title, content, is_news, user_address, account_index)
+
+async def vote_post(post_id, is_upvote, user_address=None, account_index=None):
+    """Async interact.vote_post."""
+    return await run_blocking(interact.vote_post, post_id, is_upvote, user_address, account_index)
+
+async def submit_vote(post_id, is_upvote, user_address=None, account_index=None, on_confirmed=None):
+    """Async interact.submit_vote."""
+    return await run_blocking(interact.submit_vote, post_id, is_upvote, user_address, account_index, on_confirmed)
+
+async def update_user_sentiment(user_address, sentiment_tag, from_address=None, account_index=None):
+    """Async interact.update_user_sentiment."""
+    return await run_blocking(interact.update_user_sentiment, user_address, sentiment_tag, from_address, account_index)
+
+async def submit_user_sentiment(user_address, sentiment_tag, from_address=None, account_index=None):
+    """Async interact.submit_user_sentiment."""
+    return await run_blocking(interact.submit_user_sentiment, user_address, sentiment_tag, from_address, account_index)
+
+def schedule_user_sentiment(user_address, sentiment_tag, from_address=None):
+    """Same as interact.schedule_user_sentiment (it only queues the write)."""
+    return interact.schedule_user_sentiment(user_address, sentiment_tag, from_address)
+
+def get_transaction_status(tx_hash):
+    """Same as interact.get_transaction_status (an in-memory lookup)."""
+    return interact.get_transaction_status(tx_hash)
@@ -0,0 +1,68 @@
+import asyncio
+import contextvars
+import threading
+
+
+class BackgroundLoop:
+    """
+    One event loop on a daemon thread, shared by the async clients.
+
+    aiohttp sessions (AsyncWeb3's provider, the async IPFS client) belong
+    to the loop that created them, but Flask runs every async view in a
+    fresh loop. Running the clients here keeps their connection pools
+    alive across requests; coroutines from any loop await the results with
+    run() without blocking their own loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+
+    @property
+    def loop(self):
+        """The background loop, started on first use."""
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="async-clients", daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the background loop; returns a concurrent.futures.Future.
+
+        The coroutine sees the caller's context variables, so work it does
+        is still attributed to the caller's request in the metrics.
+        """
+        return asyncio.run_coroutine_threadsafe(in_context(coro, contextvars.copy_context()), self.loop)
+
+    async def run(self, coro):
+        """Run a coroutine on the background loop and await its result from the caller's loop."""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def run_sync(self, coro, timeout=None):
+        """Run a coroutine on the background loop from synchronous code."""
+        return self.submit(coro).result(timeout)
+
+
+async def in_context(coro, context):
+    # The task running this has its own copy of the loop thread's context
+    for var, value in context.items():
+        var.set(value)
+    return await coro
+
+
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+
+def get_background_loop():
+    """Return the process-wide BackgroundLoop, creating it on first use."""
+    global _background_loop
+    if _background_loop is None:
+        with _background_loop_lock:
+            if _background_loop is None:
+                _background_loop = BackgroundLoop()
+    return _background_loop
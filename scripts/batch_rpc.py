@@ -0,0 +1,207 @@
+import json
+import os
+import requests
+from dotenv import load_dotenv
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from scripts.metrics import track
+
+# Load environment variables
+load_dotenv()
+
+# Maximum number of eth_call requests packed into one HTTP request
+RPC_BATCH_SIZE = int(os.getenv("RPC_BATCH_SIZE", "100"))
+
+
+class BatchCallError(Exception):
+    """Raised in place of a result when one call in a batch fails."""
+
+
+class BatchCaller:
+    """
+    Packs many read-only contract calls into JSON-RPC batch requests.
+
+    Queue bound contract functions with add(), e.g.
+    add(contract.functions.posts(1)), then execute() to get their decoded
+    results in the order they were added. Calls are sent batch_size at a
+    time. Providers that are not plain HTTP (e.g. the in-process tester)
+    get the calls one by one instead.
+    """
+
+    def __init__(self, w3, batch_size=None, session=None):
+        self.w3 = w3
+        self.batch_size = batch_size or RPC_BATCH_SIZE
+        self.endpoint_uri = getattr(w3.provider, 'endpoint_uri', None)
+        self.session = session or getattr(w3.provider, 'session', None) or requests.Session()
+        self._calls = []
+
+    def add(self, contract_function):
+        """
+        Queue a bound contract function call.
+
+        Returns:
+            int: Position of the call's result in execute()'s return value
+        """
+        self._calls.append(contract_function)
+        return len(self._calls) - 1
+
+    def __len__(self):
+        return len(self._calls)
+
+    def _decode(self, contract_function, return_data):
+        output_types = get_abi_output_types(contract_function.abi)
+        output_data = self.w3.codec.decode(output_types, return_data)
+        normalized = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, output_data)
+        # Match ContractFunction.call(): single outputs are returned bare
+        if len(normalized) == 1:
+            return normalized[0]
+        return list(normalized)
+
+    def _call_one_by_one(self, calls, block_identifier):
+        results = []
+        for contract_function in calls:
+            try:
+                results.append(contract_function.call(block_identifier=block_identifier))
+            except Exception as e:
+                results.append(BatchCallError(str(e)))
+        return results
+
+    def _send_batch(self, calls, block_identifier):
+        if isinstance(block_identifier, int):
+            block_identifier = hex(block_identifier)
+        payload = []
+        for request_id, contract_function in enumerate(calls):
+            payload.append({
+                'jsonrpc': '2.0',
+                'id': request_id,
+                'method': 'eth_call',
+                'params': [
+                    {
+                        'to': contract_function.address,
+                        'data': contract_function._encode_transaction_data()
+                    },
+                    block_identifier
+                ]
+            })
+
+        request_kwargs = dict(self.w3.provider.get_request_kwargs())
+        request_kwargs.setdefault('headers', {'Content-Type': 'application/json'})
+        # Labelled with the function called, or "mixed" when a batch calls several
+        function_names = {contract_function.fn_name for contract_function in calls}
+        with track("rpc_batch", function_names.pop() if len(function_names) == 1 else "mixed"):
+            response = self.session.post(self.endpoint_uri, data=json.dumps(payload), **request_kwargs)
+        response.raise_for_status()
+        replies = response.json()
+        if isinstance(replies, dict):
+            # Some nodes answer a whole batch with a single error object
+            message = replies.get('error', {}).get('message', str(replies))
+            raise BatchCallError(f"Batch rejected by node: {message}")
+
+        # Replies may come back in any order
+        by_id = {reply.get('id'): reply for reply in replies}
+        results = []
+        for request_id, contract_function in enumerate(calls):
+            reply = by_id.get(request_id)
+            if reply is None:
+                results.append(BatchCallError("No reply for call in batch"))
+            elif 'error' in reply:
+                results.append(BatchCallError(reply['error'].get('message', str(reply['error']))))
+            else:
+                try:
+                    return_data = bytes.fromhex(reply['result'][2:])
+                    results.append(self._decode(contract_function, return_data))
+                except Exception as e:
+                    results.append(BatchCallError(f"Could not decode {contract_function}: {str(e)}"))
+        return results
+
+    def execute(self, block_identifier='latest'):
+        """
+        Send every queued call and clear the queue.
+
+        Returns:
+            list: Decoded results in the order added; failed calls are
+                returned as BatchCallError instances
+        """
+        calls, self._calls = self._calls, []
+        if not self.endpoint_uri:
+            return self._call_one_by_one(calls, block_identifier)
+
+        results = []
+        for start in range(0, len(calls), self.batch_size):
+            results.extend(self._send_batch(calls[start:start + self.batch_size], block_identifier))
+        return results
+
+
+def batch_call(w3, contract_functions, batch_size=None):
+    """
+    Run several read-only contract calls in as few round-trips as possible.
+
+    Args:
+        w3 (Web3): Connected Web3 instance
+        contract_functions (list): Bound contract functions to call
+        batch_size (int): Calls per JSON-RPC batch (defaults to RPC_BATCH_SIZE)
+
+    Returns:
+        list: Decoded results, BatchCallError for calls that failed
+    """
+    caller = BatchCaller(w3, batch_size=batch_size)
+    for contract_function in contract_functions:
+        caller.add(contract_function)
+    return caller.execute()
+
+
+def batch_requests(w3, method, params_list, batch_size=None):
+    """
+    Send the same JSON-RPC method with many parameter lists, batched.
+
+    Results are the raw JSON values (no web3 formatting), e.g. receipt
+    dicts with hex strings for eth_getTransactionReceipt.
+
+    Args:
+        w3 (Web3): Connected Web3 instance
+        method (str): JSON-RPC method, e.g. "eth_getTransactionReceipt"
+        params_list (list): One params list per request
+        batch_size (int): Requests per JSON-RPC batch (defaults to RPC_BATCH_SIZE)
+
+    Returns:
+        list: Results in order, BatchCallError for requests that failed
+    """
+    batch_size = batch_size or RPC_BATCH_SIZE
+    endpoint_uri = getattr(w3.provider, 'endpoint_uri', None)
+    results = []
+    if not endpoint_uri:
+        for params in params_list:
+            reply = w3.provider.make_request(method, params)
+            if 'error' in reply:
+                results.append(BatchCallError(str(reply['error'])))
+            else:
+                results.append(reply.get('result'))
+        return results
+
+    session = getattr(w3.provider, 'session', None) or requests.Session()
+    request_kwargs = dict(w3.provider.get_request_kwargs())
+    request_kwargs.setdefault('headers', {'Content-Type': 'application/json'})
+    for start in range(0, len(params_list), batch_size):
+        chunk = params_list[start:start + batch_size]
+        payload = [
+            {'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params}
+            for request_id, params in enumerate(chunk)
+        ]
+        with track("rpc_batch", method):
+            response = session.post(endpoint_uri, data=json.dumps(payload), **request_kwargs)
+        response.raise_for_status()
+        replies = response.json()
+        if isinstance(replies, dict):
+            message = replies.get('error', {}).get('message', str(replies))
+            results.extend(BatchCallError(f"Batch rejected by node: {message}") for _ in chunk)
+            continue
+        by_id = {reply.get('id'): reply for reply in replies}
+        for request_id in range(len(chunk)):
+            reply = by_id.get(request_id)
+            if reply is None:
+                results.append(BatchCallError("No reply for request in batch"))
+            elif 'error' in reply:
+                results.append(BatchCallError(reply['error'].get('message', str(reply['error']))))
+            else:
+                results.append(reply.get('result'))
+    return results
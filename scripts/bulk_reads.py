@@ -0,0 +1,188 @@
+import os
+import threading
+from dotenv import load_dotenv
+from scripts.batch_rpc import BatchCaller, BatchCallError
+from scripts.cid import normalize_post
+
+# Load environment variables
+load_dotenv()
+
+# Posts (or addresses) requested per getPostsRange / getReputations call
+RANGE_PAGE_SIZE = int(os.getenv("RANGE_PAGE_SIZE", "100"))
+
+# Node errors that mean the deployed bytecode does not have a view the ABI lists
+UNSUPPORTED_ERRORS = ("revert", "could not decode", "invalid opcode")
+
+
+def contiguous_runs(post_ids):
+    """Split post IDs into (start, count) runs of consecutive IDs, ascending."""
+    runs = []
+    for post_id in sorted(set(post_ids)):
+        if runs and runs[-1][0] + runs[-1][1] == post_id:
+            runs[-1][1] += 1
+        else:
+            runs.append([post_id, 1])
+    return [tuple(run) for run in runs]
+
+
+class BulkReader:
+    """
+    Reads many posts or reputations with the contract's range views.
+
+    getPostsRange(start, count) returns a whole page of posts per eth_call
+    and getReputations(address[]) a whole page of reputations; the pages
+    themselves are packed into JSON-RPC batches. Deployments whose ABI
+    lacks these views, or whose bytecode rejects them, fall back to
+    posts(i) and getUserReputation(address) calls.
+    """
+
+    def __init__(self, client, page_size=None):
+        self.client = client
+        self.page_size = page_size or RANGE_PAGE_SIZE
+        self._unsupported = set()
+
+    def supports(self, function_name):
+        """True if the current contract should be asked for function_name."""
+        contract = self.client.contract
+        if (contract.address, function_name) in self._unsupported:
+            return False
+        return any(
+            item.get('type') == 'function' and item.get('name') == function_name
+            for item in self.client.abi
+        )
+
+    def mark_unsupported(self, function_name, error):
+        if any(marker in str(error).lower() for marker in UNSUPPORTED_ERRORS):
+            print(f"{function_name} not available on this deployment, using single reads: {str(error)}")
+            self._unsupported.add((self.client.contract.address, function_name))
+
+    def post_pages(self, post_ids):
+        """Split post IDs into (start, count) pages for getPostsRange, ascending."""
+        return [
+            (start + offset, min(self.page_size, count - offset))
+            for start, count in contiguous_runs(post_ids)
+            for offset in range(0, count, self.page_size)
+        ]
+
+    def add_post_pages(self, rows, results):
+        """Add getPostsRange results to rows; failed pages are left for single reads."""
+        for result in results:
+            if isinstance(result, BatchCallError):
+                self.mark_unsupported('getPostsRange', result)
+                continue
+            for post in result:
+                rows[post[0]] = normalize_post(post)
+
+    def add_posts(self, rows, post_ids, results):
+        """Add posts(i) results, in post_ids order, to rows."""
+        for post_id, post in zip(post_ids, results):
+            if isinstance(post, BatchCallError):
+                print(f"Error reading post {post_id}: {str(post)}")
+                continue
+            rows[post_id] = normalize_post(post)
+
+    def address_pages(self, addresses):
+        """Split addresses into pages for getReputations."""
+        return [addresses[i:i + self.page_size] for i in range(0, len(addresses), self.page_size)]
+
+    def add_reputation_pages(self, reputations, pages, results):
+        """Add getReputations results to reputations; failed pages are left for single reads."""
+        for page, result in zip(pages, results):
+            if isinstance(result, BatchCallError):
+                self.mark_unsupported('getReputations', result)
+                continue
+            # The view returns one array per field; turn them into per-user tuples
+            for address, reputation in zip(page, zip(*result)):
+                reputations[address] = reputation
+
+    def add_reputations(self, reputations, addresses, results):
+        """Add getUserReputation results, in addresses order, to reputations."""
+        for address, reputation in zip(addresses, results):
+            if isinstance(reputation, BatchCallError):
+                print(f"Error reading reputation for {address}: {str(reputation)}")
+                continue
+            reputations[address] = tuple(reputation)
+
+    def _execute(self, contract_functions):
+        caller = BatchCaller(self.client.w3)
+        for contract_function in contract_functions:
+            caller.add(contract_function)
+        return caller.execute()
+
+    def read_posts(self, post_ids):
+        """
+        Read post tuples shaped like posts(i).
+
+        Args:
+            post_ids (iterable): Post IDs to read
+
+        Returns:
+            dict: Post tuple by post ID; posts that could not be read are left out
+        """
+        contract = self.client.contract
+        rows = {}
+        missing = sorted(set(post_ids))
+        if not missing:
+            return rows
+
+        if self.supports('getPostsRange'):
+            pages = self.post_pages(missing)
+            self.add_post_pages(rows, self._execute(
+                [contract.functions.getPostsRange(start, count) for start, count in pages]
+            ))
+            missing = [post_id for post_id in missing if post_id not in rows]
+
+        # Older deployments (or failed pages): one posts(i) call per post, still batched
+        if missing:
+            self.add_posts(rows, missing, self._execute(
+                [contract.functions.posts(post_id) for post_id in missing]
+            ))
+        return rows
+
+    def read_reputations(self, addresses):
+        """
+        Read reputation tuples shaped like getUserReputation(address).
+
+        Args:
+            addresses (iterable): Checksummed user addresses
+
+        Returns:
+            dict: Reputation tuple by address; addresses that could not be read are left out
+        """
+        contract = self.client.contract
+        reputations = {}
+        missing = list(dict.fromkeys(addresses))
+        if not missing:
+            return reputations
+
+        if self.supports('getReputations'):
+            pages = self.address_pages(missing)
+            self.add_reputation_pages(reputations, pages, self._execute(
+                [contract.functions.getReputations(page) for page in pages]
+            ))
+            missing = [address for address in missing if address not in reputations]
+
+        if missing:
+            self.add_reputations(reputations, missing, self._execute(
+                [contract.functions.getUserReputation(address) for address in missing]
+            ))
+        return reputations
+
+
+_reader = None
+_reader_lock = threading.Lock()
+
+
+def get_bulk_reader(client):
+    """
+    Return the process-wide BulkReader.
+
+    Args:
+        client (ForumClient): Shared blockchain client
+    """
+    global _reader
+    if _reader is None:
+        with _reader_lock:
+            if _reader is None:
+                _reader = BulkReader(client)
+    return _reader
@@ -0,0 +1,315 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+from eth_utils import event_abi_to_log_topic
+
+# Load environment variables
+load_dotenv()
+
+# Seconds between chain head checks (about the block time; 0 disables the read caches)
+CHAIN_WATCH_INTERVAL = float(os.getenv("CHAIN_WATCH_INTERVAL", "1"))
+
+# Extra seconds a poll may take before the caches stop being trusted
+CHAIN_WATCH_GRACE = float(os.getenv("CHAIN_WATCH_GRACE", "1"))
+
+# Entries kept per read cache, and posts / users whose last change block is remembered
+CHAIN_WATCH_CACHE_SIZE = int(os.getenv("CHAIN_WATCH_CACHE_SIZE", "4096"))
+
+# Events that change what get_post / get_user_reputation return
+WATCHED_EVENTS = ("PostCreated", "PostVoted", "UserSentimentUpdated")
+
+
+def event_topics(w3, contract, names):
+    """Map the hex topic0 of each named event to its contract event, for decoding raw logs."""
+    topics = {}
+    for name in names:
+        event = getattr(contract.events, name)
+        topics[w3.to_hex(event_abi_to_log_topic(event().abi))] = event
+    return topics
+
+
+class ReadCache:
+    """
+    Thread-safe LRU cache whose entries stay valid until the ChainWatcher drops them.
+
+    Take a token() before reading from chain and pass it to put(); if the
+    entry was invalidated while the read was in flight the stale result is
+    not stored. Tokens are versions from one increasing counter; keys whose
+    version was evicted (or never set) share the floor version, which is
+    raised on eviction, so an old token can never match again.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or CHAIN_WATCH_CACHE_SIZE
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> value, least recently used first
+        self._versions = OrderedDict()  # key -> version, oldest change first
+        self._clock = 0
+        self._floor = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def token(self, key):
+        with self._lock:
+            return self._versions.get(key, self._floor)
+
+    def put(self, key, value, token):
+        with self._lock:
+            if token != self._versions.get(key, self._floor):
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _bump(self, key):
+        self._clock += 1
+        self._versions[key] = self._clock
+        self._versions.move_to_end(key)
+        while len(self._versions) > self.max_entries:
+            _, version = self._versions.popitem(last=False)
+            self._floor = max(self._floor, version)
+
+    def update(self, key, fields):
+        """Patch fields of a cached dict in place; returns False if the key is not cached."""
+        with self._lock:
+            # Reads already in flight may predate the patch, so they are not stored either
+            self._bump(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            entry.update(fields)
+            return True
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._bump(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._clock += 1
+            self._floor = self._clock
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ChangeBlocks:
+    """
+    Last block in which each post or user changed, for the most recently changed ones.
+
+    Keys that are not remembered report the floor: the block watching
+    started at, raised to the newest evicted block. A forgotten key may look
+    newer than it is (an extra cache miss) but never older.
+    """
+
+    def __init__(self, floor=None, max_entries=None):
+        self.max_entries = max_entries or CHAIN_WATCH_CACHE_SIZE
+        self.floor = floor
+        self._lock = threading.Lock()
+        self._blocks = OrderedDict()  # key -> block, oldest change first
+
+    def get(self, key):
+        with self._lock:
+            return self._blocks.get(key, self.floor)
+
+    def set(self, key, block):
+        with self._lock:
+            self._blocks[key] = block
+            self._blocks.move_to_end(key)
+            while len(self._blocks) > self.max_entries:
+                _, evicted = self._blocks.popitem(last=False)
+                self.floor = max(self.floor, evicted)
+
+    def reset(self, floor):
+        """Forget every key; all of them now report floor."""
+        with self._lock:
+            self._blocks.clear()
+            self.floor = floor
+
+    def __len__(self):
+        return len(self._blocks)
+
+
+class ChainWatcher:
+    """
+    Keeps the post and reputation read caches in step with the chain.
+
+    One background thread per process checks the chain head every
+    CHAIN_WATCH_INTERVAL seconds. When new blocks have arrived it fetches
+    their forum events with a single eth_getLogs call and drops (or, for
+    sentiment tags, patches) exactly the post and user entries they
+    affect. Cached reads are trusted only while the last successful poll is
+    less than poll_interval + CHAIN_WATCH_GRACE seconds old, so they are
+    never further behind the chain than that.
+    """
+
+    def __init__(self, client, poll_interval=None):
+        self.client = client
+        self.poll_interval = CHAIN_WATCH_INTERVAL if poll_interval is None else poll_interval
+        self.posts = ReadCache()
+        self.reputations = ReadCache()
+        self.last_block = None
+        self.start_block = None
+        self.last_event_block = None
+        self._post_blocks = ChangeBlocks()
+        self._user_blocks = ChangeBlocks()
+        self._contract_address = None
+        self._events_by_topic = {}
+        self._last_poll = 0
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def start(self):
+        """Start the polling thread (safe to call more than once)."""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="chain-watcher", daemon=True)
+                self._worker.start()
+
+    def is_current(self):
+        """True if the last successful poll is at most one interval (plus CHAIN_WATCH_GRACE) old."""
+        return (
+            self.last_block is not None
+            and time.time() - self._last_poll < self.poll_interval + CHAIN_WATCH_GRACE
+        )
+
+    def _reset(self, contract):
+        # A new deployment invalidates everything that was cached
+        self.posts.clear()
+        self.reputations.clear()
+        self._contract_address = contract.address
+        self._events_by_topic = event_topics(self.client.w3, contract, WATCHED_EVENTS)
+        self.last_block = self.client.w3.eth.block_number
+        self.start_block = self.last_event_block = self.last_block
+        self._post_blocks.reset(self.start_block)
+        self._user_blocks.reset(self.start_block)
+
+    def post_block(self, post_id):
+        """Last block in which this post changed (the floor if it is not remembered, see ChangeBlocks)."""
+        return self._post_blocks.get(post_id)
+
+    def user_block(self, address):
+        """Last block in which this user's posts or reputation changed (see post_block)."""
+        return self._user_blocks.get(address)
+
+    def author_of(self, post_id):
+        """Author of a post from the read cache or the post index, without fetching its content (None if unknown)."""
+        cached = self.posts.get(post_id)
+        if cached:
+            return cached['author']
+        try:
+            from scripts.post_index import get_post_index
+            index = get_post_index(self.client)
+            post = index.get_post(post_id) if index else None
+            return post[1] if post else None
+        except Exception:
+            return None
+
+    def _apply(self, event):
+        args = event['args']
+        block = event['blockNumber']
+        self.last_event_block = block
+        if event['event'] == 'PostCreated':
+            self.posts.invalidate(args['postId'])
+            self.reputations.invalidate(args['author'])
+            self._post_blocks.set(args['postId'], block)
+            self._user_blocks.set(args['author'], block)
+        elif event['event'] == 'PostVoted':
+            # vote() recalculates the score of the author (new counts) and of
+            # the voter (a first-time voter's score is set from 0)
+            author = self.author_of(args['postId'])
+            self.posts.invalidate(args['postId'])
+            self._post_blocks.set(args['postId'], block)
+            self.reputations.invalidate(args['voter'])
+            self._user_blocks.set(args['voter'], block)
+            if author:
+                self.reputations.invalidate(author)
+                self._user_blocks.set(author, block)
+            else:
+                self.reputations.clear()
+                # Without the author every user's pages have to be treated as changed
+                self._user_blocks.reset(block)
+        elif event['event'] == 'UserSentimentUpdated':
+            self.reputations.update(args['user'], {'sentimentTag': args['sentimentTag']})
+            self._user_blocks.set(args['user'], block)
+
+    def poll(self):
+        """
+        Apply the forum events of any blocks mined since the last poll.
+
+        Returns:
+            int: Number of events applied
+        """
+        contract = self.client.contract
+        w3 = self.client.w3
+        if contract.address != self._contract_address or self.last_block is None:
+            self._reset(contract)
+
+        head = w3.eth.block_number
+        if head <= self.last_block:
+            self._last_poll = time.time()
+            return 0
+
+        # One eth_getLogs for all watched events, whatever the number of readers
+        logs = w3.eth.get_logs({
+            'address': contract.address,
+            'fromBlock': self.last_block + 1,
+            'toBlock': head,
+            'topics': [list(self._events_by_topic)]
+        })
+        applied = 0
+        for log in logs:
+            event = self._events_by_topic.get(w3.to_hex(log['topics'][0]))
+            if event is None:
+                continue
+            self._apply(event().process_log(log))
+            applied += 1
+
+        self.last_block = head
+        self._last_poll = time.time()
+        return applied
+
+    def _run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception as e:
+                # Until the next successful poll is_current() stops trusting the caches
+                print(f"Chain watcher poll failed: {str(e)}")
+            time.sleep(self.poll_interval)
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def get_chain_watcher(client):
+    """
+    Return the process-wide ChainWatcher, starting it on first use.
+
+    Args:
+        client (ForumClient): Shared blockchain client
+
+    Returns:
+        ChainWatcher: The shared watcher, or None when CHAIN_WATCH_INTERVAL is 0
+    """
+    global _watcher
+    if CHAIN_WATCH_INTERVAL <= 0:
+        return None
+    if _watcher is None:
+        with _watcher_lock:
+            if _watcher is None:
+                _watcher = ChainWatcher(client)
+                _watcher.start()
+    return _watcher
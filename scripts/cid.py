@@ -0,0 +1,147 @@
+import hashlib
+
+# Bitcoin base58 alphabet, as used by IPFS CIDv0 ("Qm...") hashes
+BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+BASE58_INDEX = {char: i for i, char in enumerate(BASE58_ALPHABET)}
+
+# Multihash header of a CIDv0: sha2-256 (0x12), 32-byte digest (0x20)
+SHA256_MULTIHASH_PREFIX = b"\x12\x20"
+
+# Digest stored on chain for posts without IPFS content
+EMPTY_DIGEST = b"\x00" * 32
+
+# Content hash used by posts whose IPFS upload failed
+DIRECT_CONTENT = "direct_content"
+
+# `ipfs add` stores files up to one chunk (the default 256 KiB chunker) as a
+# single block; larger files are a DAG whose CID cannot be checked from the
+# bytes alone
+UNIXFS_CHUNK_SIZE = 262144
+
+
+def b58encode(data):
+    """Encode bytes as a base58 string."""
+    number = int.from_bytes(data, "big")
+    encoded = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = BASE58_ALPHABET[remainder] + encoded
+    # Leading zero bytes are written as leading '1's
+    padding = len(data) - len(data.lstrip(b"\x00"))
+    return BASE58_ALPHABET[0] * padding + encoded
+
+
+def b58decode(text):
+    """Decode a base58 string to bytes (ValueError on characters outside the alphabet)."""
+    number = 0
+    for char in text:
+        if char not in BASE58_INDEX:
+            raise ValueError(f"Invalid base58 character: {char!r}")
+        number = number * 58 + BASE58_INDEX[char]
+    decoded = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    padding = len(text) - len(text.lstrip(BASE58_ALPHABET[0]))
+    return b"\x00" * padding + decoded
+
+
+def is_cidv0(content_hash):
+    """True if content_hash is a well-formed CIDv0 ("Qm" + 44 base58 characters)."""
+    if not isinstance(content_hash, str) or len(content_hash) != 46 or not content_hash.startswith("Qm"):
+        return False
+    try:
+        return b58decode(content_hash).startswith(SHA256_MULTIHASH_PREFIX)
+    except ValueError:
+        return False
+
+
+def cid_to_digest(content_hash):
+    """
+    Convert a CIDv0 into the 32-byte sha256 digest stored on chain.
+
+    Args:
+        content_hash (str): CIDv0 such as "QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG",
+            or "direct_content" for posts without IPFS content
+
+    Returns:
+        bytes: 32-byte digest (all zeros for direct content)
+    """
+    if content_hash == DIRECT_CONTENT:
+        return EMPTY_DIGEST
+    multihash = b58decode(content_hash)
+    if len(multihash) != 34 or not multihash.startswith(SHA256_MULTIHASH_PREFIX):
+        raise ValueError(f"Not a CIDv0 sha256 hash: {content_hash}")
+    return multihash[2:]
+
+
+def digest_to_cid(digest):
+    """
+    Convert an on-chain 32-byte sha256 digest back into its CIDv0.
+
+    Args:
+        digest (bytes): 32-byte digest
+
+    Returns:
+        str: CIDv0, or "direct_content" for the all-zero digest
+    """
+    digest = bytes(digest)
+    if len(digest) != 32:
+        raise ValueError(f"Expected a 32-byte digest, got {len(digest)} bytes")
+    if digest == EMPTY_DIGEST:
+        return DIRECT_CONTENT
+    return b58encode(SHA256_MULTIHASH_PREFIX + digest)
+
+
+def encode_varint(number):
+    """Protobuf unsigned varint encoding."""
+    encoded = b""
+    while True:
+        byte, number = number & 0x7f, number >> 7
+        if not number:
+            return encoded + bytes([byte])
+        encoded += bytes([byte | 0x80])
+
+
+def unixfs_file_block(data):
+    """The dag-pb block `ipfs add` creates for a single-chunk file."""
+    unixfs = b"\x08\x02"  # Type: File
+    if data:
+        unixfs += b"\x12" + encode_varint(len(data)) + data
+    unixfs += b"\x18" + encode_varint(len(data))  # filesize
+    return b"\x0a" + encode_varint(len(unixfs)) + unixfs
+
+
+def verify_cid(content_hash, data):
+    """
+    Check that bytes fetched from IPFS are the content a CIDv0 names.
+
+    Accepts both the UnixFS file block `ipfs add` creates and a bare sha256
+    of the data (raw blocks).
+
+    Args:
+        content_hash (str): CIDv0
+        data (bytes): Fetched file content
+
+    Returns:
+        bool: True if the data matches, False if it does not, None if it
+            cannot be checked (not a CIDv0, or a file larger than one chunk)
+    """
+    if not is_cidv0(content_hash):
+        return None
+    digest = cid_to_digest(content_hash)
+    if hashlib.sha256(data).digest() == digest:
+        return True
+    if len(data) > UNIXFS_CHUNK_SIZE:
+        return None
+    return hashlib.sha256(unixfs_file_block(data)).digest() == digest
+
+
+def content_hash_str(content_hash):
+    """Return a post's content hash as a string, whichever contract version stored it."""
+    if isinstance(content_hash, (bytes, bytearray)):
+        return digest_to_cid(content_hash)
+    return content_hash
+
+
+def normalize_post(post):
+    """Return a posts(i)-shaped tuple with its content hash as a CID string."""
+    post = tuple(post)
+    return post[:3] + (content_hash_str(post[3]),) + post[4:]
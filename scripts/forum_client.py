@@ -0,0 +1,190 @@
+from web3 import Web3
+import json
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from eth_utils import function_abi_to_4byte_selector
+from scripts.metrics import track
+
+# Load environment variables
+load_dotenv()
+
+# JSON-RPC methods whose transaction data names a contract function
+CONTRACT_METHODS = ("eth_call", "eth_estimateGas", "eth_sendTransaction")
+
+# Blockchain connection settings
+WEB3_PROVIDER_URI = os.getenv("WEB3_PROVIDER_URI", "http://127.0.0.1:7545")
+WEB3_POOL_SIZE = int(os.getenv("WEB3_POOL_SIZE", "20"))
+WEB3_REQUEST_TIMEOUT = float(os.getenv("WEB3_REQUEST_TIMEOUT", "10"))
+
+CONTRACT_ADDRESS_FILE = "forum_contract_address.txt"
+CONTRACT_ABI_FILE = "forum_abi.json"
+
+
+def find_project_file(filename):
+    """
+    Locate a deployment artifact, preferring the working directory.
+
+    Args:
+        filename (str): File name such as forum_abi.json
+
+    Returns:
+        str: Path to the file in the working directory or the project root
+    """
+    if os.path.exists(filename):
+        return filename
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(script_dir)
+    return os.path.join(project_root, filename)
+
+
+class PooledHTTPProvider(Web3.HTTPProvider):
+    """HTTP provider that sends every request through one shared keep-alive session."""
+
+    def __init__(self, endpoint_uri, session, request_kwargs=None):
+        super().__init__(endpoint_uri, request_kwargs=request_kwargs)
+        self.session = session
+        self.function_names = {}
+
+    def operation_name(self, method, params):
+        """Metrics label for a request: the contract function it calls, else the JSON-RPC method."""
+        if method in CONTRACT_METHODS and params and isinstance(params[0], dict):
+            data = params[0].get('data') or params[0].get('input') or ''
+            name = self.function_names.get(data[:10]) if isinstance(data, str) else None
+            if name:
+                return name
+        return method
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        with track("rpc", self.operation_name(method, params)):
+            response = self.session.post(
+                self.endpoint_uri, data=request_data, **self.get_request_kwargs()
+            )
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+
+class ForumClient:
+    """
+    Long-lived handle on the DiscussionForum contract.
+
+    Holds one Web3 instance backed by a pooled HTTP session, the parsed ABI,
+    the contract object and the node's account list. Everything is loaded
+    lazily and shared between threads; call reload() after redeploying.
+    """
+
+    def __init__(self, provider_uri=None, pool_size=None, timeout=None):
+        self.provider_uri = provider_uri or WEB3_PROVIDER_URI
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size or WEB3_POOL_SIZE
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        provider = PooledHTTPProvider(
+            self.provider_uri,
+            self.session,
+            request_kwargs={'timeout': timeout or WEB3_REQUEST_TIMEOUT}
+        )
+        self.w3 = Web3(provider)
+
+        self._lock = threading.RLock()
+        self._contract = None
+        self._abi = None
+        self._accounts = None
+        self._address_mtime = None
+
+    def _load_contract(self):
+        address_path = find_project_file(CONTRACT_ADDRESS_FILE)
+        with open(address_path, "r") as file:
+            contract_address = file.read().strip()
+
+        with open(find_project_file(CONTRACT_ABI_FILE), "r") as file:
+            abi = json.load(file)
+
+        self._abi = abi
+        self._address_mtime = os.path.getmtime(address_path)
+        self.w3.provider.function_names = {
+            self.w3.to_hex(function_abi_to_4byte_selector(item)): item['name']
+            for item in abi if item.get('type') == 'function'
+        }
+        self._contract = self.w3.eth.contract(address=contract_address, abi=abi)
+
+    @property
+    def contract(self):
+        """The cached contract instance, loaded from disk on first use."""
+        if self._contract is None:
+            with self._lock:
+                if self._contract is None:
+                    self._load_contract()
+        return self._contract
+
+    @property
+    def abi(self):
+        """The cached contract ABI."""
+        if self._abi is None:
+            self.contract
+        return self._abi
+
+    @property
+    def accounts(self):
+        """The node's accounts, fetched once."""
+        if self._accounts is None:
+            with self._lock:
+                if self._accounts is None:
+                    self._accounts = list(self.w3.eth.accounts)
+        return self._accounts
+
+    @property
+    def default_account(self):
+        """The first node account, used when no sender is given."""
+        return self.accounts[0]
+
+    def reload(self):
+        """Re-read the contract address and ABI and forget cached accounts."""
+        with self._lock:
+            self._contract = None
+            self._abi = None
+            self._accounts = None
+            self._load_contract()
+        print(f"Forum client reloaded, contract at {self._contract.address}")
+
+    def reload_if_changed(self):
+        """
+        Reload when forum_contract_address.txt has been rewritten.
+
+        Returns:
+            bool: True if the contract was reloaded
+        """
+        if self._address_mtime is None:
+            return False
+        try:
+            mtime = os.path.getmtime(find_project_file(CONTRACT_ADDRESS_FILE))
+        except OSError:
+            return False
+        if mtime != self._address_mtime:
+            self.reload()
+            return True
+        return False
+
+    def close(self):
+        """Close the pooled HTTP session."""
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide ForumClient, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ForumClient()
+    return _client
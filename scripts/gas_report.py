@@ -0,0 +1,107 @@
+"""
+Compare gas per createPost and per votePost between DiscussionForum and
+DiscussionForumV2 on an in-process chain.
+
+Needs the Solidity compiler (installed by py-solc-x on first run) and
+eth-tester with py-evm:
+
+    pip install "eth-tester[py-evm]"
+    python -m scripts.gas_report
+"""
+import os
+from solcx import compile_standard, install_solc
+from web3 import Web3, EthereumTesterProvider
+from scripts.cid import cid_to_digest
+
+SOLC_VERSION = "0.8.0"
+
+CONTRACTS = (
+    ("DiscussionForum", "contracts/DiscussionForum.sol"),
+    ("DiscussionForumV2", "contracts/DiscussionForumV2.sol"),
+)
+
+# A typical post: short title, CIDv0 content hash
+SAMPLE_TITLE = "Markets close higher"
+SAMPLE_CID = "QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG"
+
+
+def compile_contract(name, path):
+    """Compile one contract, returning (abi, bytecode)."""
+    with open(path, "r") as file:
+        source = file.read()
+    compiled = compile_standard(
+        {
+            "language": "Solidity",
+            "sources": {os.path.basename(path): {"content": source}},
+            "settings": {
+                "outputSelection": {"*": {"*": ["abi", "evm.bytecode"]}}
+            },
+        },
+        solc_version=SOLC_VERSION,
+    )
+    output = compiled["contracts"][os.path.basename(path)][name]
+    return output["abi"], output["evm"]["bytecode"]["object"]
+
+
+def deploy(w3, abi, bytecode):
+    tx_hash = w3.eth.contract(abi=abi, bytecode=bytecode).constructor().transact()
+    receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    return w3.eth.contract(address=receipt.contractAddress, abi=abi)
+
+
+def gas_used(w3, contract_function, sender):
+    tx_hash = contract_function.transact({'from': sender})
+    return w3.eth.wait_for_transaction_receipt(tx_hash)['gasUsed']
+
+
+def measure(name, path):
+    """
+    Deploy a fresh copy of a contract and measure its write paths.
+
+    Returns:
+        dict: Gas for the first and a later createPost, and the first and a later votePost
+    """
+    abi, bytecode = compile_contract(name, path)
+    w3 = Web3(EthereumTesterProvider())
+    accounts = w3.eth.accounts
+    w3.eth.default_account = accounts[0]
+    contract = deploy(w3, abi, bytecode)
+
+    create_abi = next(item for item in abi if item.get('name') == 'createPost')
+    content_hash = SAMPLE_CID
+    if create_abi['inputs'][1]['type'] == 'bytes32':
+        content_hash = cid_to_digest(SAMPLE_CID)
+
+    def create(sender):
+        return gas_used(w3, contract.functions.createPost(SAMPLE_TITLE, content_hash, True), sender)
+
+    results = {
+        'create_first': create(accounts[0]),
+        'create_later': create(accounts[0])
+    }
+    # Votes by different accounts on the same post, so both counters already exist for the later one
+    results['vote_first'] = gas_used(w3, contract.functions.votePost(1, True), accounts[1])
+    results['vote_later'] = gas_used(w3, contract.functions.votePost(1, True), accounts[2])
+    return results
+
+
+def main():
+    install_solc(SOLC_VERSION)
+    reports = [(name, measure(name, path)) for name, path in CONTRACTS]
+
+    print(f"{'':20}{'create (1st)':>14}{'create':>10}{'vote (1st)':>12}{'vote':>10}")
+    for name, results in reports:
+        print(
+            f"{name:20}{results['create_first']:>14}{results['create_later']:>10}"
+            f"{results['vote_first']:>12}{results['vote_later']:>10}"
+        )
+
+    (_, before), (_, after) = reports
+    print()
+    for key in ('create_first', 'create_later', 'vote_first', 'vote_later'):
+        saved = before[key] - after[key]
+        print(f"{key:14} saves {saved:>7} gas ({saved / before[key]:.0%})")
+
+
+if __name__ == "__main__":
+    main()
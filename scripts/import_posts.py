@@ -0,0 +1,414 @@
+"""
+Bulk-import posts from a JSONL archive.
+
+One JSON object per line:
+
+    {"title": "...", "content": "...", "is_news": false, "author": "0x..."}
+
+Content is uploaded with one multi-file IPFS /add per chunk, createPost
+transactions are sent back to back with locally allocated nonces, and
+receipts are confirmed in bulk once the chunk has been sent. Progress is
+saved after every transaction, and each transaction's nonce (and hash,
+when signed locally) is saved before it is broadcast, so an interrupted
+import can simply be run again without creating any post twice:
+
+    python -m scripts.import_posts archive.jsonl
+    python -m scripts.import_posts archive.jsonl --chunk 200 --gas 500000
+
+With PRIVATE_KEY set every post is signed locally and sent from that
+account; otherwise posts are sent from the node account named by their
+"author" field (or --from / the first node account).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from dotenv import load_dotenv
+from eth_utils import event_abi_to_log_topic
+from ipfs_client import store_post_contents, retrieve_post_content
+from scripts.forum_client import get_client
+from scripts.batch_rpc import batch_requests, BatchCallError
+from scripts.nonce_manager import get_nonce_manager
+from scripts.tx_queue import TX_POLL_INTERVAL, TX_CONFIRM_TIMEOUT
+from scripts.interact import (
+    content_hash_argument, displayed_content, record_post_sentiment, mark_index_dirty,
+    post_summaries, stored_sentiment
+)
+
+# record_post_sentiment imports the app's sentiment module
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+if APP_DIR not in sys.path:
+    sys.path.append(APP_DIR)
+
+# Load environment variables
+load_dotenv()
+
+# Posts uploaded, sent and confirmed together
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "100"))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk-import posts from a JSONL file")
+    parser.add_argument("input", help="JSONL file, one post per line")
+    parser.add_argument("--progress", help="Progress file (default: <input>.progress.json)")
+    parser.add_argument("--chunk", type=int, default=IMPORT_CHUNK_SIZE, help="Posts per upload/send/confirm round")
+    parser.add_argument("--from", dest="from_address", help="Sender for posts without a usable author")
+    parser.add_argument("--gas", type=int, help="Gas limit per createPost (skips per-transaction estimates)")
+    parser.add_argument("--confirm-timeout", type=float, default=TX_CONFIRM_TIMEOUT,
+                        help="Seconds to wait for a chunk's receipts")
+    parser.add_argument("--no-pin", action="store_true", help="Do not pin uploaded content")
+    return parser.parse_args()
+
+
+def load_progress(path, input_path):
+    if not os.path.exists(path):
+        return {"input": input_path, "next_line": 0, "pending": [], "imported": 0, "failed": []}
+    with open(path, "r") as file:
+        progress = json.load(file)
+    if progress.get("input") != input_path:
+        raise SystemExit(f"{path} belongs to {progress.get('input')}, not {input_path}")
+    return progress
+
+
+def save_progress(path, progress):
+    # Written to a temporary file first so a crash never leaves half a progress file
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as file:
+        json.dump(progress, file)
+    os.replace(temp_path, path)
+
+
+def read_chunks(input_path, start_line, chunk_size):
+    """Yield lists of (line number, post dict or parse error) from start_line on."""
+    chunk = []
+    with open(input_path, "r", encoding="utf-8") as file:
+        for line_number, line in enumerate(file):
+            if line_number < start_line or not line.strip():
+                continue
+            try:
+                chunk.append((line_number, json.loads(line)))
+            except json.JSONDecodeError as e:
+                chunk.append((line_number, e))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+class PostSender:
+    """
+    Sends createPost transactions without waiting for them to be mined.
+
+    Nonces come from the shared NonceManager, so consecutive sends from one
+    account never collide. With a private key, transactions are built and
+    signed locally and sent raw; otherwise the node signs for its own
+    unlocked accounts.
+    """
+
+    def __init__(self, client, private_key=None, from_address=None, gas=None):
+        self.client = client
+        self.w3 = client.w3
+        self.contract = client.contract
+        self.gas = gas
+        self.nonces = get_nonce_manager(client)
+        self.account = self.w3.eth.account.from_key(private_key) if private_key else None
+        self.node_accounts = {address.lower(): address for address in client.accounts} if not self.account else {}
+        if self.account:
+            self.default_sender = self.account.address
+        elif from_address:
+            self.default_sender = self.w3.to_checksum_address(from_address)
+        else:
+            self.default_sender = client.default_account
+        self._fee_params = None
+
+    def sender_for(self, author):
+        """The account a post by author is sent from."""
+        if self.account or not author:
+            return self.default_sender
+        return self.node_accounts.get(str(author).lower(), self.default_sender)
+
+    def refresh_fees(self):
+        """Fetch gas pricing once per chunk instead of once per transaction."""
+        latest = self.w3.eth.get_block('latest')
+        if latest.get('baseFeePerGas') is not None:
+            priority = self.w3.eth.max_priority_fee
+            self._fee_params = {
+                'maxFeePerGas': latest['baseFeePerGas'] * 2 + priority,
+                'maxPriorityFeePerGas': priority
+            }
+        else:
+            self._fee_params = {'gasPrice': self.w3.eth.gas_price}
+        if self.account:
+            self._fee_params['chainId'] = self.w3.eth.chain_id
+
+    def send(self, sender, title, content_hash, is_news, nonce=None, on_prepared=None):
+        """
+        Send one createPost; returns the transaction hash as a hex string.
+
+        Args:
+            nonce (int): Reuse this nonce instead of allocating the next one
+            on_prepared (callable): Called with (nonce, tx_hash) just before the
+                transaction is broadcast; tx_hash is None when the node signs
+        """
+        contract_function = self.contract.functions.createPost(
+            title, content_hash_argument(self.contract, content_hash), is_news
+        )
+        tx_params = dict(self._fee_params or {})
+        if self.gas:
+            tx_params['gas'] = self.gas
+
+        def send_fn(nonce):
+            params = dict(tx_params)
+            params.update({'from': sender, 'nonce': nonce})
+            if not self.account:
+                if on_prepared:
+                    on_prepared(nonce, None)
+                return contract_function.transact(params)
+            signed = self.account.sign_transaction(contract_function.build_transaction(params))
+            if on_prepared:
+                on_prepared(nonce, self.w3.to_hex(signed.hash))
+            return self.w3.eth.send_raw_transaction(signed.rawTransaction)
+
+        if nonce is not None:
+            return self.w3.to_hex(send_fn(nonce))
+        return self.w3.to_hex(self.nonces.send(sender, send_fn))
+
+
+def post_id_from_raw_receipt(receipt, contract_address, post_created_topic):
+    """Read the new post ID from the indexed postId topic of a raw PostCreated log."""
+    for log in receipt.get('logs', []):
+        topics = log.get('topics', [])
+        if log.get('address', '').lower() == contract_address.lower() and topics and topics[0] == post_created_topic:
+            return int(topics[1], 16)
+    return None
+
+
+class BulkImporter:
+    """Runs an import chunk by chunk and keeps the progress file current."""
+
+    def __init__(self, args):
+        self.args = args
+        self.client = get_client()
+        self.w3 = self.client.w3
+        self.contract = self.client.contract
+        self.sender = PostSender(self.client, os.getenv("PRIVATE_KEY"), args.from_address, args.gas)
+        self.input_path = os.path.abspath(args.input)
+        self.progress_path = args.progress or f"{args.input}.progress.json"
+        self.progress = load_progress(self.progress_path, self.input_path)
+        self.post_created_topic = self.w3.to_hex(event_abi_to_log_topic(self.contract.events.PostCreated().abi))
+        self.timings = {'ipfs': 0.0, 'send': 0.0, 'confirm': 0.0}
+        self.imported = 0
+
+    def save(self):
+        save_progress(self.progress_path, self.progress)
+
+    def fail(self, line_number, error):
+        print(f"Line {line_number + 1}: {error}")
+        self.progress['failed'].append({'line': line_number, 'error': str(error)})
+
+    def upload(self, chunk):
+        """Turn a chunk of parsed lines into pending entries with IPFS content hashes."""
+        posts = []
+        for line_number, post in chunk:
+            if isinstance(post, Exception) or not isinstance(post, dict):
+                self.fail(line_number, f"invalid JSON: {post}")
+            elif not post.get('title') or not post.get('content'):
+                self.fail(line_number, "title and content are required")
+            else:
+                posts.append((line_number, post))
+
+        started = time.perf_counter()
+        entries = []
+        senders = [self.sender.sender_for(post.get('author')) for _, post in posts]
+        news_flags = [bool(post.get('is_news', post.get('isNews', False))) for _, post in posts]
+        # Excerpts, and sentiment for news posts, go into the IPFS envelopes, analyzed as one batch per chunk
+        summaries = post_summaries([post['content'] for _, post in posts], news_flags)
+        content_hashes = store_post_contents([
+            (post['title'], post['content'], sender, summary)
+            for (_, post), sender, summary in zip(posts, senders, summaries)
+        ], pin=not self.args.no_pin) if posts else []
+        for (line_number, post), sender, is_news, content_hash in zip(posts, senders, news_flags, content_hashes):
+            entries.append({
+                'line': line_number,
+                'title': post['title'],
+                'is_news': is_news,
+                'sender': sender,
+                # Same fallback as create_post when IPFS is unavailable
+                'content_hash': content_hash or "direct_content",
+                'nonce': None,
+                'tx_hash': None
+            })
+        self.timings['ipfs'] += time.perf_counter() - started
+        return entries
+
+    def send(self, entries):
+        """
+        Send every entry's transaction back to back, saving progress after each.
+
+        An entry's nonce and (when signed locally) hash are saved before it is
+        broadcast, so resume() can tell whether a crash came before or after.
+        Entries that already hold a nonce are resent with that same nonce.
+        """
+        started = time.perf_counter()
+        self.sender.refresh_fees()
+        for entry in entries:
+            def prepared(nonce, tx_hash, entry=entry):
+                entry['nonce'] = nonce
+                entry['tx_hash'] = tx_hash
+                self.save()
+
+            try:
+                entry['tx_hash'] = self.sender.send(
+                    entry['sender'], entry['title'], entry['content_hash'], entry['is_news'],
+                    nonce=entry.get('nonce'), on_prepared=prepared
+                )
+            except Exception as e:
+                self.fail(entry['line'], f"send failed: {str(e)}")
+                self.progress['pending'].remove(entry)
+            self.save()
+        self.timings['send'] += time.perf_counter() - started
+
+    def confirm(self):
+        """
+        Poll receipts for every pending transaction in JSON-RPC batches.
+
+        Returns:
+            bool: True if nothing is left pending
+        """
+        started = time.perf_counter()
+        deadline = time.time() + self.args.confirm_timeout
+        while True:
+            pending = [entry for entry in self.progress['pending'] if entry['tx_hash']]
+            receipts = batch_requests(
+                self.w3, "eth_getTransactionReceipt", [[entry['tx_hash']] for entry in pending]
+            ) if pending else []
+            for entry, receipt in zip(pending, receipts):
+                if receipt is None or isinstance(receipt, BatchCallError):
+                    continue
+                self.progress['pending'].remove(entry)
+                if int(receipt['status'], 16) != 1:
+                    self.fail(entry['line'], f"transaction {entry['tx_hash']} reverted")
+                    continue
+                self.imported += 1
+                self.progress['imported'] += 1
+                if entry['is_news']:
+                    self.record_sentiment(entry, receipt)
+            self.save()
+            if not self.progress['pending'] or time.time() >= deadline:
+                break
+            time.sleep(TX_POLL_INTERVAL)
+        self.timings['confirm'] += time.perf_counter() - started
+        return not self.progress['pending']
+
+    def record_sentiment(self, entry, receipt):
+        post_id = post_id_from_raw_receipt(receipt, self.contract.address, self.post_created_topic)
+        sentiment = None
+        if entry['content_hash'] == "direct_content":
+            text = entry['title']
+        else:
+            post_data = retrieve_post_content(entry['content_hash']) or {}
+            text = displayed_content(entry['title'], post_data.get('content', ''), entry['content_hash'])
+            stored = stored_sentiment(post_data, text)
+            if stored:
+                sentiment = stored[0]
+        record_post_sentiment(post_id, entry['sender'], text, sentiment)
+
+    def resume(self):
+        """
+        Finish transactions left pending by an interrupted run; resend any the node never got.
+
+        A transaction the node does not know is only resent if its saved nonce
+        is still unused, and then with that same nonce, so a post that was
+        broadcast just before the crash is never created a second time.
+        """
+        if not self.progress['pending']:
+            return True
+        print(f"Resuming: confirming {len(self.progress['pending'])} pending transactions")
+        hashed = [entry for entry in self.progress['pending'] if entry['tx_hash']]
+        known = batch_requests(
+            self.w3, "eth_getTransactionByHash", [[entry['tx_hash']] for entry in hashed]
+        ) if hashed else []
+        known_hashes = {entry['tx_hash'] for entry, tx in zip(hashed, known) if tx is not None}
+        unknown = [entry for entry in self.progress['pending'] if entry['tx_hash'] not in known_hashes]
+
+        # Saved nonces the sender has since used (mined or waiting in the pool)
+        numbered = [entry for entry in unknown if entry.get('nonce') is not None]
+        counts = batch_requests(
+            self.w3, "eth_getTransactionCount", [[entry['sender'], 'pending'] for entry in numbered]
+        ) if numbered else []
+        used = {
+            id(entry) for entry, count in zip(numbered, counts)
+            if not isinstance(count, BatchCallError) and int(count, 16) > entry['nonce']
+        }
+
+        dropped = []
+        for entry in unknown:
+            if id(entry) not in used:
+                dropped.append(entry)
+            elif entry['tx_hash']:
+                # Signed locally: our transaction would be known, so the nonce went to another one
+                entry['nonce'] = None
+                dropped.append(entry)
+            else:
+                # Signed by the node, whose hash was never saved: the nonce being
+                # used means it was broadcast before the crash
+                print(f"Line {entry['line'] + 1}: nonce {entry['nonce']} already used; not resending")
+                self.progress['pending'].remove(entry)
+                self.imported += 1
+                self.progress['imported'] += 1
+        for entry in dropped:
+            # A dropped transaction leaves the sender's nonce unused; ask the node again
+            self.sender.nonces.resync(entry['sender'])
+            entry['tx_hash'] = None
+        self.save()
+        if dropped:
+            print(f"Resending {len(dropped)} transactions the node no longer knows")
+            self.send(dropped)
+        return self.confirm()
+
+    def run(self):
+        started = time.perf_counter()
+        if not self.resume():
+            print(f"{len(self.progress['pending'])} transactions still unconfirmed; run again to resume")
+            return False
+
+        for chunk in read_chunks(self.input_path, self.progress['next_line'], self.args.chunk):
+            entries = self.upload(chunk)
+            # Recorded before sending so a crash mid-chunk resumes from these entries
+            self.progress['pending'] = list(entries)
+            self.progress['next_line'] = chunk[-1][0] + 1
+            self.save()
+            self.send(entries)
+            if not self.confirm():
+                print(f"{len(self.progress['pending'])} transactions still unconfirmed; run again to resume")
+                return False
+            elapsed = time.perf_counter() - started
+            print(
+                f"Imported {self.progress['imported']} posts (line {self.progress['next_line']}), "
+                f"{self.imported / elapsed:.1f} posts/s"
+            )
+
+        mark_index_dirty()
+        self.report(time.perf_counter() - started)
+        return True
+
+    def report(self, elapsed):
+        print(f"\nImported {self.imported} posts in {elapsed:.1f}s ({self.imported / max(elapsed, 1e-9):.1f} posts/s)")
+        print(
+            f"  IPFS upload {self.timings['ipfs']:.1f}s, sending {self.timings['send']:.1f}s, "
+            f"confirming {self.timings['confirm']:.1f}s"
+        )
+        if self.progress['failed']:
+            print(f"  {len(self.progress['failed'])} lines failed; see {self.progress_path}")
+
+
+def main():
+    args = parse_args()
+    ok = BulkImporter(args).run()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,26 @@
-from web3 import Web3
-import json
 import os
 from dotenv import load_dotenv
-from ipfs_requests import store_post_content, retrieve_post_content
+from ipfs_client import store_post_content, retrieve_post_content, retrieve_post_contents
+from scripts.forum_client import get_client
+from scripts.post_index import get_post_index, FORUM_INDEX_START_BLOCK
+from scripts.batch_rpc import BatchCaller, BatchCallError
+from scripts.bulk_reads import get_bulk_reader
+from scripts.cid import cid_to_digest, normalize_post
+from scripts.tx_queue import get_tx_queue
+from scripts.nonce_manager import get_nonce_manager
+from scripts.sentiment_writer import get_sentiment_writer
+from scripts.chain_watcher import get_chain_watcher
+from scripts.metrics import timed
 
 # Load environment variables
 load_dotenv()
 
+# Listing page sizes
+POSTS_PER_PAGE = int(os.getenv("POSTS_PER_PAGE", "20"))
+MAX_POSTS_PER_PAGE = 100
+# Characters of a post body shown on list pages
+EXCERPT_LENGTH = 150
+
 def is_valid_eth_address(address, w3):
     """Check if an address is a valid Ethereum address and convert to checksum format if needed."""
     if not address:
@@ -19,41 +33,176 @@ def is_valid_eth_address(address, w3):
     except:
         return False
 
+@timed("get_contract")
 def get_contract():
-    # Connect to blockchain
-    w3 = Web3(Web3.HTTPProvider(os.getenv("WEB3_PROVIDER_URI", "http://127.0.0.1:7545")))
+    """Return the shared (w3, contract, default_account) handle."""
+    client = get_client()
+    return client.w3, client.contract, client.default_account
+
+def resolve_sender(client, user_address=None, account_index=None):
+    """
+    Pick the account a transaction should be sent from.
+    
+    Priority: 1. Explicit user_address, 2. account_index, 3. default_account
+    """
+    if user_address and is_valid_eth_address(user_address, client.w3):
+        return client.w3.to_checksum_address(user_address)
+    elif account_index is not None and account_index < len(client.accounts):
+        return client.accounts[account_index]
+    return client.default_account
+
+def send_transaction(client, contract_function, from_account):
+    """
+    Send a contract transaction using the shared per-account nonce allocator.
     
-    # Set default account
-    default_account = w3.eth.accounts[0]
+    Concurrent requests from the same account get consecutive nonces
+    instead of colliding.
     
-    # Load contract address
+    Returns:
+        HexBytes: Transaction hash
+    """
+    return get_nonce_manager(client).transact(contract_function, from_account)
+
+def friendly_tx_error(error_msg):
+    """Map common node errors to a message that can be shown to the user."""
+    if "sender account not recognized" in error_msg:
+        return "Wallet address not recognized. Please make sure you're connected to the correct network."
+    elif "insufficient funds" in error_msg:
+        return "Insufficient funds to complete transaction."
+    elif "nonce too low" in error_msg:
+        return "Transaction failed. Please try again (nonce issue)."
+    return error_msg
+
+def post_id_from_receipt(contract, tx_receipt):
+    """Get the new post ID from the PostCreated event in a createPost receipt."""
+    post_id = None
+    for log in contract.events.PostCreated().process_receipt(tx_receipt):
+        post_id = log['args']['postId']
+    return post_id
+
+def post_summaries(contents, news_flags):
+    """
+    Compute the fields stored alongside post bodies in their IPFS envelope.
+    
+    Only news posts are shown with a sentiment, so only their bodies are
+    analyzed, as one batch.
+    
+    Args:
+        contents (list): Post bodies
+        news_flags (list): Whether each body belongs to a news post
+    
+    Returns:
+        list: Dict per body with 'excerpt' and 'content_length', plus
+            'sentiment' and 'polarity' for news posts unless the analysis failed
+    """
+    summaries = [{'excerpt': post_excerpt(content), 'content_length': len(content)} for content in contents]
+    news = [i for i, is_news in enumerate(news_flags) if is_news]
+    if not news:
+        return summaries
     try:
-        with open("forum_contract_address.txt", "r") as file:
-            contract_address = file.read().strip()
-    except FileNotFoundError:
-        # Fallback to project root
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(script_dir)
-        contract_address_path = os.path.join(project_root, "forum_contract_address.txt")
-        with open(contract_address_path, "r") as file:
-            contract_address = file.read().strip()
-    
-    # Load ABI
+        from sentiment import analyze_sentiment_batch_cached
+        results = analyze_sentiment_batch_cached([contents[i] for i in news])
+        for i, (sentiment, polarity) in zip(news, results):
+            summary = summaries[i]
+            summary['sentiment'] = sentiment
+            summary['polarity'] = polarity
+    except Exception as e:
+        print(f"Error analyzing sentiment: {str(e)}")
+    return summaries
+
+def post_summary(content, is_news):
+    """post_summaries() for a single post body."""
+    return post_summaries([content], [is_news])[0]
+
+def stored_sentiment(document, content):
+    """
+    The sentiment precomputed in a post's IPFS envelope.
+    
+    Args:
+        document (dict): Post document read from IPFS
+        content (str): The body the sentiment should belong to
+    
+    Returns:
+        tuple: (label, polarity), or None for legacy posts and envelopes
+            that do not match the body
+    """
+    if not isinstance(document, dict) or document.get('content_length') != len(content or ""):
+        return None
+    sentiment, polarity = document.get('sentiment'), document.get('polarity')
+    if sentiment in ("positive", "negative", "neutral") and isinstance(polarity, (int, float)):
+        return sentiment, polarity
+    return None
+
+def stored_excerpt(document, content):
+    """The excerpt precomputed in a post's IPFS envelope, or one made from the body for legacy posts."""
+    if isinstance(document, dict) and document.get('content_length') == len(content or ""):
+        excerpt = document.get('excerpt')
+        if isinstance(excerpt, str):
+            return excerpt
+    return post_excerpt(content)
+
+def store_content_for_post(title, content, from_account, summary=None):
+    """Store post content on IPFS, returning the hash to put on chain."""
+    content_hash = "direct_content"  # Fallback if IPFS fails
     try:
-        with open("forum_abi.json", "r") as file:
-            abi = json.load(file)
-    except FileNotFoundError:
-        # Fallback to project root
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(script_dir)
-        abi_path = os.path.join(project_root, "forum_abi.json")
-        with open(abi_path, "r") as file:
-            abi = json.load(file)
+        ipfs_hash = store_post_content(title, content, from_account, summary)
+        if ipfs_hash:
+            content_hash = ipfs_hash
+            print(f"Content stored on IPFS with hash: {content_hash}")
+        else:
+            print("IPFS storage failed, using direct content")
+    except Exception as e:
+        print(f"IPFS error: {str(e)}, using direct content")
+    return content_hash
+
+def content_hash_argument(contract, content_hash):
+    """
+    Encode a content hash the way the deployed contract's createPost expects it.
     
-    # Create contract instance
-    contract = w3.eth.contract(address=contract_address, abi=abi)
+    DiscussionForum takes the CID string; DiscussionForumV2 takes the CID's
+    32-byte sha256 digest (all zeros for direct content).
+    """
+    create_abi = next(
+        (item for item in contract.abi if item.get('type') == 'function' and item.get('name') == 'createPost'),
+        None
+    )
+    if create_abi and create_abi['inputs'][1]['type'] == 'bytes32':
+        return cid_to_digest(content_hash)
+    return content_hash
+
+def displayed_content(title, content, content_hash):
+    """The text a post will be shown (and sentiment-analyzed) with once it is read back."""
+    # Posts whose IPFS upload failed are shown with their title as content
+    return title if content_hash == "direct_content" else content
+
+def written_sentiment(summary, content_hash):
+    """The sentiment label computed at write time, if it applies to what the post will display."""
+    # Posts whose IPFS upload failed are displayed (and analyzed) by title instead
+    if content_hash == "direct_content":
+        return None
+    return summary.get('sentiment')
+
+def record_post_sentiment(post_id, author, content, sentiment=None):
+    """
+    Count a newly created news post in its author's sentiment tally.
     
-    return w3, contract, default_account
+    Args:
+        post_id (int): ID of the new post
+        author (str): Author address
+        content (str): Text the post is displayed with
+        sentiment (str): Label already computed for that text, if any
+    """
+    if post_id is None:
+        return
+    try:
+        index = get_post_index(get_client())
+        if index:
+            if sentiment is None:
+                from sentiment import analyze_sentiment_cached
+                sentiment, _ = analyze_sentiment_cached(content)
+            index.record_post_sentiment(post_id, author, sentiment)
+    except Exception as e:
+        print(f"Error recording sentiment for post {post_id}: {str(e)}")
 
 def create_post(title, content, is_news=False, user_address=None, account_index=None):
     """
@@ -66,42 +215,34 @@ def create_post(title, content, is_news=False, user_address=None, account_index=
         user_address (str): Specific user address to use (highest priority)
         account_index (int): Index of account to use (if user_address not provided)
     """
-    w3, contract, default_account = get_contract()
-    
-    # Priority: 1. Explicit user_address, 2. account_index, 3. default_account
-    if user_address and is_valid_eth_address(user_address, w3):
-        from_account = w3.to_checksum_address(user_address)
-    elif account_index is not None and account_index < len(w3.eth.accounts):
-        from_account = w3.eth.accounts[account_index]
-    else:
-        from_account = default_account
+    client = get_client()
+    w3, contract = client.w3, client.contract
+    from_account = resolve_sender(client, user_address, account_index)
     
     try:
-        # Store content on IPFS and get content hash
-        content_hash = "direct_content"  # Fallback if IPFS fails
-        try:
-            ipfs_hash = store_post_content(title, content, from_account)
-            if ipfs_hash:
-                content_hash = ipfs_hash
-                print(f"Content stored on IPFS with hash: {content_hash}")
-            else:
-                print("IPFS storage failed, using direct content")
-        except Exception as e:
-            print(f"IPFS error: {str(e)}, using direct content")
+        # Store content on IPFS, with its excerpt (and sentiment for news), and get content hash
+        summary = post_summary(content, is_news)
+        content_hash = store_content_for_post(title, content, from_account, summary)
         
         # Log which account we're using
         print(f"Creating post from account: {from_account}")
         
         # Create post transaction with IPFS hash
-        tx_hash = contract.functions.createPost(title, content_hash, is_news).transact({'from': from_account})
+        tx_hash = send_transaction(client, contract.functions.createPost(title, content_hash_argument(contract, content_hash), is_news), from_account)
         
         # Wait for confirmation
         tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
         
+        mark_index_dirty()
+        
         # Get the post ID from the event logs
-        post_id = None
-        for log in contract.events.PostCreated().process_receipt(tx_receipt):
-            post_id = log['args']['postId']
+        post_id = post_id_from_receipt(contract, tx_receipt)
+        
+        if is_news:
+            record_post_sentiment(
+                post_id, from_account, displayed_content(title, content, content_hash),
+                written_sentiment(summary, content_hash)
+            )
         
         print(f"Post created successfully, ID: {post_id}")
         return post_id, tx_receipt
@@ -109,16 +250,52 @@ def create_post(title, content, is_news=False, user_address=None, account_index=
     except Exception as e:
         error_msg = str(e)
         print(f"Error creating post: {error_msg}")
+        return None, friendly_tx_error(error_msg)
+
+def submit_post(title, content, is_news=False, user_address=None, account_index=None):
+    """
+    Send a createPost transaction without waiting for it to be mined.
+    
+    The transaction is confirmed by the background queue; once mined, its
+    status result is the new post ID (taken from the PostCreated event).
+    
+    Args:
+        title (str): Post title
+        content (str): Post content
+        is_news (bool): Whether this is a news post
+        user_address (str): Specific user address to use (highest priority)
+        account_index (int): Index of account to use (if user_address not provided)
+    
+    Returns:
+        tuple: (tx_hash, None) on success, (None, error message) on failure
+    """
+    client = get_client()
+    contract = client.contract
+    from_account = resolve_sender(client, user_address, account_index)
+    
+    try:
+        summary = post_summary(content, is_news)
+        content_hash = store_content_for_post(title, content, from_account, summary)
+        print(f"Creating post from account: {from_account}")
+        tx_hash = send_transaction(client, contract.functions.createPost(title, content_hash_argument(contract, content_hash), is_news), from_account)
         
-        # Check for common errors
-        if "sender account not recognized" in error_msg:
-            error_msg = "Wallet address not recognized. Please make sure you're connected to the correct network."
-        elif "insufficient funds" in error_msg:
-            error_msg = "Insufficient funds to complete transaction."
-        elif "nonce too low" in error_msg:
-            error_msg = "Transaction failed. Please try again (nonce issue)."
+        def on_confirmed(tx_receipt):
+            mark_index_dirty()
+            post_id = post_id_from_receipt(contract, tx_receipt)
+            if is_news:
+                record_post_sentiment(
+                    post_id, from_account, displayed_content(title, content, content_hash),
+                    written_sentiment(summary, content_hash)
+                )
+            print(f"Post created successfully, ID: {post_id}")
+            return post_id
         
-        return None, error_msg
+        return get_tx_queue(client).submit(tx_hash, 'post', on_confirmed, from_account), None
+    
+    except Exception as e:
+        error_msg = str(e)
+        print(f"Error creating post: {error_msg}")
+        return None, friendly_tx_error(error_msg)
 
 def vote_post(post_id, is_upvote, user_address=None, account_index=None):
     """
@@ -130,15 +307,9 @@ def vote_post(post_id, is_upvote, user_address=None, account_index=None):
         user_address (str): Specific user address to use
         account_index (int): Index of account to use (if user_address not provided)
     """
-    w3, contract, default_account = get_contract()
-    
-    # Determine which account to use
-    if user_address and is_valid_eth_address(user_address, w3):
-        from_account = w3.to_checksum_address(user_address)
-    elif account_index is not None and account_index < len(w3.eth.accounts):
-        from_account = w3.eth.accounts[account_index]
-    else:
-        from_account = default_account
+    client = get_client()
+    w3, contract = client.w3, client.contract
+    from_account = resolve_sender(client, user_address, account_index)
     
     try:
         # Check if user has already voted
@@ -147,10 +318,11 @@ def vote_post(post_id, is_upvote, user_address=None, account_index=None):
             return False, "You have already voted on this post"
         
         # Create vote transaction
-        tx_hash = contract.functions.votePost(post_id, is_upvote).transact({'from': from_account})
+        tx_hash = send_transaction(client, contract.functions.votePost(post_id, is_upvote), from_account)
         
         # Wait for confirmation
         tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        mark_index_dirty()
         print(f"Vote recorded successfully from account: {from_account}")
         
         return True, tx_receipt
@@ -158,16 +330,46 @@ def vote_post(post_id, is_upvote, user_address=None, account_index=None):
     except Exception as e:
         error_msg = str(e)
         print(f"Error voting on post: {error_msg}")
+        return False, friendly_tx_error(error_msg)
+
+def submit_vote(post_id, is_upvote, user_address=None, account_index=None, on_confirmed=None):
+    """
+    Send a votePost transaction without waiting for it to be mined.
+    
+    Args:
+        post_id (int): ID of post to vote on
+        is_upvote (bool): True for upvote, False for downvote
+        user_address (str): Specific user address to use
+        account_index (int): Index of account to use (if user_address not provided)
+        on_confirmed (callable): Called with the receipt in the background once mined
+    
+    Returns:
+        tuple: (tx_hash, None) on success, (None, error message) on failure
+    """
+    client = get_client()
+    contract = client.contract
+    from_account = resolve_sender(client, user_address, account_index)
+    
+    try:
+        # Check if user has already voted
+        has_voted, _ = contract.functions.hasUserVoted(post_id, from_account).call()
+        if has_voted:
+            return None, "You have already voted on this post"
         
-        # Check for common errors
-        if "sender account not recognized" in error_msg:
-            error_msg = "Wallet address not recognized. Please make sure you're connected to the correct network."
-        elif "insufficient funds" in error_msg:
-            error_msg = "Insufficient funds to complete transaction."
-        elif "nonce too low" in error_msg:
-            error_msg = "Transaction failed. Please try again (nonce issue)."
+        tx_hash = send_transaction(client, contract.functions.votePost(post_id, is_upvote), from_account)
         
-        return False, error_msg
+        def vote_confirmed(tx_receipt):
+            mark_index_dirty()
+            print(f"Vote recorded successfully from account: {from_account}")
+            if on_confirmed:
+                on_confirmed(tx_receipt)
+        
+        return get_tx_queue(client).submit(tx_hash, 'vote', vote_confirmed, from_account), None
+    
+    except Exception as e:
+        error_msg = str(e)
+        print(f"Error voting on post: {error_msg}")
+        return None, friendly_tx_error(error_msg)
 
 def update_user_sentiment(user_address, sentiment_tag, from_address=None, account_index=None):
     """
@@ -179,15 +381,9 @@ def update_user_sentiment(user_address, sentiment_tag, from_address=None, accoun
         from_address (str): Address to send transaction from
         account_index (int): Index of account to use (if from_address not provided)
     """
-    w3, contract, default_account = get_contract()
-    
-    # Determine which account to use
-    if from_address and is_valid_eth_address(from_address, w3):
-        from_account = w3.to_checksum_address(from_address)
-    elif account_index is not None and account_index < len(w3.eth.accounts):
-        from_account = w3.eth.accounts[account_index]
-    else:
-        from_account = default_account
+    client = get_client()
+    w3, contract = client.w3, client.contract
+    from_account = resolve_sender(client, from_address, account_index)
     
     # Convert user_address to checksum format
     if user_address and is_valid_eth_address(user_address, w3):
@@ -195,10 +391,11 @@ def update_user_sentiment(user_address, sentiment_tag, from_address=None, accoun
     
     try:
         # Create update sentiment transaction
-        tx_hash = contract.functions.updateUserSentiment(user_address, sentiment_tag).transact({'from': from_account})
+        tx_hash = send_transaction(client, contract.functions.updateUserSentiment(user_address, sentiment_tag), from_account)
         
         # Wait for confirmation
         tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+        mark_index_dirty()
         print(f"User sentiment updated successfully from account: {from_account}")
         
         return tx_receipt
@@ -206,73 +403,514 @@ def update_user_sentiment(user_address, sentiment_tag, from_address=None, accoun
     except Exception as e:
         error_msg = str(e)
         print(f"Error updating user sentiment: {error_msg}")
+        return friendly_tx_error(error_msg)
+
+def submit_user_sentiment(user_address, sentiment_tag, from_address=None, account_index=None):
+    """
+    Send an updateUserSentiment transaction without waiting for it to be mined.
+    
+    Returns:
+        tuple: (tx_hash, None) on success, (None, error message) on failure
+    """
+    client = get_client()
+    w3, contract = client.w3, client.contract
+    from_account = resolve_sender(client, from_address, account_index)
+    
+    # Convert user_address to checksum format
+    if user_address and is_valid_eth_address(user_address, w3):
+        user_address = w3.to_checksum_address(user_address)
+    
+    try:
+        tx_hash = send_transaction(client, contract.functions.updateUserSentiment(user_address, sentiment_tag), from_account)
         
-        # Check for common errors
-        if "sender account not recognized" in error_msg:
-            error_msg = "Wallet address not recognized. Please make sure you're connected to the correct network."
-        elif "nonce too low" in error_msg:
-            error_msg = "Transaction failed. Please try again (nonce issue)."
+        def on_confirmed(tx_receipt):
+            mark_index_dirty()
+            print(f"User sentiment updated successfully from account: {from_account}")
         
-        return error_msg
+        return get_tx_queue(client).submit(tx_hash, 'sentiment', on_confirmed, from_account), None
+    
+    except Exception as e:
+        error_msg = str(e)
+        print(f"Error updating user sentiment: {error_msg}")
+        return None, friendly_tx_error(error_msg)
+
+def schedule_user_sentiment(user_address, sentiment_tag, from_address=None):
+    """
+    Queue a sentiment tag update to be written in the background.
+    
+    Updates for the same user within one flush window are coalesced, and
+    nothing is sent when the stored tag already matches.
+    
+    Args:
+        user_address (str): Address of user to update
+        sentiment_tag (str): New sentiment tag
+        from_address (str): Address to send the transaction from
+    """
+    client = get_client()
+    if not is_valid_eth_address(user_address, client.w3):
+        print(f"Invalid address format: {user_address}")
+        return
+    get_sentiment_writer(client).schedule(
+        client.w3.to_checksum_address(user_address), sentiment_tag, from_address
+    )
+
+def get_stored_sentiment_tag(user_address):
+    """Get the sentimentTag currently stored on chain for a checksummed address."""
+    index = get_synced_index()
+    if index:
+        # Users that were never tagged still have the contract's empty default
+        return index.get_sentiment_tag(user_address) or ""
+    
+    w3, contract, _ = get_contract()
+    return contract.functions.getUserReputation(user_address).call()[4]
+
+def get_stored_sentiment_tags(user_addresses):
+    """
+    Get the sentimentTags currently stored on chain for several checksummed addresses.
+    
+    Without the index the tags come from getReputations pages rather than a
+    getUserReputation call per address.
+    
+    Returns:
+        dict: Tag by address; addresses that could not be read are left out
+    """
+    index = get_synced_index()
+    if index:
+        return {address: index.get_sentiment_tag(address) or "" for address in user_addresses}
+    
+    reputations = get_bulk_reader(get_client()).read_reputations(user_addresses)
+    return {address: reputation[4] for address, reputation in reputations.items()}
+
+def get_transaction_status(tx_hash):
+    """
+    Get the background queue's view of a submitted transaction.
+    
+    Returns:
+        dict: 'hash', 'kind', 'status' (pending/confirmed/failed/dropped),
+            'block_number', 'result' and 'error'; None for unknown hashes
+    """
+    return get_tx_queue(get_client()).status(tx_hash)
+
+def get_synced_index(min_block=None):
+    """
+    Return the local post index caught up with the chain, or None if unavailable.
+    
+    Args:
+        min_block (int): Sync now unless the index has already applied this block
+    """
+    try:
+        index = get_post_index(get_client())
+        if index:
+            index.sync_if_stale(min_block=min_block)
+        return index
+    except Exception as e:
+        print(f"Post index unavailable, reading from chain: {str(e)}")
+        return None
+
+def get_current_index():
+    """
+    get_synced_index, caught up at least to the block the chain watcher has seen.
+    
+    Cached pages are keyed on the watcher's blocks, so anything they render
+    from the index must not be older than those.
+    """
+    watcher = get_live_watcher()
+    return get_synced_index(watcher.last_block if watcher else None)
+
+def mark_index_dirty():
+    """Make the next indexed read catch up with the chain first."""
+    try:
+        index = get_post_index(get_client())
+        if index:
+            index.mark_dirty()
+    except Exception as e:
+        print(f"Post index unavailable: {str(e)}")
+
+def load_post_content(post, prefetched=None):
+    """
+    Resolve the body of a raw post tuple from IPFS (or its fallbacks).
+    
+    Args:
+        post (tuple): Raw post tuple
+        prefetched (dict): IPFS data already fetched for this page, keyed by hash
+    
+    Returns:
+        tuple: (content, True if the content was actually read from IPFS)
+    """
+    content, resolved, _ = load_post_document(post, prefetched)
+    return content, resolved
 
-def get_all_posts():
-    """Get all posts from the forum."""
+def load_post_document(post, prefetched=None):
+    """
+    Same as load_post_content, also returning the IPFS document itself.
+    
+    Returns:
+        tuple: (content, resolved, document dict or None)
+    """
+    resolved = False
+    ipfs_data = None
+    try:
+        content = post[3]  # Default to using hash as content
+        if post[3].startswith("Qm"):  # Looks like an IPFS hash
+            if prefetched is not None:
+                ipfs_data = prefetched.get(post[3])
+            else:
+                ipfs_data = retrieve_post_content(post[3])
+            if ipfs_data and isinstance(ipfs_data, dict):
+                content = ipfs_data.get('content', post[3])
+                resolved = 'content' in ipfs_data
+            else:
+                content = f"Content with IPFS hash: {post[3]}"
+        elif post[3] == "direct_content":
+            content = post[2]  # Use title as content if IPFS failed
+    except Exception as e:
+        print(f"Error retrieving content for post {post[0]}: {str(e)}")
+        content = f"Error loading content: {post[3]}"
+    return content, resolved, ipfs_data if resolved else None
+
+def post_dict(post, content):
+    """Build the post dict used by the app from a raw post tuple and its content."""
+    return {
+        'id': post[0],
+        'author': post[1],
+        'title': post[2],
+        'content': content,
+        'ipfs_hash': post[3],
+        'timestamp': post[4],
+        'upvotes': post[5],
+        'downvotes': post[6],
+        'isNews': post[7]
+    }
+
+def post_excerpt(content, length=EXCERPT_LENGTH):
+    """Shorten a post body for list pages, with whitespace collapsed."""
+    text = " ".join((content or "").split())
+    if len(text) <= length:
+        return text
+    return text[:length] + "..."
+
+def add_sentiments(posts, content_hashes):
+    """
+    Attach sentiment to formatted news posts, analyzing them as one batch.
+    
+    Args:
+        posts (list): Formatted news post dicts
+        content_hashes (list): CID per post, or None where the content was not read from IPFS
+    """
+    if not posts:
+        return
+    try:
+        from sentiment import analyze_sentiment_batch_cached
+        # Resolved IPFS content is memoized under its CID
+        results = analyze_sentiment_batch_cached([p['content'] for p in posts], content_hashes)
+        for post_data, (sentiment, polarity) in zip(posts, results):
+            post_data['sentiment'] = sentiment
+            post_data['sentiment_score'] = polarity
+    except Exception as e:
+        print(f"Error analyzing sentiment: {str(e)}")
+
+def ipfs_hashes(posts):
+    """The content hashes of raw post tuples that point at IPFS."""
+    return [post[3] for post in posts if post[3].startswith("Qm")]
+
+def format_post(post, prefetched=None):
+    """
+    Turn a raw post tuple into the post dict used by the app.
+    
+    Args:
+        post (tuple): (id, author, title, contentHash, timestamp, upvotes, downvotes, isNews)
+        prefetched (dict): IPFS data already fetched for this page, keyed by hash
+    
+    Returns:
+        dict: Post data with content, excerpt and, for news posts, sentiment
+    """
+    content, resolved, document = load_post_document(post, prefetched)
+    post_data = post_dict(post, content)
+    post_data['excerpt'] = stored_excerpt(document, content)
+    
+    # Add sentiment for news posts, analyzing only those stored without it
+    if post_data['isNews']:
+        stored = stored_sentiment(document, content)
+        if stored:
+            post_data['sentiment'], post_data['sentiment_score'] = stored
+        else:
+            add_sentiments([post_data], [post[3] if resolved else None])
+    
+    return post_data
+
+def format_posts(posts, prefetched=None):
+    """
+    Format a page of raw post tuples, fetching their IPFS content in parallel.
+    
+    A slow or missing CID only degrades that post's content. News posts
+    use the sentiment stored in their IPFS envelope; the rest (legacy
+    posts) are analyzed in one batch.
+    
+    Args:
+        posts (list): Raw post tuples
+        prefetched (dict): IPFS data already fetched for these posts, keyed by hash
+    """
+    if prefetched is None:
+        hashes = ipfs_hashes(posts)
+        prefetched = dict(zip(hashes, retrieve_post_contents(hashes)))
+    
+    formatted = []
+    news_posts, news_hashes = [], []
+    for post in posts:
+        content, resolved, document = load_post_document(post, prefetched)
+        post_data = post_dict(post, content)
+        post_data['excerpt'] = stored_excerpt(document, content)
+        formatted.append(post_data)
+        if post_data['isNews']:
+            stored = stored_sentiment(document, content)
+            if stored:
+                post_data['sentiment'], post_data['sentiment_score'] = stored
+            else:
+                news_posts.append(post_data)
+                news_hashes.append(post[3] if resolved else None)
+    
+    add_sentiments(news_posts, news_hashes)
+    return formatted
+
+def format_posts_metadata(posts):
+    """
+    Format raw post tuples from chain data alone, for list pages.
+    
+    Nothing is read from IPFS and no sentiment is computed: 'content' is
+    None, and get_post_content() fills it in later.
+    """
+    return [post_dict(post, None) for post in posts]
+
+def get_all_posts(metadata_only=False):
+    """
+    Get all posts from the forum.
+    
+    Args:
+        metadata_only (bool): Skip IPFS content and sentiment (see format_posts_metadata)
+    """
     w3, contract, _ = get_contract()
+    format_rows = format_posts_metadata if metadata_only else format_posts
     
     try:
+        # Read from the local index when it is available
+        index = get_synced_index()
+        if index:
+            return format_rows(index.get_posts())
+        
         # Get post count
         post_count = contract.functions.postCount().call()
         
-        posts = []
-        # Get all posts
-        for i in range(1, post_count + 1):
-            post = contract.functions.posts(i).call()
-            # Get content from IPFS
-            try:
-                content = post[3]  # Default to using hash as content
-                if post[3].startswith("Qm"):  # Looks like an IPFS hash
-                    ipfs_data = retrieve_post_content(post[3])
-                    if ipfs_data and isinstance(ipfs_data, dict):
-                        content = ipfs_data.get('content', post[3])
-                    else:
-                        content = f"Content with IPFS hash: {post[3]}"
-                elif post[3] == "direct_content":
-                    content = post[2]  # Use title as content if IPFS failed
-            except Exception as e:
-                print(f"Error retrieving content for post {i}: {str(e)}")
-                content = f"Error loading content: {post[3]}"
-                
-            # Format post data
-            post_data = {
-                'id': post[0],
-                'author': post[1],
-                'title': post[2],
-                'content': content,
-                'ipfs_hash': post[3],
-                'timestamp': post[4],
-                'upvotes': post[5],
-                'downvotes': post[6],
-                'isNews': post[7]
-            }
-            
-            # Add sentiment for news posts
-            if post_data['isNews']:
-                try:
-                    from sentiment import analyze_sentiment
-                    sentiment, polarity = analyze_sentiment(content)
-                    post_data['sentiment'] = sentiment
-                    post_data['sentiment_score'] = polarity
-                except Exception as e:
-                    print(f"Error analyzing sentiment: {str(e)}")
-            
-            posts.append(post_data)
+        # Get all posts, a page per getPostsRange call (or per-post calls on older deployments)
+        rows = get_bulk_reader(get_client()).read_posts(range(1, post_count + 1))
         
-        return posts
+        return format_rows([rows[post_id] for post_id in sorted(rows)])
     
     except Exception as e:
         print(f"Error getting posts: {str(e)}")
         return []
 
+def new_page(limit=None):
+    """An empty posts page, with limit clamped to 1..MAX_POSTS_PER_PAGE (POSTS_PER_PAGE by default)."""
+    limit = max(1, min(limit or POSTS_PER_PAGE, MAX_POSTS_PER_PAGE))
+    return {'posts': [], 'limit': limit, 'post_count': 0, 'next_cursor': None, 'prev_cursor': None}
+
+def page_post_ids(page, cursor=None):
+    """
+    The post IDs shown on a page, newest first.
+    
+    Post IDs are assigned sequentially, so a page is just the IDs directly
+    below the cursor and never touches more posts than it returns.
+    
+    Args:
+        page (dict): Page from new_page() with 'post_count' filled in
+        cursor (int): Only return posts with an ID below this (None for the newest page)
+    """
+    top = page['post_count'] if cursor is None else min(cursor - 1, page['post_count'])
+    bottom = max(top - page['limit'] + 1, 1)
+    return list(range(top, bottom - 1, -1))
+
+def indexed_page_rows(index, post_ids):
+    """The index's rows for a page's post IDs (newest first), keyed by post ID."""
+    if not index:
+        return {}
+    return {post[0]: post for post in index.get_posts_between(post_ids[-1], post_ids[0])}
+
+def set_page_cursors(page, post_ids):
+    """Set the cursors for the older / newer page (None at either end)."""
+    top, bottom = post_ids[0], post_ids[-1]
+    if bottom > 1:
+        page['next_cursor'] = bottom
+    if top < page['post_count']:
+        page['prev_cursor'] = min(top + page['limit'], page['post_count']) + 1
+
+def get_posts_page(cursor=None, limit=None, metadata_only=False):
+    """
+    Get one page of posts, newest first (see page_post_ids).
+    
+    Args:
+        cursor (int): Only return posts with an ID below this (None for the newest page)
+        limit (int): Posts per page (defaults to POSTS_PER_PAGE)
+        metadata_only (bool): Skip IPFS content and sentiment (see format_posts_metadata)
+    
+    Returns:
+        dict: 'posts', 'limit', 'post_count', plus 'next_cursor' / 'prev_cursor'
+            to pass as the cursor for the older / newer page (None at either end)
+    """
+    w3, contract, _ = get_contract()
+    page = new_page(limit)
+    
+    try:
+        index = get_current_index()
+        if index:
+            page['post_count'] = index.max_post_id()
+        else:
+            page['post_count'] = contract.functions.postCount().call()
+        
+        post_ids = page_post_ids(page, cursor)
+        if not post_ids:
+            return page
+        
+        # Take what the index has, then read any gaps from chain in bulk
+        rows = indexed_page_rows(index, post_ids)
+        missing = [post_id for post_id in post_ids if post_id not in rows]
+        if missing:
+            rows.update(get_bulk_reader(get_client()).read_posts(missing))
+        
+        format_rows = format_posts_metadata if metadata_only else format_posts
+        page['posts'] = format_rows([rows[post_id] for post_id in post_ids if post_id in rows])
+        set_page_cursors(page, post_ids)
+        return page
+    
+    except Exception as e:
+        print(f"Error getting posts page: {str(e)}")
+        return page
+
+def get_author_post_ids(author_address):
+    """
+    Get the IDs of every post written by one address.
+    
+    Served from the local index when available, otherwise from PostCreated
+    logs filtered on the indexed author topic.
+    
+    Args:
+        author_address (str): Checksummed author address
+    
+    Returns:
+        list: Post IDs in ascending order
+    """
+    w3, contract, _ = get_contract()
+    
+    index = get_synced_index()
+    if index:
+        return index.get_post_ids_by_author(author_address)
+    
+    logs = contract.events.PostCreated.get_logs(
+        argument_filters={'author': author_address},
+        fromBlock=FORUM_INDEX_START_BLOCK
+    )
+    return sorted(log['args']['postId'] for log in logs)
+
+def get_posts_by_author(author_address):
+    """Get all posts written by one address."""
+    w3, contract, _ = get_contract()
+    
+    try:
+        if not is_valid_eth_address(author_address, w3):
+            print(f"Invalid address format: {author_address}")
+            return []
+        checksum_address = w3.to_checksum_address(author_address)
+        
+        index = get_current_index()
+        if index:
+            return format_posts(index.get_posts_by_author(checksum_address))
+        
+        # Look the author's posts up by event topic, then read just those
+        post_ids = get_author_post_ids(checksum_address)
+        rows = get_bulk_reader(get_client()).read_posts(post_ids)
+        
+        return format_posts([rows[post_id] for post_id in post_ids if post_id in rows])
+    
+    except Exception as e:
+        print(f"Error getting posts for {author_address}: {str(e)}")
+        return []
+
+def get_author_sentiment(author_address):
+    """
+    Get the sentiment tag an author's news posts add up to.
+    
+    Read from the running per-author tally in the post index. News posts
+    the tally has not seen yet (e.g. created by another process) are added
+    with the sentiment stored in their IPFS envelope, or, for legacy posts,
+    analyzed once as a batch. Without an index every news post by the
+    author is formatted (and, if legacy, re-analyzed).
+    
+    Args:
+        author_address (str): Author address
+    
+    Returns:
+        str: 'positive', 'negative' or 'neutral' (also on a tie)
+    """
+    from sentiment import analyze_sentiment_batch_cached, determine_user_sentiment, dominant_sentiment
+    w3, contract, _ = get_contract()
+    
+    index = get_synced_index()
+    if not index:
+        return determine_user_sentiment(get_posts_by_author(author_address))
+    
+    author = w3.to_checksum_address(author_address)
+    unscored = index.get_unscored_news_posts(author)
+    if unscored:
+        hashes = ipfs_hashes(unscored)
+        prefetched = dict(zip(hashes, retrieve_post_contents(hashes)))
+        post_ids, texts, content_hashes = [], [], []
+        for post in unscored:
+            content, resolved, document = load_post_document(post, prefetched)
+            # Content that could not be fetched is left for a later call
+            if post[3].startswith("Qm") and not resolved:
+                continue
+            stored = stored_sentiment(document, content)
+            if stored:
+                index.record_post_sentiment(post[0], author, stored[0])
+                continue
+            post_ids.append(post[0])
+            texts.append(content)
+            content_hashes.append(post[3] if resolved else None)
+        results = analyze_sentiment_batch_cached(texts, content_hashes)
+        for post_id, (sentiment, _) in zip(post_ids, results):
+            index.record_post_sentiment(post_id, author, sentiment)
+    
+    return dominant_sentiment(index.get_sentiment_counts(author))
+
+def format_reputation(rep_data):
+    """Turn a getUserReputation() result into the reputation dict used by the app."""
+    return {
+        'totalPosts': rep_data[0],
+        'totalUpvotesReceived': rep_data[1],
+        'totalDownvotesReceived': rep_data[2],
+        'reputationScore': rep_data[3] / 100,  # Convert to a score out of 10
+        'sentimentTag': rep_data[4]
+    }
+
+def default_reputation():
+    """Reputation shown when the chain cannot be read."""
+    return {
+        'totalPosts': 0,
+        'totalUpvotesReceived': 0,
+        'totalDownvotesReceived': 0,
+        'reputationScore': 5.0,  # Default score
+        'sentimentTag': 'neutral'
+    }
+
+def get_live_watcher():
+    """Return the chain watcher if its read caches can be trusted right now, else None."""
+    try:
+        watcher = get_chain_watcher(get_client())
+        if watcher and watcher.is_current():
+            return watcher
+    except Exception as e:
+        print(f"Chain watcher unavailable: {str(e)}")
+    return None
+
 def get_user_reputation(user_address):
     """Get reputation data for a user."""
     w3, contract, _ = get_contract()
@@ -285,83 +923,171 @@ def get_user_reputation(user_address):
         
         # Convert to checksum address
         checksum_address = w3.to_checksum_address(user_address)
+        
+        # Served from cache until the chain watcher sees this user's reputation change
+        watcher = get_live_watcher()
+        if watcher:
+            cached = watcher.reputations.get(checksum_address)
+            if cached:
+                return dict(cached)
+            token = watcher.reputations.token(checksum_address)
             
         # Get user reputation
         rep_data = contract.functions.getUserReputation(checksum_address).call()
+        reputation = format_reputation(rep_data)
         
-        # Format reputation data
-        reputation = {
-            'totalPosts': rep_data[0],
-            'totalUpvotesReceived': rep_data[1],
-            'totalDownvotesReceived': rep_data[2],
-            'reputationScore': rep_data[3] / 100,  # Convert to a score out of 10
-            'sentimentTag': rep_data[4]
-        }
-        
+        if watcher:
+            watcher.reputations.put(checksum_address, dict(reputation), token)
         return reputation
     
     except Exception as e:
         print(f"Error getting user reputation: {str(e)}")
-        return {
-            'totalPosts': 0,
-            'totalUpvotesReceived': 0,
-            'totalDownvotesReceived': 0,
-            'reputationScore': 5.0,  # Default score
-            'sentimentTag': 'neutral'
-        }
+        return default_reputation()
 
 def get_post(post_id):
     """Get a specific post by ID."""
     w3, contract, _ = get_contract()
     
     try:
-        # Get post data
-        post = contract.functions.posts(post_id).call()
+        # Served from cache until the chain watcher sees this post change
+        watcher = get_live_watcher()
+        if watcher:
+            cached = watcher.posts.get(post_id)
+            if cached:
+                return dict(cached)
+            token = watcher.posts.token(post_id)
         
-        # Get content from IPFS
-        try:
-            content = post[3]  # Default to using hash as content
-            if post[3].startswith("Qm"):  # Looks like an IPFS hash
-                ipfs_data = retrieve_post_content(post[3])
-                if ipfs_data and isinstance(ipfs_data, dict):
-                    content = ipfs_data.get('content', post[3])
-                else:
-                    content = f"Content with IPFS hash: {post[3]}"
-            elif post[3] == "direct_content":
-                content = post[2]  # Use title as content if IPFS failed
-        except Exception as e:
-            print(f"Error retrieving content for post {post_id}: {str(e)}")
-            content = f"Error loading content: {post[3]}"
-        
-        # Format post data
-        post_data = {
-            'id': post[0],
-            'author': post[1],
-            'title': post[2],
-            'content': content,
-            'ipfs_hash': post[3],
-            'timestamp': post[4],
-            'upvotes': post[5],
-            'downvotes': post[6],
-            'isNews': post[7]
-        }
-        
-        # Add sentiment for news posts
-        if post_data['isNews']:
-            try:
-                from sentiment import analyze_sentiment
-                sentiment, polarity = analyze_sentiment(content)
-                post_data['sentiment'] = sentiment
-                post_data['sentiment_score'] = polarity
-            except Exception as e:
-                print(f"Error analyzing sentiment: {str(e)}")
+        # Get post data, from the index if it has caught up with this post
+        post = None
+        index = get_current_index()
+        if index:
+            post = index.get_post(post_id)
+        if post is None:
+            post = normalize_post(contract.functions.posts(post_id).call())
         
+        post_data = format_post(post)
+        # posts(i) returns an empty post for unknown IDs; those are not cached
+        if watcher and post_data['id'] == post_id:
+            watcher.posts.put(post_id, dict(post_data), token)
         return post_data
     
     except Exception as e:
         print(f"Error getting post {post_id}: {str(e)}")
         return None
 
+def get_post_metadata(post_id):
+    """
+    Get the chain fields of a post without reading its IPFS content.
+    
+    Returns:
+        dict: The post as formatted by format_posts_metadata ('content' is
+            None); None if the post does not exist
+    """
+    w3, contract, _ = get_contract()
+    
+    try:
+        index = get_synced_index()
+        post = index.get_post(post_id) if index else None
+        if post is None:
+            post = normalize_post(contract.functions.posts(post_id).call())
+        # posts(i) returns an empty post for unknown IDs
+        if post[0] != post_id:
+            return None
+        return format_posts_metadata([post])[0]
+    
+    except Exception as e:
+        print(f"Error getting post {post_id}: {str(e)}")
+        return None
+
+def post_content_dict(post_data):
+    """The IPFS-backed fields of a formatted post, as served to list pages."""
+    content = {
+        'id': post_data['id'],
+        'content': post_data['content'],
+        'excerpt': post_data.get('excerpt') or post_excerpt(post_data['content']),
+        'isNews': post_data['isNews']
+    }
+    if post_data.get('sentiment'):
+        content['sentiment'] = post_data['sentiment']
+        content['sentiment_score'] = post_data.get('sentiment_score')
+    return content
+
+def get_post_content(post_id):
+    """
+    Get the body of one post, with its excerpt and (for news) sentiment.
+    
+    The counterpart of metadata-only listings: pages render from chain data
+    and fetch this per post afterwards.
+    
+    Args:
+        post_id (int): ID of the post
+    
+    Returns:
+        dict: 'id', 'content', 'excerpt', 'isNews', plus 'sentiment' and
+            'sentiment_score' for news posts; None if the post does not exist
+    """
+    post_data = get_post(post_id)
+    # posts(i) returns an empty post for unknown IDs
+    if not post_data or post_data['id'] != post_id:
+        return None
+    return post_content_dict(post_data)
+
+def indexed_author(post_id):
+    """The author of a post according to the local index, or None if it is not indexed."""
+    index = get_synced_index()
+    post = index.get_post(post_id) if index else None
+    return post[1] if post else None
+
+def checksum_or_none(address, w3):
+    """The checksummed form of a valid address, otherwise None."""
+    if address and is_valid_eth_address(address, w3):
+        return w3.to_checksum_address(address)
+    return None
+
+def read_post_detail(post_id, viewer_address=None):
+    """
+    Read the chain data the post page needs in a single JSON-RPC batch.
+    
+    Args:
+        post_id (int): ID of the post
+        viewer_address (str): Logged-in user whose vote should be looked up
+    
+    Returns:
+        tuple: (post tuple, getUserReputation result, (has_voted, is_upvote))
+    """
+    w3, contract, _ = get_contract()
+    
+    # The index tells us the author up front, so the reputation read can
+    # go into the same batch as the post itself
+    author = indexed_author(post_id)
+    viewer = checksum_or_none(viewer_address, w3)
+    
+    caller = BatchCaller(w3)
+    post_call = caller.add(contract.functions.posts(post_id))
+    if author:
+        reputation_call = caller.add(contract.functions.getUserReputation(author))
+    if viewer:
+        vote_call = caller.add(contract.functions.hasUserVoted(post_id, viewer))
+    results = caller.execute()
+    
+    post = results[post_call]
+    if isinstance(post, BatchCallError):
+        raise post
+    post = normalize_post(post)
+    
+    if author:
+        rep_data = results[reputation_call]
+        if isinstance(rep_data, BatchCallError):
+            raise rep_data
+    else:
+        rep_data = contract.functions.getUserReputation(post[1]).call()
+    
+    vote_state = (False, False)
+    if viewer and not isinstance(results[vote_call], BatchCallError):
+        vote_state = tuple(results[vote_call])
+    
+    return post, rep_data, vote_state
+
 def has_user_voted(post_id, user_address):
     """Check if a user has voted on a post."""
     w3, contract, _ = get_contract()
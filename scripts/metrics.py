@@ -0,0 +1,198 @@
+import contextlib
+import contextvars
+import functools
+import os
+import threading
+import time
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Set METRICS_ENABLED=0 to turn every hook into a no-op
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+# Set SERVER_TIMING=1 to add a Server-Timing header with the per-request breakdown
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Route label for work done outside a request (background threads, scripts)
+NO_ROUTE = "background"
+
+# Per-request state: {'route': endpoint, 'timings': {operation: [count, seconds]}}
+_request = contextvars.ContextVar("blocktalks_request", default=None)
+
+
+class Histogram:
+    """Cumulative latency histogram per label tuple, in Prometheus layout."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.series = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, labels, seconds):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                series[i] += 1
+        series[len(self.buckets)] += 1
+        series[-1] += seconds
+
+    def render(self, name, label_names):
+        lines = []
+        for labels, series in sorted(self.series.items()):
+            label_text = ",".join(f'{key}="{escape_label(value)}"' for key, value in zip(label_names, labels))
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {count}')
+            lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {series[len(self.buckets)]}')
+            lines.append(f'{name}_sum{{{label_text}}} {series[-1]:.6f}')
+            lines.append(f'{name}_count{{{label_text}}} {series[len(self.buckets)]}')
+        return lines
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """
+    Process-wide latency histograms for the forum's expensive operations.
+
+    Operations (RPC calls, IPFS reads and writes, sentiment analysis,
+    template rendering) are recorded per (operation, name, route), where
+    name narrows the operation down (the contract function or JSON-RPC
+    method, the template file) and route is the Flask endpoint that was
+    being served. Whole requests are recorded per (route, method, status).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.operations = Histogram()
+        self.requests = Histogram()
+
+    def observe(self, operation, name, seconds):
+        state = _request.get()
+        route = state['route'] if state else NO_ROUTE
+        with self._lock:
+            self.operations.observe((operation, name or "", route), seconds)
+            if state:
+                timing = state['timings'].setdefault(operation, [0, 0.0])
+                timing[0] += 1
+                timing[1] += seconds
+
+    def observe_request(self, route, method, status, seconds):
+        with self._lock:
+            self.requests.observe((route, method, str(status)), seconds)
+
+    def snapshot_timings(self, state):
+        """Copy a request's per-operation timings (pool threads may still be adding to them)."""
+        with self._lock:
+            return {operation: tuple(timing) for operation, timing in state['timings'].items()}
+
+    def render(self):
+        """All series in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [
+                "# HELP blocktalks_operation_duration_seconds Time spent in RPC, IPFS, sentiment and template operations.",
+                "# TYPE blocktalks_operation_duration_seconds histogram",
+            ]
+            lines += self.operations.render("blocktalks_operation_duration_seconds", ("operation", "name", "route"))
+            lines += [
+                "# HELP blocktalks_request_duration_seconds Time spent serving HTTP requests.",
+                "# TYPE blocktalks_request_duration_seconds histogram",
+            ]
+            lines += self.requests.render("blocktalks_request_duration_seconds", ("route", "method", "status"))
+        return "\n".join(lines) + "\n"
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """Return the process-wide Metrics registry, creating it on first use."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = Metrics()
+    return _metrics
+
+
+@contextlib.contextmanager
+def track(operation, name=None):
+    """
+    Record how long the with-block takes.
+
+    Args:
+        operation (str): Operation family, e.g. "rpc" or "ipfs_get"
+        name (str): Finer label within the operation, e.g. the contract function
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if METRICS_ENABLED:
+            get_metrics().observe(operation, name, time.perf_counter() - started)
+
+
+def timed(operation, name=None):
+    """Decorator form of track(); name defaults to the function name."""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS_ENABLED:
+                return func(*args, **kwargs)
+            with track(operation, label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def begin_request(route):
+    """Start collecting per-operation timings for the request being served."""
+    _request.set({'route': route or "unmatched", 'timings': {}, 'started': time.perf_counter()})
+
+
+def end_request(method, status):
+    """
+    Record the request that begin_request() started.
+
+    Returns:
+        dict: {operation: (count, seconds)} for the request, or None if none was started
+    """
+    state = _request.get()
+    if state is None:
+        return None
+    _request.set(None)
+    elapsed = time.perf_counter() - state['started']
+    metrics = get_metrics()
+    if METRICS_ENABLED:
+        metrics.observe_request(state['route'], method, status, elapsed)
+    timings = metrics.snapshot_timings(state)
+    timings['total'] = (1, elapsed)
+    return timings
+
+
+def server_timing_header(timings):
+    """Format request timings as a Server-Timing header value."""
+    entries = []
+    for operation, (count, seconds) in sorted(timings.items(), key=lambda item: -item[1][1]):
+        entry = f"{operation};dur={seconds * 1000:.1f}"
+        if operation != 'total':
+            entry += f';desc="{count} calls"'
+        entries.append(entry)
+    return ", ".join(entries)
+
+
+def propagate(func):
+    """
+    Bind func to the caller's request so work handed to a thread pool is
+    still attributed to the route (and Server-Timing) of that request.
+    """
+    return functools.partial(contextvars.copy_context().run, func)
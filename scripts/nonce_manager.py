@@ -0,0 +1,159 @@
+import os
+import threading
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Gas price multiplier used when replacing a stuck transaction (nodes need >= 10%)
+TX_REPLACEMENT_BUMP = float(os.getenv("TX_REPLACEMENT_BUMP", "1.125"))
+
+# Node errors that mean our idea of the next nonce is out of date
+NONCE_ERRORS = ("nonce too low", "nonce too high", "already known", "known transaction",
+                "replacement transaction underpriced", "correct nonce", "invalid transaction nonce")
+
+
+def is_nonce_error(error_msg):
+    """True if a node error means the sender's nonce needs resyncing."""
+    error_msg = error_msg.lower()
+    return any(marker in error_msg for marker in NONCE_ERRORS)
+
+
+class NonceManager:
+    """
+    Hands out transaction nonces per sender address.
+
+    The pending nonce is fetched from the node once per address; after that
+    nonces are allocated locally. Allocation and sending happen under a
+    per-address lock, so concurrent requests from the same account never
+    reuse a nonce or leave a gap. Any send failure resyncs the address
+    from the node, and nonce errors are retried once.
+    """
+
+    def __init__(self, w3):
+        self.w3 = w3
+        self._lock = threading.Lock()
+        self._address_locks = {}
+        self._next_nonce = {}
+
+    def _address_lock(self, address):
+        with self._lock:
+            if address not in self._address_locks:
+                self._address_locks[address] = threading.Lock()
+            return self._address_locks[address]
+
+    def _fetch(self, address):
+        return self.w3.eth.get_transaction_count(address, 'pending')
+
+    def resync(self, address):
+        """Forget the local nonce so the next allocation asks the node again."""
+        # Waits for a send in progress from the same address instead of racing it
+        with self._address_lock(address):
+            self._next_nonce.pop(address, None)
+
+    def peek(self, address):
+        """The nonce the next transaction from address will use."""
+        with self._address_lock(address):
+            if address not in self._next_nonce:
+                self._next_nonce[address] = self._fetch(address)
+            return self._next_nonce[address]
+
+    def send(self, address, send_fn):
+        """
+        Allocate a nonce and send a transaction with it, atomically.
+
+        Args:
+            address (str): Checksummed sender address
+            send_fn (callable): Called with the nonce; sends the transaction
+                and returns its hash
+
+        Returns:
+            HexBytes: Transaction hash
+        """
+        with self._address_lock(address):
+            for attempt in range(2):
+                if address not in self._next_nonce:
+                    self._next_nonce[address] = self._fetch(address)
+                nonce = self._next_nonce[address]
+                try:
+                    tx_hash = send_fn(nonce)
+                except Exception as e:
+                    # The node's view of this account is authoritative after a failure
+                    self._next_nonce.pop(address, None)
+                    if attempt == 0 and is_nonce_error(str(e)):
+                        print(f"Nonce {nonce} rejected for {address}, resyncing")
+                        continue
+                    raise
+                self._next_nonce[address] = nonce + 1
+                return tx_hash
+
+    def transact(self, contract_function, from_account, tx_params=None):
+        """
+        Send a contract transaction with a managed nonce.
+
+        Args:
+            contract_function: Bound contract function, e.g. contract.functions.votePost(1, True)
+            from_account (str): Checksummed sender address
+            tx_params (dict): Extra transaction fields (gas, gasPrice, ...)
+
+        Returns:
+            HexBytes: Transaction hash
+        """
+        def send_fn(nonce):
+            params = dict(tx_params or {})
+            params.update({'from': from_account, 'nonce': nonce})
+            return contract_function.transact(params)
+
+        return self.send(from_account, send_fn)
+
+    def replace(self, tx_hash, bump=None):
+        """
+        Re-send a stuck transaction with the same nonce and a higher gas price.
+
+        Args:
+            tx_hash (str): Hash of the pending transaction to replace
+            bump (float): Gas price multiplier (defaults to TX_REPLACEMENT_BUMP)
+
+        Returns:
+            HexBytes: Hash of the replacement transaction
+        """
+        bump = bump or TX_REPLACEMENT_BUMP
+        tx = self.w3.eth.get_transaction(tx_hash)
+        if tx.get('blockNumber') is not None:
+            raise ValueError(f"Transaction {self.w3.to_hex(tx_hash)} is already mined")
+
+        replacement = {
+            'from': tx['from'],
+            'to': tx['to'],
+            'data': tx['input'],
+            'value': tx['value'],
+            'gas': tx['gas'],
+            'nonce': tx['nonce']
+        }
+        if tx.get('maxFeePerGas') is not None:
+            replacement['maxFeePerGas'] = int(tx['maxFeePerGas'] * bump)
+            replacement['maxPriorityFeePerGas'] = int(tx['maxPriorityFeePerGas'] * bump)
+        else:
+            replacement['gasPrice'] = int(tx['gasPrice'] * bump)
+
+        with self._address_lock(tx['from']):
+            return self.w3.eth.send_transaction(replacement)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_nonce_manager(client):
+    """
+    Return the process-wide NonceManager.
+
+    Args:
+        client (ForumClient): Shared blockchain client
+    """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = NonceManager(client.w3)
+    return _manager
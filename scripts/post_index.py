@@ -0,0 +1,387 @@
+import os
+import sqlite3
+import threading
+import time
+from dotenv import load_dotenv
+from scripts.cid import content_hash_str
+from scripts.batch_rpc import batch_requests, BatchCallError
+from scripts.chain_watcher import event_topics
+
+# Load environment variables
+load_dotenv()
+
+# Local index settings (set FORUM_INDEX_PATH to an empty string to disable)
+FORUM_INDEX_PATH = os.getenv("FORUM_INDEX_PATH", "forum_index.db")
+FORUM_INDEX_START_BLOCK = int(os.getenv("FORUM_INDEX_START_BLOCK", "0"))
+FORUM_INDEX_SYNC_INTERVAL = float(os.getenv("FORUM_INDEX_SYNC_INTERVAL", "2"))
+FORUM_INDEX_LOG_CHUNK = int(os.getenv("FORUM_INDEX_LOG_CHUNK", "5000"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    author TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    upvotes INTEGER NOT NULL DEFAULT 0,
+    downvotes INTEGER NOT NULL DEFAULT 0,
+    is_news INTEGER NOT NULL,
+    block_number INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posts_author ON posts (author);
+CREATE TABLE IF NOT EXISTS user_sentiment (
+    address TEXT PRIMARY KEY,
+    sentiment_tag TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS post_sentiment (
+    post_id INTEGER PRIMARY KEY,
+    author TEXT NOT NULL,
+    label TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS author_sentiment (
+    address TEXT PRIMARY KEY,
+    positive INTEGER NOT NULL DEFAULT 0,
+    negative INTEGER NOT NULL DEFAULT 0,
+    neutral INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+SENTIMENT_LABELS = ("positive", "negative", "neutral")
+
+# Events replayed into the index, fetched together with one eth_getLogs per chunk
+INDEXED_EVENTS = ("PostCreated", "PostVoted", "UserSentimentUpdated")
+
+POST_COLUMNS = "id, author, title, content_hash, timestamp, upvotes, downvotes, is_news"
+
+
+class PostIndex:
+    """
+    SQLite materialized view of DiscussionForum state.
+
+    Built by replaying PostCreated, PostVoted and UserSentimentUpdated logs
+    in (block, log index) order and checkpointed by the last applied block,
+    so each sync only fetches logs for blocks it has not seen yet. Rows are
+    returned as tuples shaped like the contract's posts(i) getter.
+
+    One sync runs at a time, and only applying a fetched chunk holds the
+    connection lock, so reads are not held up by the sync's RPC calls.
+    """
+
+    def __init__(self, client, path=None, start_block=None):
+        self.client = client
+        self.path = path or FORUM_INDEX_PATH
+        self.start_block = FORUM_INDEX_START_BLOCK if start_block is None else start_block
+        self._lock = threading.RLock()
+        self._sync_lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._last_sync = 0
+        self._synced_block = None
+        self._dirty = True
+        self._block_times = {}
+        self._topics = (None, {})
+
+    def _get_meta(self, key):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value))
+        )
+
+    def _reset_if_redeployed(self, contract_address):
+        if self._get_meta("contract_address") == contract_address:
+            return
+        # A different contract means none of the indexed state applies
+        with self._conn:
+            self._conn.execute("DELETE FROM posts")
+            self._conn.execute("DELETE FROM user_sentiment")
+            self._conn.execute("DELETE FROM post_sentiment")
+            self._conn.execute("DELETE FROM author_sentiment")
+            self._conn.execute("DELETE FROM meta")
+            self._set_meta("contract_address", contract_address)
+        self._block_times.clear()
+
+    @property
+    def last_block(self):
+        """Last block whose logs have been applied, or None before the first sync."""
+        value = self._get_meta("last_block")
+        return int(value) if value is not None else None
+
+    def _prefetch_block_timestamps(self, logs):
+        """Fetch the timestamps of the blocks that created posts in one JSON-RPC batch."""
+        block_numbers = sorted({
+            log['blockNumber'] for log in logs
+            if log['event'] == 'PostCreated' and log['blockNumber'] not in self._block_times
+        })
+        if not block_numbers:
+            return
+        blocks = batch_requests(
+            self.client.w3, "eth_getBlockByNumber", [[hex(number), False] for number in block_numbers]
+        )
+        for number, block in zip(block_numbers, blocks):
+            if block and not isinstance(block, BatchCallError):
+                self._block_times[number] = int(block['timestamp'], 16)
+        # Failed entries are fetched one by one, still before the chunk is applied
+        for number in block_numbers:
+            self._block_timestamp(number)
+
+    def _block_timestamp(self, block_number):
+        if block_number not in self._block_times:
+            block = self.client.w3.eth.get_block(block_number)
+            self._block_times[block_number] = block['timestamp']
+        return self._block_times[block_number]
+
+    def _event_topics(self, contract):
+        if self._topics[0] != contract.address:
+            self._topics = (contract.address, event_topics(self.client.w3, contract, INDEXED_EVENTS))
+        return self._topics[1]
+
+    def _fetch_logs(self, from_block, to_block):
+        w3 = self.client.w3
+        contract = self.client.contract
+        topics = self._event_topics(contract)
+        # Any of the indexed events: one topic0 OR instead of a request per event
+        raw_logs = w3.eth.get_logs({
+            'address': contract.address,
+            'fromBlock': from_block,
+            'toBlock': to_block,
+            'topics': [list(topics)]
+        })
+        logs = []
+        for log in raw_logs:
+            event = topics.get(w3.to_hex(log['topics'][0]))
+            if event is not None:
+                logs.append(event().process_log(log))
+        logs.sort(key=lambda log: (log['blockNumber'], log['logIndex']))
+        return logs
+
+    def _apply(self, log):
+        args = log['args']
+        if log['event'] == 'PostCreated':
+            self._conn.execute(
+                "INSERT OR REPLACE INTO posts (" + POST_COLUMNS + ", block_number) "
+                "VALUES (?, ?, ?, ?, ?, 0, 0, ?, ?)",
+                (
+                    args['postId'],
+                    args['author'],
+                    args['title'],
+                    content_hash_str(args['contentHash']),
+                    self._block_timestamp(log['blockNumber']),
+                    int(args['isNews']),
+                    log['blockNumber']
+                )
+            )
+        elif log['event'] == 'PostVoted':
+            column = "upvotes" if args['isUpvote'] else "downvotes"
+            self._conn.execute(
+                f"UPDATE posts SET {column} = {column} + 1 WHERE id = ?", (args['postId'],)
+            )
+        elif log['event'] == 'UserSentimentUpdated':
+            self._conn.execute(
+                "INSERT OR REPLACE INTO user_sentiment (address, sentiment_tag) VALUES (?, ?)",
+                (args['user'], args['sentimentTag'])
+            )
+
+    def sync(self):
+        """
+        Replay logs from the block after the checkpoint up to the chain head.
+
+        Returns:
+            int: Number of logs applied
+        """
+        with self._sync_lock:
+            # Writes marked dirty from here on are not covered by this sync
+            self._dirty = False
+            try:
+                contract = self.client.contract
+                with self._lock:
+                    self._reset_if_redeployed(contract.address)
+                    last_block = self.last_block
+
+                head = self.client.w3.eth.block_number
+                from_block = self.start_block if last_block is None else last_block + 1
+
+                applied = 0
+                while from_block <= head:
+                    to_block = min(from_block + FORUM_INDEX_LOG_CHUNK - 1, head)
+                    logs = self._fetch_logs(from_block, to_block)
+                    self._prefetch_block_timestamps(logs)
+                    # Apply the chunk and advance the checkpoint atomically
+                    with self._lock, self._conn:
+                        for log in logs:
+                            self._apply(log)
+                        self._set_meta("last_block", to_block)
+                    applied += len(logs)
+                    from_block = to_block + 1
+            except Exception:
+                self._dirty = True
+                raise
+
+            self._synced_block = head
+            self._last_sync = time.time()
+            return applied
+
+    def is_stale(self, max_age=None, min_block=None):
+        """
+        True if reads should sync first.
+
+        Args:
+            max_age (float): Seconds a sync stays fresh (defaults to FORUM_INDEX_SYNC_INTERVAL)
+            min_block (int): Also stale until this block has been applied
+        """
+        max_age = FORUM_INDEX_SYNC_INTERVAL if max_age is None else max_age
+        if min_block is not None and (self._synced_block is None or self._synced_block < min_block):
+            return True
+        return self._dirty or time.time() - self._last_sync >= max_age
+
+    def sync_if_stale(self, max_age=None, min_block=None):
+        """
+        Sync if is_stale(max_age, min_block).
+
+        Requests that queued behind another request's sync check again once
+        it is done, so a stale index is caught up once, not once per request.
+
+        Returns:
+            int: Number of logs applied
+        """
+        if not self.is_stale(max_age, min_block):
+            return 0
+        with self._sync_lock:
+            if not self.is_stale(max_age, min_block):
+                return 0
+            return self.sync()
+
+    def mark_dirty(self):
+        """Force the next sync_if_stale() to hit the chain (call after a write)."""
+        self._dirty = True
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [row[:7] + (bool(row[7]),) for row in rows]
+
+    def post_count(self):
+        """Number of indexed posts."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def get_post(self, post_id):
+        """Return the indexed post tuple for post_id, or None if not indexed."""
+        rows = self._query("SELECT " + POST_COLUMNS + " FROM posts WHERE id = ?", (post_id,))
+        return rows[0] if rows else None
+
+    def max_post_id(self):
+        """Highest indexed post ID (post IDs are assigned sequentially from 1)."""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM posts").fetchone()[0]
+
+    def get_posts_between(self, low, high):
+        """Return indexed post tuples with low <= id <= high, newest first."""
+        return self._query(
+            "SELECT " + POST_COLUMNS + " FROM posts WHERE id BETWEEN ? AND ? ORDER BY id DESC",
+            (low, high)
+        )
+
+    def get_posts(self):
+        """Return every indexed post tuple in ID order."""
+        return self._query("SELECT " + POST_COLUMNS + " FROM posts ORDER BY id")
+
+    def get_posts_by_author(self, author):
+        """Return the post tuples written by a checksummed author address, in ID order."""
+        return self._query(
+            "SELECT " + POST_COLUMNS + " FROM posts WHERE author = ? ORDER BY id", (author,)
+        )
+
+    def get_post_ids_by_author(self, author):
+        """Return the IDs of posts written by a checksummed author address, ascending."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM posts WHERE author = ? ORDER BY id", (author,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_sentiment_tag(self, address):
+        """Return the last sentimentTag written for a checksummed address, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sentiment_tag FROM user_sentiment WHERE address = ?", (address,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def record_post_sentiment(self, post_id, author, label):
+        """
+        Count a news post's sentiment in its author's running tally.
+
+        Each post is counted at most once, so repeated calls are harmless.
+
+        Args:
+            post_id (int): ID of the news post
+            author (str): Checksummed author address
+            label (str): 'positive', 'negative' or 'neutral'
+
+        Returns:
+            bool: True if the post was newly counted
+        """
+        if label not in SENTIMENT_LABELS:
+            raise ValueError(f"Unknown sentiment label: {label}")
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO post_sentiment (post_id, author, label) VALUES (?, ?, ?)",
+                (post_id, author, label)
+            )
+            if not cursor.rowcount:
+                return False
+            self._conn.execute(
+                "INSERT OR IGNORE INTO author_sentiment (address) VALUES (?)", (author,)
+            )
+            self._conn.execute(
+                f"UPDATE author_sentiment SET {label} = {label} + 1 WHERE address = ?", (author,)
+            )
+            return True
+
+    def get_sentiment_counts(self, author):
+        """Return the author's tally as {'positive': n, 'negative': n, 'neutral': n}."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT positive, negative, neutral FROM author_sentiment WHERE address = ?",
+                (author,)
+            ).fetchone()
+        return dict(zip(SENTIMENT_LABELS, row or (0, 0, 0)))
+
+    def get_unscored_news_posts(self, author):
+        """Return the author's indexed news post tuples not yet in the sentiment tally."""
+        return self._query(
+            "SELECT " + POST_COLUMNS + " FROM posts WHERE author = ? AND is_news = 1 "
+            "AND id NOT IN (SELECT post_id FROM post_sentiment) ORDER BY id",
+            (author,)
+        )
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_post_index(client):
+    """
+    Return the process-wide PostIndex, or None when indexing is disabled.
+
+    Args:
+        client (ForumClient): Shared blockchain client
+
+    Returns:
+        PostIndex: The shared index
+    """
+    global _index
+    if not FORUM_INDEX_PATH:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PostIndex(client)
+    return _index
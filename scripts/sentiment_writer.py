@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Seconds pending sentiment updates are collected before being written
+SENTIMENT_FLUSH_INTERVAL = float(os.getenv("SENTIMENT_FLUSH_INTERVAL", "5"))
+
+
+class SentimentWriter:
+    """
+    Writes authors' sentiment tags to the chain in the background.
+
+    schedule() only records the latest tag wanted for an author. Once per
+    flush window a worker thread sends at most one updateUserSentiment
+    transaction per author, and none at all when the tag already matches
+    the stored sentimentTag (or an update still in flight).
+    """
+
+    def __init__(self, client, flush_interval=None):
+        self.client = client
+        self.flush_interval = SENTIMENT_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._sent = {}
+        self._worker = None
+        self.stats = {'scheduled': 0, 'coalesced': 0, 'skipped': 0, 'sent': 0}
+
+    def schedule(self, user_address, sentiment_tag, from_address=None):
+        """
+        Ask for a user's sentiment tag to be written in the next flush.
+
+        Args:
+            user_address (str): Checksummed address of the user to update
+            sentiment_tag (str): New sentiment tag
+            from_address (str): Account that pays for the update
+        """
+        with self._lock:
+            self.stats['scheduled'] += 1
+            if user_address in self._pending:
+                self.stats['coalesced'] += 1
+            # A later tag for the same author replaces the earlier one
+            self._pending[user_address] = (sentiment_tag, from_address)
+        self._ensure_worker()
+
+    def _current_tag(self, user_address, stored_tags):
+        from scripts.interact import get_stored_sentiment_tag, get_transaction_status
+
+        # An update that has been sent but not yet mined is the tag to compare with
+        sent = self._sent.get(user_address)
+        if sent:
+            sent_tag, tx_hash = sent
+            status = get_transaction_status(tx_hash)
+            while status and status['status'] == 'replaced':
+                status = get_transaction_status(status['replaced_by'])
+            if status and status['status'] == 'pending':
+                return sent_tag
+            del self._sent[user_address]
+        if user_address in stored_tags:
+            return stored_tags[user_address]
+        return get_stored_sentiment_tag(user_address)
+
+    def flush(self):
+        """
+        Write every pending update now.
+
+        Returns:
+            int: Number of transactions sent
+        """
+        from scripts.interact import submit_user_sentiment, get_stored_sentiment_tags
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        # Every pending author's stored tag in one read; ones it misses are read singly
+        try:
+            stored_tags = get_stored_sentiment_tags(list(pending))
+        except Exception as e:
+            print(f"Error reading stored sentiment tags: {str(e)}")
+            stored_tags = {}
+
+        sent = 0
+        for user_address, (sentiment_tag, from_address) in pending.items():
+            try:
+                if self._current_tag(user_address, stored_tags) == sentiment_tag:
+                    self.stats['skipped'] += 1
+                    continue
+                tx_hash, error = submit_user_sentiment(user_address, sentiment_tag, from_address=from_address)
+                if error:
+                    print(f"Note: {error}")
+                    continue
+                self._sent[user_address] = (sentiment_tag, tx_hash)
+                self.stats['sent'] += 1
+                sent += 1
+            except Exception as e:
+                print(f"Error writing sentiment for {user_address}: {str(e)}")
+        return sent
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="sentiment-writer", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_sentiment_writer(client):
+    """
+    Return the process-wide SentimentWriter.
+
+    Args:
+        client (ForumClient): Shared blockchain client
+    """
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = SentimentWriter(client)
+    return _writer
@@ -0,0 +1,240 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+from web3.exceptions import TransactionNotFound
+from scripts.nonce_manager import get_nonce_manager
+
+# Load environment variables
+load_dotenv()
+
+# Receipt polling settings
+TX_POLL_INTERVAL = float(os.getenv("TX_POLL_INTERVAL", "1"))
+TX_CONFIRM_TIMEOUT = float(os.getenv("TX_CONFIRM_TIMEOUT", "300"))
+TX_HISTORY_SIZE = int(os.getenv("TX_HISTORY_SIZE", "1000"))
+# Seconds without a receipt before a pending transaction is re-sent with a higher gas price (0 disables)
+TX_REPLACE_AFTER = float(os.getenv("TX_REPLACE_AFTER", "60"))
+# Replacement attempts per transaction before it is left to time out
+TX_MAX_REPLACEMENTS = int(os.getenv("TX_MAX_REPLACEMENTS", "3"))
+
+
+class TransactionQueue:
+    """
+    Tracks submitted transactions and confirms them in the background.
+
+    Request handlers send a transaction, hand its hash to submit() and
+    return straight away. A single worker thread polls for receipts and
+    runs each transaction's on_confirmed callback; its return value is
+    kept as the transaction's result (e.g. the new post ID). Statuses are
+    'pending', 'confirmed', 'failed' (reverted or callback error),
+    'dropped' (no receipt within TX_CONFIRM_TIMEOUT) and 'replaced'.
+
+    A transaction still without a receipt after TX_REPLACE_AFTER seconds is
+    re-sent with the same nonce and a higher gas price (up to
+    TX_MAX_REPLACEMENTS times); the replacement takes over its entry's kind,
+    sender and callback. A dropped transaction leaves its nonce unused, so
+    the sender's nonce is resynced from the node rather than every later
+    send waiting behind it.
+    """
+
+    def __init__(self, client, nonce_manager=None, poll_interval=None, confirm_timeout=None,
+                 replace_after=None):
+        self.client = client
+        self.nonce_manager = nonce_manager
+        self.poll_interval = TX_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.confirm_timeout = TX_CONFIRM_TIMEOUT if confirm_timeout is None else confirm_timeout
+        self.replace_after = TX_REPLACE_AFTER if replace_after is None else replace_after
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._transactions = OrderedDict()
+        self._callbacks = {}
+        self._worker = None
+
+    def _hex(self, tx_hash):
+        # HexBytes from transact(), or the 0x strings the entries are keyed by
+        if isinstance(tx_hash, str):
+            return tx_hash.lower()
+        return self.client.w3.to_hex(tx_hash)
+
+    def submit(self, tx_hash, kind, on_confirmed=None, sender=None):
+        """
+        Start tracking a sent transaction.
+
+        Args:
+            tx_hash (HexBytes or str): Hash returned by transact()
+            kind (str): Short label such as 'post' or 'vote'
+            on_confirmed (callable): Called with the receipt once mined
+            sender (str): Checksummed sender address, resynced if the transaction is dropped
+
+        Returns:
+            str: The 0x-prefixed transaction hash
+        """
+        tx_hash = self._hex(tx_hash)
+        with self._lock:
+            self._transactions[tx_hash] = {
+                'hash': tx_hash,
+                'kind': kind,
+                'sender': sender,
+                'status': 'pending',
+                'replacements': 0,
+                'submitted_at': time.time(),
+                'block_number': None,
+                'result': None,
+                'error': None
+            }
+            if on_confirmed:
+                self._callbacks[tx_hash] = on_confirmed
+            while len(self._transactions) > TX_HISTORY_SIZE:
+                old_hash, _ = self._transactions.popitem(last=False)
+                self._callbacks.pop(old_hash, None)
+        self._ensure_worker()
+        self._wakeup.set()
+        return tx_hash
+
+    def replace(self, old_hash, new_hash):
+        """
+        Track a replacement (same nonce, higher gas) in place of a pending transaction.
+
+        The old entry is marked 'replaced' and points at the new hash, which
+        inherits its kind and confirmation callback.
+
+        Returns:
+            str: The 0x-prefixed replacement hash
+        """
+        old_hash = self._hex(old_hash)
+        with self._lock:
+            entry = self._transactions.get(old_hash)
+            kind = entry['kind'] if entry else 'replacement'
+            sender = entry['sender'] if entry else None
+            replacements = entry['replacements'] + 1 if entry else 1
+            replaces = [old_hash] + (entry.get('replaces', []) if entry else [])
+            callback = self._callbacks.pop(old_hash, None)
+            if entry:
+                entry.update(status='replaced', replaced_by=self._hex(new_hash))
+        new_hash = self.submit(new_hash, kind, callback, sender)
+        self._update(new_hash, replacements=replacements, replaces=replaces)
+        return new_hash
+
+    def status(self, tx_hash):
+        """Return a copy of the tracked status for a transaction, or None."""
+        with self._lock:
+            entry = self._transactions.get(tx_hash.lower() if tx_hash else tx_hash)
+            return dict(entry) if entry else None
+
+    def wait(self, tx_hash, timeout=None):
+        """Block until a transaction leaves the pending state (for scripts)."""
+        deadline = time.time() + (self.confirm_timeout if timeout is None else timeout)
+        while time.time() < deadline:
+            entry = self.status(tx_hash)
+            if entry is None or entry['status'] != 'pending':
+                return entry
+            time.sleep(min(self.poll_interval, 0.1))
+        return self.status(tx_hash)
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="tx-queue", daemon=True)
+            self._worker.start()
+
+    def _pending(self):
+        with self._lock:
+            return [h for h, entry in self._transactions.items() if entry['status'] == 'pending']
+
+    def _update(self, tx_hash, **fields):
+        with self._lock:
+            entry = self._transactions.get(tx_hash)
+            if entry:
+                entry.update(fields)
+
+    def _finish(self, tx_hash, **fields):
+        with self._lock:
+            entry = self._transactions.get(tx_hash)
+            if entry:
+                entry.update(fields)
+            return self._callbacks.pop(tx_hash, None)
+
+    def _receipt(self, entry):
+        # A replaced transaction can still be mined instead of its replacement
+        for tx_hash in [entry['hash']] + entry.get('replaces', []):
+            try:
+                return self.client.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+        return None
+
+    def _check(self, tx_hash):
+        entry = self.status(tx_hash)
+        if entry is None:
+            return
+        receipt = self._receipt(entry)
+        if receipt is None:
+            if self._should_replace(entry):
+                self._replace_stuck(entry)
+            elif time.time() - entry['submitted_at'] > self.confirm_timeout:
+                self._finish(tx_hash, status='dropped', error="No receipt before timeout")
+                if self.nonce_manager and entry['sender']:
+                    self.nonce_manager.resync(entry['sender'])
+            return
+
+        if receipt['status'] != 1:
+            self._finish(tx_hash, status='failed', block_number=receipt['blockNumber'],
+                         error="Transaction reverted")
+            return
+
+        callback = self._finish(tx_hash, block_number=receipt['blockNumber'])
+        result = None
+        try:
+            if callback:
+                result = callback(receipt)
+        except Exception as e:
+            print(f"Error handling confirmed transaction {tx_hash}: {str(e)}")
+            self._finish(tx_hash, status='failed', error=str(e))
+            return
+        self._finish(tx_hash, status='confirmed', result=result)
+
+    def _should_replace(self, entry):
+        return (
+            self.nonce_manager is not None
+            and self.replace_after > 0
+            and entry['replacements'] < TX_MAX_REPLACEMENTS
+            and time.time() - entry['submitted_at'] > self.replace_after
+        )
+
+    def _replace_stuck(self, entry):
+        tx_hash = entry['hash']
+        try:
+            new_hash = self.nonce_manager.replace(tx_hash)
+        except Exception as e:
+            # Usually mined since the last poll; the receipt settles it. A failed
+            # attempt still counts, so a transaction the node lost is not retried every poll
+            print(f"Could not replace stuck transaction {tx_hash}: {str(e)}")
+            self._update(tx_hash, replacements=entry['replacements'] + 1)
+            return
+        print(f"Replaced stuck transaction {tx_hash} with {self._hex(new_hash)}")
+        self.replace(tx_hash, new_hash)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            for tx_hash in self._pending():
+                try:
+                    self._check(tx_hash)
+                except Exception as e:
+                    # Node hiccups are retried on the next poll
+                    print(f"Error checking transaction {tx_hash}: {str(e)}")
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_tx_queue(client):
+    """Return the process-wide TransactionQueue."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = TransactionQueue(client, get_nonce_manager(client))
+    return _queue
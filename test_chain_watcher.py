@@ -0,0 +1,142 @@
+from scripts.chain_watcher import ChainWatcher, ChangeBlocks, ReadCache
+
+AUTHOR = "0x" + "aa" * 20
+VOTER = "0x" + "bb" * 20
+OTHER = "0x" + "cc" * 20
+
+
+def test_put_with_a_fresh_token_stores():
+    cache = ReadCache()
+    cache.put(1, {'id': 1}, cache.token(1))
+    assert cache.get(1) == {'id': 1}
+    assert len(cache) == 1
+
+
+def test_reads_that_raced_an_invalidate_are_dropped():
+    cache = ReadCache()
+    token = cache.token(1)
+    cache.invalidate(1)  # an event arrived while the read was in flight
+    cache.put(1, {'id': 1, 'upvotes': 0}, token)
+    assert cache.get(1) is None
+
+    cache.put(1, {'id': 1, 'upvotes': 1}, cache.token(1))
+    assert cache.get(1) == {'id': 1, 'upvotes': 1}
+
+
+def test_invalidate_only_touches_its_key():
+    cache = ReadCache()
+    other_token = cache.token(2)
+    cache.invalidate(1)
+    cache.put(2, {'id': 2}, other_token)
+    assert cache.get(2) == {'id': 2}
+
+
+def test_update_patches_cached_entries_and_drops_racing_reads():
+    cache = ReadCache()
+    assert cache.update(AUTHOR, {'sentimentTag': "positive"}) is False
+    assert cache.get(AUTHOR) is None
+
+    cache.put(AUTHOR, {'score': 10, 'sentimentTag': "neutral"}, cache.token(AUTHOR))
+    token = cache.token(AUTHOR)
+    assert cache.update(AUTHOR, {'sentimentTag': "positive"}) is True
+    assert cache.get(AUTHOR) == {'score': 10, 'sentimentTag': "positive"}
+
+    # A read that started before the patch would undo it
+    cache.put(AUTHOR, {'score': 10, 'sentimentTag': "neutral"}, token)
+    assert cache.get(AUTHOR)['sentimentTag'] == "positive"
+
+
+def test_clear_drops_every_in_flight_read():
+    cache = ReadCache()
+    cache.put(1, {'id': 1}, cache.token(1))
+    token = cache.token(2)
+    cache.clear()
+    assert len(cache) == 0
+    cache.put(2, {'id': 2}, token)
+    assert cache.get(2) is None
+    assert cache.token(2) != token
+
+
+def test_cache_is_a_bounded_lru():
+    cache = ReadCache(max_entries=2)
+    for key in (1, 2):
+        cache.put(key, {'id': key}, cache.token(key))
+    cache.get(1)
+    cache.put(3, {'id': 3}, cache.token(3))
+    assert len(cache) == 2
+    assert cache.get(2) is None
+    assert cache.get(1) == {'id': 1}
+
+
+def test_evicted_versions_still_reject_stale_tokens():
+    cache = ReadCache(max_entries=2)
+    token = cache.token(1)
+    cache.invalidate(1)
+    # Push key 1's version out; its token falls back to the floor
+    cache.invalidate(2)
+    cache.invalidate(3)
+    cache.put(1, {'id': 1, 'upvotes': 0}, token)
+    assert cache.get(1) is None
+    cache.put(1, {'id': 1, 'upvotes': 1}, cache.token(1))
+    assert cache.get(1) == {'id': 1, 'upvotes': 1}
+
+
+def test_change_blocks_never_report_a_forgotten_key_as_older():
+    blocks = ChangeBlocks(floor=100, max_entries=2)
+    blocks.set("a", 101)
+    blocks.set("b", 105)
+    blocks.set("c", 103)
+    assert len(blocks) == 2
+    # "a" was evicted; it reports the newest evicted block instead of the start
+    assert blocks.get("a") == 101
+    assert blocks.get("unseen") == 101
+    assert (blocks.get("b"), blocks.get("c")) == (105, 103)
+
+    blocks.reset(110)
+    assert blocks.get("b") == 110
+
+
+def watched(authors):
+    watcher = ChainWatcher(client=None, poll_interval=1)
+    watcher.start_block = watcher.last_block = 100
+    watcher._post_blocks.reset(100)
+    watcher._user_blocks.reset(100)
+    watcher.author_of = authors.get
+    for address in (AUTHOR, VOTER, OTHER):
+        watcher.reputations.put(address, {'score': 1}, watcher.reputations.token(address))
+    watcher.posts.put(7, {'id': 7, 'author': AUTHOR}, watcher.posts.token(7))
+    return watcher
+
+
+def vote(watcher, post_id=7, block=101):
+    watcher._apply({
+        'event': 'PostVoted',
+        'blockNumber': block,
+        'args': {'postId': post_id, 'voter': VOTER, 'isUpvote': True}
+    })
+
+
+def test_votes_invalidate_the_post_author_and_voter():
+    watcher = watched({7: AUTHOR})
+    vote(watcher)
+    assert watcher.posts.get(7) is None
+    assert watcher.reputations.get(AUTHOR) is None
+    assert watcher.reputations.get(VOTER) is None
+    assert watcher.reputations.get(OTHER) == {'score': 1}
+    assert (watcher.user_block(AUTHOR), watcher.user_block(VOTER), watcher.user_block(OTHER)) == (101, 101, 100)
+    assert watcher.post_block(7) == 101
+
+
+def test_votes_on_posts_with_unknown_authors_clear_reputations():
+    watcher = watched({})
+    vote(watcher, post_id=8)
+    assert len(watcher.reputations) == 0
+    assert watcher.user_block(OTHER) == 101
+    assert watcher.posts.get(7) == {'id': 7, 'author': AUTHOR}
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
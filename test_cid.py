@@ -0,0 +1,100 @@
+import hashlib
+from scripts.cid import (
+    b58encode, b58decode, is_cidv0, cid_to_digest, digest_to_cid,
+    content_hash_str, normalize_post, encode_varint, unixfs_file_block, verify_cid,
+    EMPTY_DIGEST, DIRECT_CONTENT, UNIXFS_CHUNK_SIZE
+)
+
+# `ipfs add` of "hello world\n" and of an empty file
+HELLO_CID = "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o"
+EMPTY_FILE_CID = "QmbFMke1KXqnYyBBWxB74N4c5SBnJMVAiMNRcGu6x1AwQH"
+
+
+def test_base58_round_trip():
+    for data in (b"", b"\x00", b"\x00\x00\x01", b"hello", bytes(range(256))):
+        assert b58decode(b58encode(data)) == data
+    # Leading zero bytes become leading '1's
+    assert b58encode(b"\x00\x00\x01") == "112"
+
+
+def test_base58_rejects_invalid_characters():
+    for text in ("0abc", "Olll", "Il1", "abc!"):
+        try:
+            b58decode(text)
+        except ValueError:
+            continue
+        raise AssertionError(f"{text!r} decoded")
+
+
+def test_is_cidv0():
+    assert is_cidv0(HELLO_CID)
+    assert not is_cidv0(DIRECT_CONTENT)
+    assert not is_cidv0(HELLO_CID[:-1])
+    assert not is_cidv0("Qm" + "0" * 44)
+    assert not is_cidv0(None)
+
+
+def test_cid_digest_round_trip():
+    digest = cid_to_digest(HELLO_CID)
+    assert len(digest) == 32
+    assert digest_to_cid(digest) == HELLO_CID
+
+    digest = hashlib.sha256(b"any block").digest()
+    assert cid_to_digest(digest_to_cid(digest)) == digest
+
+
+def test_direct_content_uses_empty_digest():
+    assert cid_to_digest(DIRECT_CONTENT) == EMPTY_DIGEST
+    assert digest_to_cid(EMPTY_DIGEST) == DIRECT_CONTENT
+
+
+def test_bad_digests_are_rejected():
+    for bad in (lambda: digest_to_cid(b"\x01" * 31), lambda: cid_to_digest("QmNotAHash")):
+        try:
+            bad()
+        except ValueError:
+            continue
+        raise AssertionError("accepted a malformed hash")
+
+
+def test_normalize_post_accepts_both_contract_versions():
+    digest = cid_to_digest(HELLO_CID)
+    v1 = (1, "0xabc", "Title", HELLO_CID, 1700000000, 2, 0, True)
+    v2 = (1, "0xabc", "Title", digest, 1700000000, 2, 0, True)
+    assert normalize_post(v1) == v1
+    assert normalize_post(v2) == v1
+    assert content_hash_str(bytearray(digest)) == HELLO_CID
+
+
+def test_encode_varint():
+    assert encode_varint(0) == b"\x00"
+    assert encode_varint(127) == b"\x7f"
+    assert encode_varint(128) == b"\x80\x01"
+    assert encode_varint(300) == b"\xac\x02"
+
+
+def test_verify_cid_matches_ipfs_add():
+    assert verify_cid(HELLO_CID, b"hello world\n") is True
+    assert verify_cid(EMPTY_FILE_CID, b"") is True
+    assert verify_cid(HELLO_CID, b"hello world") is False
+
+
+def test_verify_cid_accepts_raw_sha256_blocks():
+    data = b"raw block"
+    cid = digest_to_cid(hashlib.sha256(data).digest())
+    assert verify_cid(cid, data) is True
+    assert hashlib.sha256(unixfs_file_block(data)).digest() != cid_to_digest(cid)
+
+
+def test_verify_cid_cannot_check_everything():
+    # Not a CIDv0, or a multi-chunk file whose CID names a DAG root
+    assert verify_cid(DIRECT_CONTENT, b"text") is None
+    assert verify_cid("bafybeigdyrzt5sfp7udm7hu76uh7y26nf3efuylqabf3oclgtqy55fbzdi", b"text") is None
+    assert verify_cid(HELLO_CID, b"x" * (UNIXFS_CHUNK_SIZE + 1)) is None
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,182 @@
+import json
+import os
+import tempfile
+from argparse import Namespace
+from contextlib import contextmanager
+from web3 import Web3
+import scripts.import_posts as import_posts
+from scripts.import_posts import BulkImporter
+
+ABI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "forum_abi.json")
+with open(ABI_PATH, "r") as file:
+    ABI = json.load(file)
+
+FORUM = Web3.to_checksum_address("0x" + "11" * 20)
+SENDER = Web3.to_checksum_address("0x" + "aa" * 20)
+
+
+class Crash(BaseException):
+    """Stands in for the importer process dying; not caught like a failed send."""
+
+
+class FakeNode:
+    """
+    Mines every transaction as soon as it is broadcast, one post per transaction.
+
+    Answers the JSON-RPC calls the importer batches through make_request
+    (there is no endpoint_uri, so batch_requests sends them one by one).
+    """
+
+    def __init__(self):
+        self.transactions = {}
+        self.nonces = {}
+        self.posts = []
+
+    def broadcast(self, sender, nonce, title, tx_hash):
+        if nonce != self.nonces.get(sender, 0):
+            raise ValueError(f"nonce too low: {nonce}")
+        self.nonces[sender] = nonce + 1
+        self.transactions[tx_hash] = {'from': sender, 'nonce': nonce}
+        self.posts.append(title)
+        return tx_hash
+
+    def make_request(self, method, params):
+        if method == "eth_getTransactionByHash":
+            return {'result': self.transactions.get(params[0])}
+        if method == "eth_getTransactionCount":
+            return {'result': hex(self.nonces.get(params[0], 0))}
+        if method == "eth_getTransactionReceipt":
+            if params[0] not in self.transactions:
+                return {'result': None}
+            return {'result': {'status': "0x1", 'logs': []}}
+        raise AssertionError(f"unexpected {method}")
+
+
+class FakeWeb3:
+    to_hex = staticmethod(Web3.to_hex)
+
+    def __init__(self, node):
+        self.provider = node
+
+
+class FakeClient:
+    def __init__(self, node):
+        self.w3 = FakeWeb3(node)
+        self.contract = Web3().eth.contract(address=FORUM, abi=ABI)
+
+
+class FakeNonces:
+    def __init__(self, node):
+        self.node = node
+        self.next = {}
+
+    def allocate(self, sender):
+        if sender not in self.next:
+            self.next[sender] = self.node.nonces.get(sender, 0)
+        self.next[sender] += 1
+        return self.next[sender] - 1
+
+    def resync(self, sender):
+        self.next.pop(sender, None)
+
+
+class FakeSender:
+    """
+    PostSender's send() contract: on_prepared(nonce, hash) runs just before the
+    broadcast, with the hash only known up front when signing locally.
+    Can crash the import right before or right after one post's broadcast.
+    """
+
+    def __init__(self, node, signs_locally=False, crash=None):
+        self.node = node
+        self.signs_locally = signs_locally
+        self.crash = crash
+        self.nonces = FakeNonces(node)
+
+    def sender_for(self, author):
+        return SENDER
+
+    def refresh_fees(self):
+        pass
+
+    def send(self, sender, title, content_hash, is_news, nonce=None, on_prepared=None):
+        if nonce is None:
+            nonce = self.nonces.allocate(sender)
+        tx_hash = Web3.to_hex(Web3.keccak(text=f"{sender}:{nonce}:{title}"))
+        on_prepared(nonce, tx_hash if self.signs_locally else None)
+        if self.crash == ('before', title):
+            raise Crash()
+        self.node.broadcast(sender, nonce, title, tx_hash)
+        if self.crash == ('after', title):
+            raise Crash()
+        return tx_hash
+
+
+@contextmanager
+def importing(node, posts, progress_path, sender):
+    input_path = progress_path.replace(".progress.json", ".jsonl")
+    with open(input_path, "w") as file:
+        for title in posts:
+            file.write(json.dumps({'title': title, 'content': f"About {title}"}) + "\n")
+
+    saved = (import_posts.get_client, import_posts.PostSender, import_posts.store_post_contents,
+             import_posts.mark_index_dirty)
+    import_posts.get_client = lambda: FakeClient(node)
+    import_posts.PostSender = lambda *args: sender
+    import_posts.store_post_contents = lambda posts, pin=True: [None] * len(posts)
+    import_posts.mark_index_dirty = lambda: None
+    try:
+        yield BulkImporter(Namespace(
+            input=input_path, progress=progress_path, chunk=10, from_address=None, gas=None,
+            confirm_timeout=1, no_pin=True
+        ))
+    finally:
+        (import_posts.get_client, import_posts.PostSender, import_posts.store_post_contents,
+         import_posts.mark_index_dirty) = saved
+
+
+def crash_then_resume(crash, signs_locally):
+    node = FakeNode()
+    posts = ["T0", "T1", "T2"]
+    with tempfile.TemporaryDirectory() as directory:
+        progress_path = os.path.join(directory, "archive.progress.json")
+        with importing(node, posts, progress_path, FakeSender(node, signs_locally, crash)) as importer:
+            try:
+                importer.run()
+                raise AssertionError("the import should have crashed")
+            except Crash:
+                pass
+        with importing(node, posts, progress_path, FakeSender(node, signs_locally)) as importer:
+            assert importer.run()
+            assert importer.progress['imported'] == 3
+            assert importer.progress['pending'] == []
+            assert importer.progress['failed'] == []
+    return node
+
+
+def test_node_signed_post_broadcast_before_the_crash_is_not_resent():
+    node = crash_then_resume(('after', "T1"), signs_locally=False)
+    assert node.posts == ["T0", "T1", "T2"]
+
+
+def test_node_signed_post_never_broadcast_is_resent_with_its_nonce():
+    node = crash_then_resume(('before', "T1"), signs_locally=False)
+    assert node.posts == ["T0", "T1", "T2"]
+    assert [tx['nonce'] for tx in node.transactions.values()] == [0, 1, 2]
+
+
+def test_locally_signed_post_broadcast_before_the_crash_is_confirmed_not_resent():
+    node = crash_then_resume(('after', "T1"), signs_locally=True)
+    assert node.posts == ["T0", "T1", "T2"]
+
+
+def test_locally_signed_post_never_broadcast_is_resent():
+    node = crash_then_resume(('before', "T1"), signs_locally=True)
+    assert node.posts == ["T0", "T1", "T2"]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
@@ -1,7 +1,4 @@
-# Replace this line:
-# from ipfs_storage import add_to_ipfs, get_from_ipfs
-# With this:
-from ipfs_requests import add_to_ipfs, get_from_ipfs
+from ipfs_client import add_to_ipfs, get_from_ipfs
 
 # Test adding content to IPFS
 test_content = "This is a test post content for IPFS storage"
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import time
+from ipfs_cache import ContentCache
+
+CIDS = ["QmAAA", "QmBBB", "QmCCC"]
+
+
+def test_memory_lru_eviction():
+    # Room for two 10-byte entries
+    cache = ContentCache(memory_bytes=20, disk_dir="", negative_ttl=30)
+    cache.put(CIDS[0], "a" * 10)
+    cache.put(CIDS[1], "b" * 10)
+    assert cache.get(CIDS[0]) == "a" * 10  # CIDS[0] is now the most recently used
+    cache.put(CIDS[2], "c" * 10)
+
+    assert cache.get(CIDS[1]) is None
+    assert cache.get(CIDS[0]) == "a" * 10
+    assert cache.get(CIDS[2]) == "c" * 10
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1
+    assert stats['memory_bytes'] == 20
+
+
+def test_oversized_entries_skip_memory():
+    cache = ContentCache(memory_bytes=5, disk_dir="", negative_ttl=30)
+    cache.put(CIDS[0], "too long for memory")
+    assert cache.get(CIDS[0]) is None
+
+
+def test_disk_tier_survives_restart_and_evicts_oldest():
+    with tempfile.TemporaryDirectory() as disk_dir:
+        cache = ContentCache(memory_bytes=1000, disk_dir=disk_dir, disk_bytes=20, negative_ttl=30)
+        cache.put(CIDS[0], "a" * 10)
+        cache.put(CIDS[1], "b" * 10)
+        cache.put(CIDS[2], "c" * 10)
+        assert sorted(os.listdir(disk_dir)) == CIDS[1:]
+
+        restarted = ContentCache(memory_bytes=1000, disk_dir=disk_dir, disk_bytes=20, negative_ttl=30)
+        assert restarted.get(CIDS[1]) == "b" * 10
+        assert restarted.get(CIDS[0]) is None
+        assert restarted.get_stats()['disk_hits'] == 1
+
+
+def test_negative_entries_expire():
+    cache = ContentCache(memory_bytes=1000, disk_dir="", negative_ttl=0.05)
+    calls = []
+
+    def loader(cid):
+        calls.append(cid)
+        return None
+
+    assert cache.fetch(CIDS[0], loader) is None
+    assert cache.fetch(CIDS[0], loader) is None
+    assert calls == [CIDS[0]]
+    assert cache.get_stats()['negative_hits'] == 1
+
+    time.sleep(0.1)
+    assert not cache.is_missing(CIDS[0])
+    assert cache.fetch(CIDS[0], lambda cid: "found later") == "found later"
+    assert cache.fetch(CIDS[0], loader) == "found later"
+
+
+def test_put_clears_negative_entry():
+    cache = ContentCache(memory_bytes=1000, disk_dir="", negative_ttl=30)
+    cache.mark_missing(CIDS[0])
+    assert cache.is_missing(CIDS[0])
+    cache.put(CIDS[0], "content")
+    assert not cache.is_missing(CIDS[0])
+
+
+def test_non_cid_keys_are_ignored():
+    cache = ContentCache(memory_bytes=1000, disk_dir="", negative_ttl=30)
+    cache.put("../etc/passwd", "x")
+    assert cache.get("../etc/passwd") is None
+    assert cache.get_stats()['memory_entries'] == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,172 @@
+import threading
+from hexbytes import HexBytes
+from web3 import Web3
+from scripts.nonce_manager import NonceManager, is_nonce_error
+
+SENDER = "0x" + "ab" * 20
+
+
+class FakeEth:
+    """Just enough of w3.eth for the manager: a settable pending nonce and a transaction store."""
+
+    def __init__(self, pending_nonce=0):
+        self.pending_nonce = pending_nonce
+        self.fetches = 0
+        self.transactions = {}
+
+    def get_transaction_count(self, address, block_identifier):
+        self.fetches += 1
+        return self.pending_nonce
+
+    def get_transaction(self, tx_hash):
+        return self.transactions[tx_hash]
+
+    def send_transaction(self, transaction):
+        tx_hash = HexBytes(len(self.transactions).to_bytes(32, "big"))
+        self.transactions[tx_hash] = dict(transaction, input=transaction['data'], blockNumber=None)
+        return tx_hash
+
+
+class FakeWeb3:
+    to_hex = staticmethod(Web3.to_hex)
+
+    def __init__(self, pending_nonce=0):
+        self.eth = FakeEth(pending_nonce)
+
+
+def test_nonces_are_allocated_locally():
+    w3 = FakeWeb3(pending_nonce=7)
+    manager = NonceManager(w3)
+    sent = [manager.send(SENDER, lambda nonce: nonce) for _ in range(3)]
+    assert sent == [7, 8, 9]
+    assert manager.peek(SENDER) == 10
+    assert w3.eth.fetches == 1
+
+
+def test_resync_asks_the_node_again():
+    w3 = FakeWeb3(pending_nonce=3)
+    manager = NonceManager(w3)
+    manager.send(SENDER, lambda nonce: nonce)
+    w3.eth.pending_nonce = 12  # e.g. transactions sent by another process
+    manager.resync(SENDER)
+    assert manager.send(SENDER, lambda nonce: nonce) == 12
+    assert w3.eth.fetches == 2
+
+
+def test_resync_waits_for_a_send_in_progress():
+    w3 = FakeWeb3(pending_nonce=1)
+    manager = NonceManager(w3)
+    sending, release = threading.Event(), threading.Event()
+
+    def slow_send(nonce):
+        sending.set()
+        release.wait(5)
+        return nonce
+
+    sender = threading.Thread(target=manager.send, args=(SENDER, slow_send))
+    sender.start()
+    sending.wait(5)
+    resync = threading.Thread(target=manager.resync, args=(SENDER,))
+    resync.start()
+    resync.join(0.1)
+    assert resync.is_alive()
+
+    release.set()
+    sender.join()
+    resync.join()
+    # The resync landed after the send, so the next allocation asks the node
+    w3.eth.pending_nonce = 5
+    assert manager.peek(SENDER) == 5
+    assert w3.eth.fetches == 2
+
+
+def test_nonce_errors_resync_and_retry_once():
+    w3 = FakeWeb3(pending_nonce=5)
+    manager = NonceManager(w3)
+    manager.peek(SENDER)
+    w3.eth.pending_nonce = 9
+    attempts = []
+
+    def send_fn(nonce):
+        attempts.append(nonce)
+        if nonce < 9:
+            raise ValueError("nonce too low")
+        return nonce
+
+    assert manager.send(SENDER, send_fn) == 9
+    assert attempts == [5, 9]
+    assert manager.peek(SENDER) == 10
+
+
+def test_other_errors_resync_without_retrying():
+    w3 = FakeWeb3(pending_nonce=4)
+    manager = NonceManager(w3)
+    attempts = []
+
+    def send_fn(nonce):
+        attempts.append(nonce)
+        raise ValueError("insufficient funds for gas * price + value")
+
+    try:
+        manager.send(SENDER, send_fn)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("error was swallowed")
+    assert attempts == [4]
+    # The failed nonce was not consumed; the node is asked again next time
+    assert manager.send(SENDER, lambda nonce: nonce) == 4
+    assert w3.eth.fetches == 2
+
+
+def test_is_nonce_error():
+    assert is_nonce_error("Nonce too low: next nonce 4, tx nonce 3")
+    assert is_nonce_error("replacement transaction underpriced")
+    assert not is_nonce_error("execution reverted")
+
+
+def stuck_transaction(w3, **fees):
+    return w3.eth.send_transaction(dict(
+        {'from': SENDER, 'to': "0x" + "cd" * 20, 'data': "0x1234", 'value': 0, 'gas': 90000, 'nonce': 3},
+        **fees
+    ))
+
+
+def test_replace_keeps_the_nonce_and_bumps_the_gas_price():
+    w3 = FakeWeb3()
+    manager = NonceManager(w3)
+    stuck = stuck_transaction(w3, gasPrice=1000)
+
+    replacement = w3.eth.get_transaction(manager.replace(stuck, bump=1.5))
+    assert replacement['nonce'] == 3
+    assert replacement['gasPrice'] == 1500
+    assert (replacement['data'], replacement['gas']) == ("0x1234", 90000)
+
+
+def test_replace_bumps_both_fee_caps():
+    w3 = FakeWeb3()
+    stuck = stuck_transaction(w3, maxFeePerGas=2000, maxPriorityFeePerGas=100)
+
+    replacement = w3.eth.get_transaction(NonceManager(w3).replace(stuck, bump=1.125))
+    assert replacement['nonce'] == 3
+    assert (replacement['maxFeePerGas'], replacement['maxPriorityFeePerGas']) == (2250, 112)
+    assert 'gasPrice' not in replacement
+
+
+def test_mined_transactions_are_not_replaced():
+    w3 = FakeWeb3()
+    mined = stuck_transaction(w3, gasPrice=1000)
+    w3.eth.transactions[mined]['blockNumber'] = 1
+    try:
+        NonceManager(w3).replace(mined)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("replaced a mined transaction")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,170 @@
+import os
+import sys
+from contextlib import contextmanager
+
+# The Flask app and its sentiment module live in app/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+import app as forum_app
+from scripts import interact
+
+AUTHOR = "0x" + "aa" * 20
+OTHER = "0x" + "bb" * 20
+
+
+class FakeWatcher:
+    """Blocks the page cache keys on, moved by hand as a test "mines" events."""
+
+    def __init__(self, block=5):
+        self.start_block = 1
+        self.last_block = self.last_event_block = block
+        self.post_blocks = {}
+        self.user_blocks = {}
+        self.authors = {}
+
+    def mine(self, post_id=None, users=()):
+        self.last_block = self.last_event_block = self.last_block + 1
+        if post_id is not None:
+            self.post_blocks[post_id] = self.last_block
+        for user in users:
+            self.user_blocks[user] = self.last_block
+
+    def post_block(self, post_id):
+        return self.post_blocks.get(post_id, self.start_block)
+
+    def user_block(self, address):
+        return self.user_blocks.get(address, self.start_block)
+
+    def author_of(self, post_id):
+        return self.authors.get(post_id)
+
+
+class FakeIndex:
+    """
+    A post index that was just synced: it only catches up when asked for a
+    block it has not applied yet, as PostIndex.sync_if_stale does within
+    FORUM_INDEX_SYNC_INTERVAL of its last sync.
+    """
+
+    def __init__(self):
+        self.chain = []
+        self.posts = {}
+        self.synced_block = 0
+        self.syncs = []
+
+    def add_post(self, block, post_id, title):
+        self.chain.append((block, (post_id, AUTHOR, title, "direct_content", 1700000000, 0, 0, False)))
+
+    def sync_if_stale(self, max_age=None, min_block=None):
+        if min_block is None or min_block <= self.synced_block:
+            return 0
+        self.syncs.append(min_block)
+        for block, post in self.chain:
+            if self.synced_block < block <= min_block:
+                self.posts[post[0]] = post
+        self.synced_block = min_block
+        return 1
+
+    def max_post_id(self):
+        return max(self.posts, default=0)
+
+    def get_posts_between(self, low, high):
+        return [self.posts[post_id] for post_id in sorted(self.posts, reverse=True) if low <= post_id <= high]
+
+
+@contextmanager
+def served(watcher, index):
+    saved = (forum_app.get_live_watcher, interact.get_live_watcher, interact.get_post_index)
+    forum_app.get_live_watcher = interact.get_live_watcher = lambda: watcher
+    interact.get_post_index = lambda client: index
+    forum_app.page_cache.clear()
+    try:
+        yield forum_app.app.test_client()
+    finally:
+        forum_app.get_live_watcher, interact.get_live_watcher, interact.get_post_index = saved
+        forum_app.page_cache.clear()
+
+
+# A cached view keyed like the post page, counting how often it really runs
+renders = []
+
+
+def post_view(post_id):
+    renders.append(post_id)
+    return f"post {post_id}, render {len(renders)}"
+
+
+forum_app.app.add_url_rule(
+    '/test/post/<int:post_id>', 'test_post', forum_app.cached_page(forum_app.post_page_block)(post_view)
+)
+
+
+def test_unchanged_pages_revalidate_with_304():
+    watcher, index = FakeWatcher(), FakeIndex()
+    index.add_post(5, 1, "First post")
+    with served(watcher, index) as client:
+        response = client.get('/')
+        assert response.status_code == 200
+        assert b"First post" in response.data
+        etag = response.headers['ETag']
+        assert response.headers['Cache-Control'] == "no-cache"
+
+        response = client.get('/', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b""
+
+
+def test_new_blocks_change_the_page_and_its_etag():
+    watcher, index = FakeWatcher(), FakeIndex()
+    index.add_post(5, 1, "First post")
+    with served(watcher, index) as client:
+        etag = client.get('/').headers['ETag']
+
+        # The watcher sees the new post before the index's next timed sync;
+        # the page must not be rendered from the older index and cached as new
+        index.add_post(6, 2, "Second post")
+        watcher.mine(post_id=2, users=[AUTHOR])
+        response = client.get('/', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert b"Second post" in response.data
+        assert response.headers['ETag'] != etag
+        assert index.syncs == [5, 6]
+
+        response = client.get('/', headers={'If-None-Match': response.headers['ETag']})
+        assert response.status_code == 304
+
+
+def test_only_events_that_touch_a_page_invalidate_it():
+    watcher = FakeWatcher()
+    watcher.authors[7] = AUTHOR
+    del renders[:]
+    with served(watcher, FakeIndex()) as client:
+        etag = client.get('/test/post/7').headers['ETag']
+
+        # A vote on another post by someone else leaves post 7's page alone
+        watcher.mine(post_id=8, users=[OTHER])
+        assert client.get('/test/post/7', headers={'If-None-Match': etag}).status_code == 304
+        assert renders == [7]
+
+        # A vote on a different post still changes the author's reputation shown here
+        watcher.mine(post_id=9, users=[AUTHOR, OTHER])
+        response = client.get('/test/post/7', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert renders == [7, 7]
+
+
+def test_pages_are_not_cached_without_a_current_watcher():
+    del renders[:]
+    with served(None, FakeIndex()) as client:
+        response = client.get('/test/post/7')
+        assert response.status_code == 200
+        assert 'ETag' not in response.headers
+        client.get('/test/post/7')
+        assert renders == [7, 7]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,78 @@
+from scripts.interact import new_page, page_post_ids, set_page_cursors, POSTS_PER_PAGE, MAX_POSTS_PER_PAGE
+
+
+def load(post_count, cursor=None, limit=None):
+    """What get_posts_page does with the cursor, without the reads."""
+    page = new_page(limit)
+    page['post_count'] = post_count
+    post_ids = page_post_ids(page, cursor)
+    if post_ids:
+        set_page_cursors(page, post_ids)
+    return page, post_ids
+
+
+def test_limits_are_clamped():
+    assert new_page()['limit'] == POSTS_PER_PAGE
+    assert new_page(0)['limit'] == POSTS_PER_PAGE
+    assert new_page(-5)['limit'] == 1
+    assert new_page(MAX_POSTS_PER_PAGE + 1)['limit'] == MAX_POSTS_PER_PAGE
+
+
+def test_empty_forum():
+    page, post_ids = load(0)
+    assert post_ids == []
+    assert (page['next_cursor'], page['prev_cursor']) == (None, None)
+
+
+def test_first_page_is_the_newest_posts():
+    page, post_ids = load(25, limit=10)
+    assert post_ids == list(range(25, 15, -1))
+    assert page['next_cursor'] == 16
+    assert page['prev_cursor'] is None
+
+
+def test_last_page_is_short_and_has_no_next_cursor():
+    page, post_ids = load(25, cursor=6, limit=10)
+    assert post_ids == [5, 4, 3, 2, 1]
+    assert page['next_cursor'] is None
+    assert page['prev_cursor'] == 16
+
+
+def test_a_single_full_page_has_no_cursors():
+    page, post_ids = load(10, limit=10)
+    assert post_ids == list(range(10, 0, -1))
+    assert (page['next_cursor'], page['prev_cursor']) == (None, None)
+
+
+def test_out_of_range_cursors():
+    # Past the end: nothing older than post 1
+    assert load(25, cursor=1, limit=10)[1] == []
+    # Newer than the newest post: the first page
+    assert load(25, cursor=100, limit=10)[1] == list(range(25, 15, -1))
+
+
+def walk(post_count, limit, cursor, direction):
+    pages = []
+    while True:
+        page, post_ids = load(post_count, cursor, limit)
+        pages.append(post_ids)
+        cursor = page[direction]
+        if cursor is None:
+            return pages
+
+
+def test_cursors_walk_every_post_once_both_ways():
+    for post_count, limit in ((25, 10), (30, 10), (7, 3), (1, 20)):
+        older = walk(post_count, limit, None, 'next_cursor')
+        assert [post_id for post_ids in older for post_id in post_ids] == list(range(post_count, 0, -1))
+
+        # prev_cursor leads back up through the same pages
+        newer = walk(post_count, limit, older[-1][0] + 1, 'prev_cursor')
+        assert newer == older[::-1]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
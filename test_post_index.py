@@ -0,0 +1,216 @@
+import json
+import os
+import threading
+from eth_abi import encode
+from eth_utils import event_abi_to_log_topic
+from hexbytes import HexBytes
+from web3 import Web3
+from scripts.post_index import PostIndex
+
+ABI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "forum_abi.json")
+with open(ABI_PATH, "r") as file:
+    ABI = json.load(file)
+
+FORUM = "0x" + "11" * 20
+REDEPLOYED = "0x" + "22" * 20
+AUTHOR = Web3.to_checksum_address("0x" + "aa" * 20)
+VOTER = Web3.to_checksum_address("0x" + "bb" * 20)
+CID = "QmYwAPJzv5CZsnA625s3Xf2nemtYgPpHdWEz79ojWnPbdG"
+
+
+def topic(name):
+    event = next(item for item in ABI if item['type'] == 'event' and item['name'] == name)
+    return HexBytes(event_abi_to_log_topic(event))
+
+
+def word(value):
+    if isinstance(value, str):
+        return HexBytes(bytes(12) + bytes.fromhex(value[2:]))
+    return HexBytes(value.to_bytes(32, "big"))
+
+
+def post_created(post_id, title, is_news=False, author=AUTHOR):
+    return ([topic("PostCreated"), word(post_id), word(author)],
+            encode(['string', 'bool', 'string'], [title, is_news, CID]))
+
+
+def post_voted(post_id, is_upvote=True, voter=VOTER):
+    return [topic("PostVoted"), word(post_id), word(voter)], encode(['bool'], [is_upvote])
+
+
+def sentiment_updated(user, tag):
+    return [topic("UserSentimentUpdated"), word(user)], encode(['string'], [tag])
+
+
+class FakeEth:
+    """A chain of raw logs per contract address; get_logs applies the address, range and topic0 filter."""
+
+    def __init__(self):
+        self.block_number = 0
+        self.logs = []
+        self.log_requests = 0
+        self.on_get_logs = None
+
+    def emit(self, address, event, block=None):
+        if block is None:
+            block = self.block_number + 1
+        topics, data = event
+        self.block_number = max(self.block_number, block)
+        self.logs.append({
+            'address': Web3.to_checksum_address(address),
+            'topics': topics,
+            'data': HexBytes(data),
+            'blockNumber': block,
+            'blockHash': HexBytes(block.to_bytes(32, "big")),
+            'logIndex': len(self.logs),
+            'transactionHash': HexBytes((1000 + len(self.logs)).to_bytes(32, "big")),
+            'transactionIndex': 0,
+        })
+
+    def get_logs(self, params):
+        self.log_requests += 1
+        if self.on_get_logs:
+            self.on_get_logs()
+        topics = set(params['topics'][0])
+        return [
+            log for log in self.logs
+            if log['address'] == params['address']
+            and params['fromBlock'] <= log['blockNumber'] <= params['toBlock']
+            and Web3.to_hex(log['topics'][0]) in topics
+        ]
+
+    def get_block(self, number):
+        return {'timestamp': 1000 + number}
+
+
+class FakeProvider:
+    """No endpoint_uri, so batch_requests falls back to one make_request per block."""
+
+    def make_request(self, method, params):
+        assert method == "eth_getBlockByNumber"
+        return {'result': {'timestamp': hex(1000 + int(params[0], 16))}}
+
+
+class FakeWeb3:
+    to_hex = staticmethod(Web3.to_hex)
+
+    def __init__(self):
+        self.eth = FakeEth()
+        self.provider = FakeProvider()
+
+
+class FakeClient:
+    def __init__(self):
+        self.w3 = FakeWeb3()
+        self.deploy(FORUM)
+
+    def deploy(self, address):
+        self.contract = Web3().eth.contract(address=Web3.to_checksum_address(address), abi=ABI)
+
+
+def new_index():
+    client = FakeClient()
+    return client, client.w3.eth, PostIndex(client, path=":memory:")
+
+
+def test_replay_builds_posts_votes_and_tags():
+    client, eth, index = new_index()
+    eth.emit(FORUM, post_created(1, "first"), block=3)
+    eth.emit(FORUM, post_created(2, "news", is_news=True), block=4)
+    eth.emit(FORUM, post_voted(1), block=5)
+    eth.emit(FORUM, post_voted(1, is_upvote=False, voter=AUTHOR), block=5)
+    eth.emit(FORUM, post_voted(2), block=6)
+    eth.emit(FORUM, sentiment_updated(AUTHOR, "positive"), block=6)
+    eth.emit(FORUM, sentiment_updated(AUTHOR, "negative"), block=7)
+    # Another contract's logs are not this forum's
+    eth.emit(REDEPLOYED, post_created(3, "elsewhere"), block=7)
+
+    assert index.sync() == 7
+    assert index.get_posts() == [
+        (1, AUTHOR, "first", CID, 1003, 1, 1, False),
+        (2, AUTHOR, "news", CID, 1004, 1, 0, True),
+    ]
+    assert index.get_sentiment_tag(AUTHOR) == "negative"
+    assert index.get_post_ids_by_author(AUTHOR) == [1, 2]
+    assert index.last_block == 7
+    assert eth.log_requests == 1
+
+
+def test_sync_only_fetches_new_blocks():
+    client, eth, index = new_index()
+    eth.emit(FORUM, post_created(1, "first"))
+    index.sync()
+    eth.emit(FORUM, post_voted(1))
+    eth.emit(FORUM, post_voted(1))
+    assert index.sync() == 2
+    assert index.get_post(1)[5] == 2
+    assert index.sync() == 0
+    assert index.get_post(1)[5] == 2
+
+
+def test_redeploy_resets_the_index():
+    client, eth, index = new_index()
+    eth.emit(FORUM, post_created(1, "old forum"))
+    eth.emit(FORUM, post_created(2, "old forum"))
+    eth.emit(FORUM, sentiment_updated(AUTHOR, "positive"))
+    index.sync()
+    index.record_post_sentiment(2, AUTHOR, "positive")
+
+    client.deploy(REDEPLOYED)
+    eth.emit(REDEPLOYED, post_created(1, "new forum"))
+    index.sync()
+    assert [post[2] for post in index.get_posts()] == ["new forum"]
+    assert index.get_sentiment_tag(AUTHOR) is None
+    assert index.get_sentiment_counts(AUTHOR) == {'positive': 0, 'negative': 0, 'neutral': 0}
+
+
+def test_sync_if_stale_skips_fresh_indexes():
+    client, eth, index = new_index()
+    eth.emit(FORUM, post_created(1, "first"))
+    index.sync_if_stale(max_age=60)
+    assert index.sync_if_stale(max_age=60) == 0
+    assert eth.log_requests == 1
+
+    # A block the watcher has seen, or a write of our own, makes it stale again
+    eth.emit(FORUM, post_voted(1))
+    assert index.sync_if_stale(max_age=60, min_block=eth.block_number) == 1
+    eth.emit(FORUM, post_voted(1))
+    index.mark_dirty()
+    assert index.sync_if_stale(max_age=60) == 1
+    assert index.get_post(1)[5] == 2
+
+
+def test_concurrent_stale_reads_sync_once():
+    client, eth, index = new_index()
+    eth.emit(FORUM, post_created(1, "first"))
+    index.sync()
+    eth.emit(FORUM, post_voted(1))
+    index.mark_dirty()
+
+    fetching, release = threading.Event(), threading.Event()
+
+    def slow_fetch():
+        fetching.set()
+        release.wait(5)
+
+    eth.on_get_logs = slow_fetch
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(index.sync_if_stale(max_age=60))) for _ in range(4)]
+    threads[0].start()
+    fetching.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert sorted(results) == [0, 0, 0, 1]
+    assert eth.log_requests == 2
+    assert index.get_post(1)[5] == 1
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
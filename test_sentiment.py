@@ -0,0 +1,131 @@
+import os
+import sys
+import tempfile
+
+# The sentiment module lives with the Flask app
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+import sentiment
+from sentiment import (
+    SentimentCache, SentimentLexicon, sentiment_key, clean_text, analyze_sentiment,
+    analyze_sentiment_batch, analyze_sentiment_cached, analyze_sentiment_batch_cached
+)
+
+# Texts that reduce to a plain mean, and ones TextBlob scores in context
+# (negations, adverbs before a lexicon word, emoticons), plus URLs and symbols
+SAMPLE_TEXTS = [
+    "Great news for the markets today",
+    "The rally was terrible and bad",
+    "This is not good at all",
+    "never a bad day",
+    "very good results",
+    "very unexpectedly good results",
+    "extremely bad, really terrible outcome",
+    "good very",
+    "short",
+    "",
+    "Markets :) up 5% http://example.com/story great",
+    "xd lol this is funny",
+    "I am not very happy but not very sad",
+    "Bitcoin price unchanged",
+    "An excellent, excellent and wonderful quarter!!!",
+]
+
+
+def use_memory_cache():
+    # Keep the tests away from the on-disk cache in the working directory
+    sentiment._cache = SentimentCache(max_entries=100, path="")
+    return sentiment._cache
+
+
+def test_sentiment_key():
+    assert sentiment_key("text", "QmHash") == "QmHash"
+    assert sentiment_key("text") == sentiment_key("text", None)
+    assert sentiment_key("text") != sentiment_key("other text")
+
+
+def test_cache_is_a_bounded_lru():
+    cache = SentimentCache(max_entries=2, path="")
+    cache.put("a", ("positive", 0.5))
+    cache.put("b", ("negative", -0.5))
+    cache.get("a")
+    cache.put("c", ("neutral", 0.0))
+    assert cache.get("b") is None
+    assert cache.get("a") == ("positive", 0.5)
+    assert cache.get("c") == ("neutral", 0.0)
+
+
+def test_cache_disk_tier_survives_restart():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sentiment.db")
+        SentimentCache(path=path).put("QmHash", ("positive", 0.8))
+        assert SentimentCache(path=path).get("QmHash") == ("positive", 0.8)
+
+
+def test_cached_analysis_runs_once_per_content():
+    use_memory_cache()
+    calls = []
+    analyze = sentiment.analyze_sentiment
+    sentiment.analyze_sentiment = lambda text: calls.append(text) or analyze(text)
+    try:
+        first = analyze_sentiment_cached("Great news for everyone")
+        assert analyze_sentiment_cached("Great news for everyone") == first
+        # The same text under a CID is a different entry; the CID then keys it
+        analyze_sentiment_cached("Great news for everyone", "QmHash")
+        analyze_sentiment_cached("Edited text", "QmHash")
+    finally:
+        sentiment.analyze_sentiment = analyze
+    assert calls == ["Great news for everyone", "Great news for everyone"]
+
+
+def test_batch_analyzes_each_missing_key_once():
+    use_memory_cache()
+    analyze_sentiment_cached("already cached")
+    batches = []
+    analyze_batch = sentiment.analyze_sentiment_batch
+    sentiment.analyze_sentiment_batch = lambda texts: batches.append(texts) or analyze_batch(texts)
+    try:
+        texts = ["already cached", "bad day", "bad day", "good day"]
+        results = analyze_sentiment_batch_cached(texts)
+    finally:
+        sentiment.analyze_sentiment_batch = analyze_batch
+    assert batches == [["bad day", "good day"]]
+    assert results == [sentiment.analyze_sentiment(text) for text in texts]
+
+
+def test_lexicon_batch_matches_textblob():
+    results = analyze_sentiment_batch(SAMPLE_TEXTS)
+    for text, (label, polarity) in zip(SAMPLE_TEXTS, results):
+        expected_label, expected_polarity = analyze_sentiment(text)
+        assert abs(polarity - expected_polarity) < 1e-9, text
+        assert label == expected_label, text
+
+
+def test_lexicon_rescores_only_context_dependent_texts():
+    lexicon = SentimentLexicon()
+    rescored = []
+    scorer = lexicon.lexicon
+
+    class CountingLexicon:
+        def __call__(self, tokens):
+            rescored.append(" ".join(tokens))
+            return scorer(tokens)
+
+        def __getattr__(self, name):
+            return getattr(scorer, name)
+
+    lexicon.lexicon = CountingLexicon()
+    texts = ["great news today", "not good", "very good results", "good very"]
+    lexicon.score([clean_text(text).split() for text in texts])
+    assert rescored == ["not good", "very good results"]
+
+
+def test_empty_batch():
+    assert analyze_sentiment_batch([]) == []
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
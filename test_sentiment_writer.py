@@ -0,0 +1,126 @@
+from contextlib import contextmanager
+from scripts import interact
+from scripts.sentiment_writer import SentimentWriter
+
+AUTHOR = "0x" + "aa" * 20
+OTHER = "0x" + "bb" * 20
+
+
+class FakeChain:
+    """The interact functions the writer uses, backed by a dict of stored tags."""
+
+    def __init__(self, stored=None, bulk_fails=False):
+        self.stored = dict(stored or {})
+        self.bulk_fails = bulk_fails
+        self.statuses = {}
+        self.sent = []
+        self.single_reads = []
+
+    def get_stored_sentiment_tags(self, user_addresses):
+        if self.bulk_fails:
+            raise ConnectionError("node unavailable")
+        return {address: self.stored.get(address, "") for address in user_addresses}
+
+    def get_stored_sentiment_tag(self, user_address):
+        self.single_reads.append(user_address)
+        return self.stored.get(user_address, "")
+
+    def get_transaction_status(self, tx_hash):
+        return {'status': self.statuses[tx_hash]}
+
+    def submit_user_sentiment(self, user_address, sentiment_tag, from_address=None):
+        tx_hash = f"0x{len(self.sent):064x}"
+        self.sent.append((user_address, sentiment_tag, from_address))
+        self.statuses[tx_hash] = 'pending'
+        return tx_hash, None
+
+    def mine(self):
+        for tx_hash in self.statuses:
+            self.statuses[tx_hash] = 'confirmed'
+        for user_address, sentiment_tag, _ in self.sent:
+            self.stored[user_address] = sentiment_tag
+
+
+@contextmanager
+def patched(chain):
+    names = ("get_stored_sentiment_tags", "get_stored_sentiment_tag", "get_transaction_status",
+             "submit_user_sentiment")
+    saved = {name: getattr(interact, name) for name in names}
+    try:
+        for name in names:
+            setattr(interact, name, getattr(chain, name))
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(interact, name, value)
+
+
+def new_writer():
+    writer = SentimentWriter(client=None, flush_interval=60)
+    # Flushed by hand instead of by the worker thread
+    writer._ensure_worker = lambda: None
+    return writer
+
+
+def test_updates_for_one_author_are_coalesced():
+    chain = FakeChain()
+    writer = new_writer()
+    writer.schedule(AUTHOR, "positive", "0xsender")
+    writer.schedule(AUTHOR, "negative", "0xsender")
+    writer.schedule(OTHER, "neutral")
+    with patched(chain):
+        assert writer.flush() == 2
+    assert chain.sent == [(AUTHOR, "negative", "0xsender"), (OTHER, "neutral", None)]
+    assert writer.stats == {'scheduled': 3, 'coalesced': 1, 'skipped': 0, 'sent': 2}
+
+    with patched(chain):
+        assert writer.flush() == 0
+
+
+def test_unchanged_tags_are_not_written():
+    chain = FakeChain(stored={AUTHOR: "positive"})
+    writer = new_writer()
+    writer.schedule(AUTHOR, "positive")
+    writer.schedule(OTHER, "")
+    with patched(chain):
+        assert writer.flush() == 0
+    assert chain.sent == []
+    assert writer.stats['skipped'] == 2
+    # Both tags came from the one bulk read
+    assert chain.single_reads == []
+
+
+def test_a_tag_still_in_flight_counts_as_written():
+    chain = FakeChain(stored={AUTHOR: "neutral"})
+    writer = new_writer()
+    writer.schedule(AUTHOR, "positive")
+    with patched(chain):
+        writer.flush()
+        # Not mined yet: the chain still says neutral, but positive is on its way
+        writer.schedule(AUTHOR, "positive")
+        assert writer.flush() == 0
+
+        chain.mine()
+        writer.schedule(AUTHOR, "positive")
+        assert writer.flush() == 0
+        writer.schedule(AUTHOR, "negative")
+        assert writer.flush() == 1
+    assert [tag for _, tag, _ in chain.sent] == ["positive", "negative"]
+
+
+def test_failed_bulk_reads_fall_back_to_single_reads():
+    chain = FakeChain(stored={AUTHOR: "positive"}, bulk_fails=True)
+    writer = new_writer()
+    writer.schedule(AUTHOR, "positive")
+    writer.schedule(OTHER, "negative")
+    with patched(chain):
+        assert writer.flush() == 1
+    assert sorted(chain.single_reads) == [AUTHOR, OTHER]
+    assert chain.sent == [(OTHER, "negative", None)]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")
@@ -0,0 +1,196 @@
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+from scripts.tx_queue import TransactionQueue, TX_MAX_REPLACEMENTS
+
+SENDER = "0x" + "ab" * 20
+
+
+def make_hash(n):
+    return HexBytes(n.to_bytes(32, "big"))
+
+
+class FakeEth:
+    """Receipts appear once a test mines the transaction."""
+
+    def __init__(self):
+        self.receipts = {}
+
+    def get_transaction_receipt(self, tx_hash):
+        if tx_hash not in self.receipts:
+            raise TransactionNotFound(tx_hash)
+        return self.receipts[tx_hash]
+
+    def mine(self, tx_hash, status=1, block_number=10):
+        self.receipts[tx_hash] = {'status': status, 'blockNumber': block_number}
+
+
+class FakeWeb3:
+    to_hex = staticmethod(Web3.to_hex)
+
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+class FakeClient:
+    def __init__(self):
+        self.w3 = FakeWeb3()
+
+
+class FakeNonceManager:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.replaced = []
+        self.resynced = []
+
+    def replace(self, tx_hash):
+        self.replaced.append(tx_hash)
+        if self.fail:
+            raise ValueError("transaction not found")
+        return make_hash(100 + len(self.replaced))
+
+    def resync(self, address):
+        self.resynced.append(address)
+
+
+def new_queue(nonce_manager=None, replace_after=0, confirm_timeout=300):
+    client = FakeClient()
+    queue = TransactionQueue(
+        client, nonce_manager, poll_interval=0, confirm_timeout=confirm_timeout, replace_after=replace_after
+    )
+    # Polled by hand instead of by the worker thread
+    queue._ensure_worker = lambda: None
+    return client.w3.eth, queue
+
+
+def age(queue, tx_hash, seconds):
+    queue._transactions[tx_hash]['submitted_at'] -= seconds
+
+
+def poll(queue):
+    for tx_hash in queue._pending():
+        queue._check(tx_hash)
+
+
+def test_pending_until_mined_then_confirmed_with_the_callback_result():
+    eth, queue = new_queue()
+    confirmed = []
+    tx_hash = queue.submit(make_hash(1), 'post', lambda receipt: confirmed.append(receipt) or 42, SENDER)
+    assert tx_hash == Web3.to_hex(make_hash(1))
+    assert queue.status(tx_hash.upper().replace("0X", "0x"))['status'] == 'pending'
+
+    poll(queue)
+    assert queue.status(tx_hash)['status'] == 'pending'
+    assert confirmed == []
+
+    eth.mine(tx_hash, block_number=12)
+    poll(queue)
+    entry = queue.status(tx_hash)
+    assert (entry['status'], entry['result'], entry['block_number']) == ('confirmed', 42, 12)
+    assert len(confirmed) == 1
+
+    # Settled transactions are no longer polled
+    assert queue._pending() == []
+
+
+def test_reverted_transactions_fail_without_running_the_callback():
+    eth, queue = new_queue()
+    confirmed = []
+    tx_hash = queue.submit(make_hash(1), 'vote', confirmed.append)
+    eth.mine(tx_hash, status=0)
+    poll(queue)
+    entry = queue.status(tx_hash)
+    assert (entry['status'], entry['error'], entry['block_number']) == ('failed', "Transaction reverted", 10)
+    assert confirmed == []
+
+
+def test_callback_errors_fail_the_transaction():
+    eth, queue = new_queue()
+
+    def on_confirmed(receipt):
+        raise ValueError("no PostCreated event")
+
+    tx_hash = queue.submit(make_hash(1), 'post', on_confirmed)
+    eth.mine(tx_hash)
+    poll(queue)
+    entry = queue.status(tx_hash)
+    assert (entry['status'], entry['error']) == ('failed', "no PostCreated event")
+
+
+def test_without_a_nonce_manager_stuck_transactions_are_only_dropped():
+    eth, queue = new_queue(replace_after=60, confirm_timeout=300)
+    tx_hash = queue.submit(make_hash(1), 'vote', sender=SENDER)
+    age(queue, tx_hash, 120)
+    poll(queue)
+    assert queue.status(tx_hash)['status'] == 'pending'
+    age(queue, tx_hash, 200)
+    poll(queue)
+    assert queue.status(tx_hash)['status'] == 'dropped'
+
+
+def test_stuck_transactions_are_replaced_and_keep_their_callback():
+    nonces = FakeNonceManager()
+    eth, queue = new_queue(nonces, replace_after=60)
+    confirmed = []
+    old = queue.submit(make_hash(1), 'post', lambda receipt: confirmed.append(receipt) or 7, SENDER)
+
+    poll(queue)
+    assert nonces.replaced == []
+    age(queue, old, 61)
+    poll(queue)
+    assert nonces.replaced == [old]
+    new = queue.status(old)['replaced_by']
+    assert queue.status(old)['status'] == 'replaced'
+    assert queue.status(new)['kind'] == 'post'
+    assert queue.status(new)['sender'] == SENDER
+    assert queue.status(new)['replacements'] == 1
+
+    eth.mine(new)
+    poll(queue)
+    assert queue.status(new)['status'] == 'confirmed'
+    assert queue.status(new)['result'] == 7
+    assert len(confirmed) == 1
+
+
+def test_the_replaced_transaction_can_still_win():
+    eth, queue = new_queue(FakeNonceManager(), replace_after=60)
+    old = queue.submit(make_hash(1), 'post', lambda receipt: 7, SENDER)
+    age(queue, old, 61)
+    poll(queue)
+    new = queue.status(old)['replaced_by']
+
+    # The original was mined before the replacement reached a block
+    eth.mine(old)
+    poll(queue)
+    assert queue.status(new)['status'] == 'confirmed'
+    assert queue.status(new)['result'] == 7
+
+
+def test_replacements_are_capped():
+    nonces = FakeNonceManager(fail=True)
+    eth, queue = new_queue(nonces, replace_after=60, confirm_timeout=1000)
+    tx_hash = queue.submit(make_hash(1), 'vote', sender=SENDER)
+    for _ in range(TX_MAX_REPLACEMENTS + 2):
+        age(queue, tx_hash, 61)
+        poll(queue)
+    # Failed attempts count too, so a lost transaction is not retried forever
+    assert len(nonces.replaced) == TX_MAX_REPLACEMENTS
+    assert queue.status(tx_hash)['status'] == 'pending'
+
+
+def test_dropped_transactions_resync_the_sender():
+    nonces = FakeNonceManager()
+    eth, queue = new_queue(nonces, replace_after=0, confirm_timeout=300)
+    tx_hash = queue.submit(make_hash(1), 'vote', sender=SENDER)
+    age(queue, tx_hash, 301)
+    poll(queue)
+    assert queue.status(tx_hash)['status'] == 'dropped'
+    assert nonces.replaced == []
+    assert nonces.resynced == [SENDER]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"{name}: ok")